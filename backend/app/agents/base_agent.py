@@ -3,14 +3,20 @@ Base Agent class and shared agent utilities.
 Provides the foundation for all specialized agents.
 """
 import asyncio
+import json
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
 import time
 
+from app.agents.prompt_builder import append_request
+from app.config import get_settings
+from app.services.deadline import check_deadline
 from app.services.llm_service import get_llm_service, LLMService
+from app.services.usage_tracker import UsageAccumulator, track_usage
 from app.utils.exceptions import AgentExecutionError
 from app.utils.logging import get_logger
+from app.utils.telemetry import LLM_AGENT_PROMPT_TOKENS
 
 logger = get_logger(__name__)
 
@@ -21,6 +27,11 @@ class BaseAgent(ABC):
     Provides common functionality and enforces contract.
     """
     
+    # Inputs the semantic cache compares by similarity; all other inputs
+    # must match exactly. Calls whose inputs contain none of them (or an
+    # empty tuple) skip the semantic cache.
+    similarity_fields: Tuple[str, ...] = ()
+    
     def __init__(self, name: str, description: str):
         self.name = name
         self.description = description
@@ -67,18 +78,11 @@ class BaseAgent(ABC):
                 inputs=list(kwargs.keys()),
             )
             
-            # Build the prompt
-            prompt = await self.build_prompt(**kwargs)
-            
-            # Get system prompt
-            system_prompt = self.get_system_prompt()
+            # Fail fast if the request deadline has already passed
+            check_deadline(self.name)
             
             # Generate content
-            content = await self.llm_service.generate_content(
-                prompt=prompt,
-                system_instruction=system_prompt,
-                temperature=0.7,
-            )
+            content = await self.generate(**kwargs)
             
             # Validate output
             if not self.validate_output(content):
@@ -114,6 +118,144 @@ class BaseAgent(ABC):
                 details={"error_type": type(e).__name__},
             )
     
+    async def execute_stream(self, **kwargs) -> AsyncIterator[str]:
+        """
+        Execute the agent, yielding content chunks as they are generated.
+        
+        Yields:
+            Chunks of generated markdown content
+            
+        Raises:
+            AgentExecutionError: If execution fails
+        """
+        self._execution_start = time.time()
+        parts = []
+        
+        try:
+            logger.info(
+                "Agent streaming execution started",
+                agent_name=self.name,
+                inputs=list(kwargs.keys()),
+            )
+            
+            check_deadline(self.name)
+            async for chunk in self.generate_stream(**kwargs):
+                parts.append(chunk)
+                yield chunk
+            
+            content = "".join(parts)
+            if not self.validate_output(content):
+                logger.warning(
+                    "Agent output validation failed",
+                    agent_name=self.name,
+                    content_length=len(content),
+                )
+            
+            self._last_execution_time_ms = (time.time() - self._execution_start) * 1000
+            
+            logger.info(
+                "Agent streaming execution completed",
+                agent_name=self.name,
+                execution_time_ms=self._last_execution_time_ms,
+                content_length=len(content),
+            )
+            
+        except Exception as e:
+            self._last_execution_time_ms = (time.time() - self._execution_start) * 1000
+            logger.error(
+                "Agent execution failed",
+                agent_name=self.name,
+                error=str(e),
+                error_type=type(e).__name__,
+            )
+            raise AgentExecutionError(
+                message=f"Agent '{self.name}' execution failed: {str(e)}",
+                agent_name=self.name,
+                details={"error_type": type(e).__name__},
+            )
+    
+    async def generate(self, **kwargs) -> str:
+        """
+        Produce the agent's content with the LLM.
+        
+        Makes one call with build_prompt; agents that split their work
+        across several calls override this and generate_stream.
+        """
+        prompt = await self._build_revisable_prompt(**kwargs)
+        return await self._complete(prompt, self.get_system_prompt(), **self.similarity_params(**kwargs))
+    
+    async def generate_stream(self, **kwargs) -> AsyncIterator[str]:
+        """Produce the agent's content as a stream of chunks."""
+        prompt = await self._build_revisable_prompt(**kwargs)
+        async for chunk in self._complete_stream(prompt, self.get_system_prompt()):
+            yield chunk
+    
+    async def _build_revisable_prompt(self, **kwargs) -> str:
+        """Build the prompt, adding reviewer feedback when this is a revision."""
+        feedback = kwargs.pop("revision_feedback", None)
+        prompt = await self.build_prompt(**kwargs)
+        return self.with_revision_feedback(prompt, feedback) if feedback else prompt
+    
+    @staticmethod
+    def with_revision_feedback(prompt: str, feedback: str) -> str:
+        """Ask for a revised version that addresses a reviewer's evaluation."""
+        return append_request(prompt, f"""## Reviewer Feedback
+A reviewer rejected the previous version of this content. Produce a complete revised version that addresses this evaluation:
+
+{feedback}""")
+    
+    async def _complete(self, prompt: str, system_prompt: str, **cache_params: Any) -> str:
+        """Make one LLM call and record its prompt cache usage."""
+        with track_usage() as usage:
+            content = await self.llm_service.generate_content(
+                prompt=prompt,
+                system_instruction=system_prompt,
+                temperature=0.7,
+                **cache_params,
+            )
+        self._record_prompt_cache(prompt, usage)
+        return content
+    
+    async def _complete_stream(self, prompt: str, system_prompt: str) -> AsyncIterator[str]:
+        """Make one streamed LLM call and record its prompt cache usage."""
+        with track_usage() as usage:
+            async for chunk in self.llm_service.generate_stream(
+                prompt=prompt,
+                system_instruction=system_prompt,
+                temperature=0.7,
+            ):
+                yield chunk
+        self._record_prompt_cache(prompt, usage)
+    
+    def _record_prompt_cache(self, prompt: str, usage: UsageAccumulator) -> None:
+        """Record how much of this agent's prompt the provider served from its cache."""
+        if not usage.llm_calls:
+            return
+        LLM_AGENT_PROMPT_TOKENS.labels(agent=self.name, kind="prompt").inc(usage.prompt_tokens)
+        LLM_AGENT_PROMPT_TOKENS.labels(agent=self.name, kind="cached").inc(usage.cached_tokens)
+        logger.info(
+            "Agent prompt cache usage",
+            agent_name=self.name,
+            prefix_fingerprint=getattr(prompt, "prefix_fingerprint", None),
+            prompt_tokens=usage.prompt_tokens,
+            cached_tokens=usage.cached_tokens,
+            cache_hit_rate=round(usage.cached_tokens / usage.prompt_tokens, 3) if usage.prompt_tokens else 0.0,
+        )
+    
+    def similarity_params(self, **kwargs) -> Dict[str, Any]:
+        """Build the semantic cache arguments for generate_content."""
+        if not any(field in kwargs for field in self.similarity_fields):
+            return {}
+        exact = {k: v for k, v in kwargs.items() if k not in self.similarity_fields}
+        settings = get_settings()
+        return {
+            "similarity_text": " ".join(str(kwargs.get(f, "")) for f in self.similarity_fields),
+            "similarity_scope": json.dumps(exact, sort_keys=True, default=str),
+            "similarity_threshold": settings.semantic_cache_thresholds.get(
+                self.name, settings.LLM_SEMANTIC_CACHE_THRESHOLD
+            ),
+        }
+    
     def format_markdown_section(self, title: str, content: str) -> str:
         """Format a section with proper markdown."""
         return f"## {title}\n\n{content}\n\n"
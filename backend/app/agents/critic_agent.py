@@ -3,6 +3,7 @@ Critic Agent - Validates quality and completeness of agent outputs.
 Acts as a quality gate for the pipeline.
 """
 from app.agents.base_agent import BaseAgent
+from app.agents.prompt_builder import PromptBuilder
 
 
 class CriticAgent(BaseAgent):
@@ -46,19 +47,11 @@ If the content needs improvement, include "NEEDS REVISION" with specific feedbac
         content = kwargs.get("content", "")
         content_type = kwargs.get("content_type", "report")
         
-        return f"""# Quality Validation Request
-
-## Content Type
-{content_type}
-
-## Content to Evaluate
-{content}
-
----
+        return PromptBuilder().static("""# Quality Validation Request
 
 ## Evaluation Requirements
 
-Please evaluate the content above based on:
+Please evaluate the content given under "Content to Evaluate" based on:
 
 ### 1. Completeness Check
 - Are all expected sections present?
@@ -97,7 +90,11 @@ Please evaluate the content above based on:
 -
 
 #### Summary:
-Brief summary of the evaluation."""
+Brief summary of the evaluation.""").shared(f"""---
+
+## Content to Evaluate
+{content}""").request(f"""## Content Type
+{content_type}""").build()
     
     def validate_output(self, content: str) -> bool:
         """Validate critic output contains decision."""
@@ -3,6 +3,7 @@ Marketing Agent - Creates go-to-market strategies and marketing plans.
 Focuses on GTM strategy, regional insights, and sales positioning.
 """
 from app.agents.base_agent import BaseAgent
+from app.agents.prompt_builder import PromptBuilder
 
 
 class MarketingAgent(BaseAgent):
@@ -16,6 +17,8 @@ class MarketingAgent(BaseAgent):
     - Marketing channel recommendations
     """
     
+    similarity_fields = ("product_report", "research_report", "company_name")
+    
     def __init__(self):
         super().__init__(
             name="Marketing Agent",
@@ -56,27 +59,11 @@ Focus on strategies that:
         company_name = kwargs.get("company_name", "")
         domain = kwargs.get("domain", "")
         
-        return f"""# Marketing Strategy Request
-
-## Context
-Based on the research and product strategy provided below, create a comprehensive go-to-market strategy for the {domain} domain collaboration.
-
-## Company Focus
-**Primary Company**: {company_name}
-
-## Research Insights
-{research_report}
-
----
-
-## Product Strategy
-{product_report}
-
----
+        return PromptBuilder().static("""# Marketing Strategy Request
 
 ## Marketing Strategy Requirements
 
-Please provide a comprehensive marketing strategy covering:
+Based on the research, the product strategy and the company focus given at the end of this request, please provide a comprehensive go-to-market strategy covering:
 
 ### 1. Executive Summary
 - Overall marketing vision
@@ -188,7 +175,17 @@ For each channel, provide:
 - Reporting cadence
 
 ## Output Format
-Provide the marketing strategy in clean Markdown format with proper headers, bullet points, tables where appropriate, and clear sections."""
+Provide the marketing strategy in clean Markdown format with proper headers, bullet points, tables where appropriate, and clear sections.""").shared(f"""## Research Insights
+{research_report}
+
+---""").shared(f"""## Product Strategy
+{product_report}
+
+---""").request(f"""## Context
+Create the go-to-market strategy for the {domain} domain collaboration.
+
+## Company Focus
+**Primary Company**: {company_name}""").build()
     
     def validate_output(self, content: str) -> bool:
         """Validate marketing output meets minimum requirements."""
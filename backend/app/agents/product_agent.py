@@ -3,6 +3,7 @@ Product Agent - Generates product ideas based on research insights.
 Focuses on product ideation, USP definition, and feature planning.
 """
 from app.agents.base_agent import BaseAgent
+from app.agents.prompt_builder import PromptBuilder
 
 
 class ProductAgent(BaseAgent):
@@ -16,6 +17,8 @@ class ProductAgent(BaseAgent):
     - Innovation recommendations
     """
     
+    similarity_fields = ("research_report", "company_name")
+    
     def __init__(self):
         super().__init__(
             name="Product Agent",
@@ -54,22 +57,11 @@ Focus on creating products that:
         company_name = kwargs.get("company_name", "")
         domain = kwargs.get("domain", "")
         
-        return f"""# Product Ideation Request
-
-## Context
-Based on the research analysis provided below, generate innovative product ideas and strategies for collaboration in the {domain} domain.
-
-## Company Focus
-**Primary Company**: {company_name}
-
-## Research Insights
-{research_report}
-
----
+        return PromptBuilder().static("""# Product Ideation Request
 
 ## Product Strategy Requirements
 
-Please provide a comprehensive product strategy covering:
+Based on the research analysis and the company focus given at the end of this request, please provide a comprehensive product strategy covering:
 
 ### 1. Product Vision Statement
 - Overall vision for the collaborative product line
@@ -132,7 +124,12 @@ For each product concept, provide:
 - Patent/IP considerations
 
 ## Output Format
-Provide the product strategy in clean Markdown format with proper headers, bullet points, tables where appropriate, and clear sections."""
+Provide the product strategy in clean Markdown format with proper headers, bullet points, tables where appropriate, and clear sections.""").shared(f"""## Research Insights
+{research_report}""").request(f"""## Context
+Generate innovative product ideas and strategies for collaboration in the {domain} domain.
+
+## Company Focus
+**Primary Company**: {company_name}""").build()
     
     def validate_output(self, content: str) -> bool:
         """Validate product output meets minimum requirements."""
@@ -0,0 +1,77 @@
+"""
+Prompt assembly ordered for provider-side prefix caching.
+Static instructions come first, then large inputs shared across calls,
+then per-request values, so repeated calls share the longest prefix.
+"""
+import hashlib
+from typing import List, Tuple
+
+# Segment levels, from most static to most dynamic
+STATIC = 0
+SHARED = 1
+REQUEST = 2
+
+
+class AssembledPrompt(str):
+    """
+    Prompt text that also carries a fingerprint of its cacheable prefix.
+
+    Behaves as a plain string everywhere a prompt is expected.
+    """
+
+    prefix_fingerprint: str
+    prefix_length: int
+
+
+class PromptBuilder:
+    """
+    Collects prompt segments and joins them static-first.
+
+    Segments keep their insertion order within a level. The prefix is
+    everything before the first per-request segment.
+    """
+
+    def __init__(self):
+        self._segments: List[Tuple[int, str]] = []
+
+    def static(self, text: str) -> "PromptBuilder":
+        """Add instructions that never change for this agent."""
+        return self._add(STATIC, text)
+
+    def shared(self, text: str) -> "PromptBuilder":
+        """Add a large input reused across calls (e.g. an upstream report)."""
+        return self._add(SHARED, text)
+
+    def request(self, text: str) -> "PromptBuilder":
+        """Add per-request values (company names, domain)."""
+        return self._add(REQUEST, text)
+
+    def _add(self, level: int, text: str) -> "PromptBuilder":
+        self._segments.append((level, text.strip()))
+        return self
+
+    def build(self) -> AssembledPrompt:
+        """Join the segments and fingerprint the cacheable prefix."""
+        ordered = sorted(self._segments, key=lambda segment: segment[0])
+        prefix = "\n\n".join(text for level, text in ordered if level < REQUEST)
+        prompt = AssembledPrompt("\n\n".join(text for _, text in ordered))
+        prompt.prefix_fingerprint = hashlib.sha256(prefix.encode("utf-8")).hexdigest()[:16]
+        prompt.prefix_length = len(prefix)
+        return prompt
+
+
+def append_request(prompt: str, text: str) -> AssembledPrompt:
+    """
+    Add a per-request segment to the end of a built prompt.
+
+    The cacheable prefix is unchanged; a plain string is treated as
+    all prefix.
+    """
+    extended = AssembledPrompt(f"{prompt}\n\n{text.strip()}")
+    if isinstance(prompt, AssembledPrompt):
+        extended.prefix_fingerprint = prompt.prefix_fingerprint
+        extended.prefix_length = prompt.prefix_length
+    else:
+        extended.prefix_fingerprint = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+        extended.prefix_length = len(prompt)
+    return extended
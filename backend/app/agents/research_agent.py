@@ -1,8 +1,42 @@
 """
 Research Agent - Analyzes companies and collaboration opportunities.
 Consists of Current Business Analyst and Future Technology Strategist roles.
+
+Research can fan out into concurrent sub-analyses (one profile per
+company, domain trends, collaboration synthesis) that are merged into a
+single report.
 """
+import asyncio
+from dataclasses import dataclass, field, replace
+from typing import Any, AsyncIterator, Dict, List
+
 from app.agents.base_agent import BaseAgent
+from app.agents.prompt_builder import PromptBuilder
+from app.config import get_settings
+from app.services.llm_batch import gather_calls
+
+SUBTASK_SYSTEM_PROMPT = """You are an expert Business Research Analyst and Technology Strategist writing one section of a larger collaboration research report. Other analysts write the remaining sections in parallel, so cover only the section you are asked for.
+
+Your section must be:
+- Well-structured Markdown using #### headings for subsections (do not add a title; the report supplies it)
+- Data-driven with specific examples and metrics where available
+- Actionable for product and marketing teams
+- 400-600 words with at least 3 key data points"""
+
+
+@dataclass(frozen=True)
+class ResearchSubtask:
+    """One independently generated section of the research report."""
+    
+    part: str
+    heading: str
+    prompt: str
+    # Inputs identifying the subtask for the response caches
+    cache_inputs: Dict[str, Any] = field(default_factory=dict)
+
+
+def _subtask_prompt(instructions: str, context: str) -> str:
+    return PromptBuilder().static(instructions).request(context).build()
 
 
 class ResearchAgent(BaseAgent):
@@ -14,6 +48,8 @@ class ResearchAgent(BaseAgent):
     - Future Technology Strategist: Explore future technologies and opportunities
     """
     
+    similarity_fields = ("company_name", "partner_company")
+    
     def __init__(self):
         super().__init__(
             name="Research Agent",
@@ -51,20 +87,15 @@ Your output must be:
         partner_company = kwargs.get("partner_company", "")
         domain = kwargs.get("domain", "")
         
-        return f"""# Research Analysis Request
-
-## Companies Under Analysis
-- **Primary Company**: {company_name}
-- **Partner Company**: {partner_company}
-- **Industry Domain**: {domain}
+        return PromptBuilder().static("""# Research Analysis Request
 
 ## Research Requirements
 
-Please provide a comprehensive research report covering:
+Please provide a comprehensive research report on the companies and domain listed under "Companies Under Analysis" at the end of this request, covering:
 
 ### Part 1: Current Business Analysis
 
-#### {company_name} Profile
+#### Primary Company Profile
 - Company overview and history
 - Current product/service portfolio
 - Market position and competitive landscape
@@ -72,7 +103,7 @@ Please provide a comprehensive research report covering:
 - Technology stack and capabilities
 - Recent news and developments
 
-#### {partner_company} Profile
+#### Partner Company Profile
 - Company overview and history
 - Current product/service portfolio
 - Market position and competitive landscape
@@ -88,7 +119,7 @@ Please provide a comprehensive research report covering:
 
 ### Part 2: Future Technology Strategy
 
-#### {domain} Industry Trends
+#### Industry Trends in the Domain
 - Emerging technologies shaping the industry
 - Market size and growth projections
 - Key players and disruptors
@@ -107,7 +138,185 @@ Please provide a comprehensive research report covering:
 - Risk factors and mitigation strategies
 
 ## Output Format
-Provide the report in clean Markdown format with proper headers, bullet points, and sections. Include specific data points, statistics, and examples wherever possible."""
+Provide the report in clean Markdown format with proper headers, bullet points, and sections. Use the actual company and domain names in the headers. Include specific data points, statistics, and examples wherever possible.""").request(f"""## Companies Under Analysis
+- **Primary Company**: {company_name}
+- **Partner Company**: {partner_company}
+- **Industry Domain**: {domain}""").build()
+    
+    def build_subtasks(self, **kwargs) -> List[ResearchSubtask]:
+        """
+        Split the research request into independent sections, in report order.
+        
+        Reviewer feedback on a previous version is passed to every section.
+        """
+        feedback = kwargs.get("revision_feedback")
+        if feedback:
+            return [
+                replace(
+                    subtask,
+                    prompt=self.with_revision_feedback(subtask.prompt, feedback),
+                    cache_inputs={**subtask.cache_inputs, "revision_feedback": feedback},
+                )
+                for subtask in self.build_subtasks(**{**kwargs, "revision_feedback": None})
+            ]
+        
+        company_name = kwargs.get("company_name", "")
+        partner_company = kwargs.get("partner_company", "")
+        domain = kwargs.get("domain", "")
+        part_1 = "Part 1: Current Business Analysis"
+        part_2 = "Part 2: Future Technology Strategy"
+        companies = f"""## Companies Under Analysis
+- **Primary Company**: {company_name}
+- **Partner Company**: {partner_company}
+- **Industry Domain**: {domain}"""
+        pair_inputs = {"company_name": company_name, "partner_company": partner_company, "domain": domain}
+        
+        profile_instructions = """# Company Profile Request
+
+Write a current business profile of the company given at the end of this request, as it relates to the domain given there, covering:
+- Company overview and history
+- Current product/service portfolio
+- Market position and competitive landscape
+- Key financials (revenue, growth, market cap if public)
+- Technology stack and capabilities
+- Recent news and developments"""
+        
+        def profile(company: str) -> ResearchSubtask:
+            return ResearchSubtask(
+                part=part_1,
+                heading=f"{company} Profile",
+                prompt=_subtask_prompt(profile_instructions, f"""## Subject
+- **Company**: {company}
+- **Industry Domain**: {domain}"""),
+                cache_inputs={"section": "profile", "company_name": company, "domain": domain},
+            )
+        
+        return [
+            profile(company_name),
+            profile(partner_company),
+            ResearchSubtask(
+                part=part_1,
+                heading="Current Relationship Analysis",
+                prompt=_subtask_prompt("""# Relationship Analysis Request
+
+Analyze the current relationship between the two companies given at the end of this request, in the domain given there, covering:
+- Existing partnerships or collaborations (if any)
+- Competitive dynamics
+- Complementary capabilities
+- Shared customers or markets""", companies),
+                cache_inputs={"section": "relationship", **pair_inputs},
+            ),
+            ResearchSubtask(
+                part=part_2,
+                heading=f"{domain} Industry Trends",
+                prompt=_subtask_prompt("""# Industry Trends Request
+
+Write an analysis of the industry domain given at the end of this request, covering:
+- Emerging technologies shaping the industry
+- Market size and growth projections
+- Key players and disruptors
+- Regulatory landscape""", f"""## Subject
+- **Industry Domain**: {domain}"""),
+                cache_inputs={"section": "trends", "domain": domain},
+            ),
+            ResearchSubtask(
+                part=part_2,
+                heading="Collaboration Synthesis",
+                prompt=_subtask_prompt("""# Collaboration Synthesis Request
+
+Analyze the collaboration potential of the two companies given at the end of this request, in the domain given there. Use these subsections:
+
+#### Collaboration Opportunities
+- Technology synergies between both companies
+- Joint product/service possibilities
+- Market expansion opportunities
+- R&D collaboration potential
+
+#### Strategic Recommendations
+- Short-term collaboration opportunities (0-12 months)
+- Medium-term strategic initiatives (1-3 years)
+- Long-term partnership vision (3-5 years)
+- Risk factors and mitigation strategies""", companies),
+                cache_inputs={"section": "synthesis", **pair_inputs},
+            ),
+        ]
+    
+    def report_title(self, **kwargs) -> str:
+        """Title block of a merged research report."""
+        return (
+            f"# Research Report: {kwargs.get('company_name', '')} & {kwargs.get('partner_company', '')}\n\n"
+            f"**Industry Domain**: {kwargs.get('domain', '')}\n"
+        )
+    
+    def merge_sections(self, subtasks: List[ResearchSubtask], sections: List[str], **kwargs) -> str:
+        """Assemble generated sections into one report with the single-call structure."""
+        parts = [self.report_title(**kwargs)]
+        current_part = None
+        for subtask, content in zip(subtasks, sections):
+            parts.append(self._section_header(subtask, current_part) + content.strip() + "\n")
+            current_part = subtask.part
+        return "".join(parts)
+    
+    @staticmethod
+    def _section_header(subtask: ResearchSubtask, current_part: Any) -> str:
+        header = f"\n## {subtask.part}\n" if subtask.part != current_part else ""
+        return f"{header}\n### {subtask.heading}\n\n"
+    
+    async def generate(self, **kwargs) -> str:
+        """Generate every section concurrently and merge them (one call if fan-out is off)."""
+        if not get_settings().RESEARCH_FAN_OUT_ENABLED:
+            return await super().generate(**kwargs)
+        
+        subtasks = self.build_subtasks(**kwargs)
+        sections = await gather_calls(*(self.generate_section(subtask) for subtask in subtasks))
+        return self.merge_sections(subtasks, sections, **kwargs)
+    
+    async def generate_section(self, subtask: ResearchSubtask) -> str:
+        """Generate one section of the research report."""
+        return await self._complete(
+            subtask.prompt,
+            SUBTASK_SYSTEM_PROMPT,
+            **self.similarity_params(**subtask.cache_inputs),
+        )
+    
+    async def generate_stream(self, **kwargs) -> AsyncIterator[str]:
+        """
+        Stream the merged report in section order.
+        
+        All sections are generated concurrently; the section being emitted
+        streams live while later ones buffer until their turn.
+        """
+        if not get_settings().RESEARCH_FAN_OUT_ENABLED:
+            async for chunk in super().generate_stream(**kwargs):
+                yield chunk
+            return
+        
+        subtasks = self.build_subtasks(**kwargs)
+        queues: List[asyncio.Queue] = [asyncio.Queue() for _ in subtasks]
+        
+        async def pump(subtask: ResearchSubtask, queue: asyncio.Queue) -> None:
+            try:
+                async for chunk in self._complete_stream(subtask.prompt, SUBTASK_SYSTEM_PROMPT):
+                    queue.put_nowait(chunk)
+            finally:
+                queue.put_nowait(None)
+        
+        tasks = [asyncio.create_task(pump(s, q)) for s, q in zip(subtasks, queues)]
+        try:
+            yield self.report_title(**kwargs)
+            current_part = None
+            for subtask, queue, task in zip(subtasks, queues, tasks):
+                yield self._section_header(subtask, current_part)
+                current_part = subtask.part
+                while (chunk := await queue.get()) is not None:
+                    yield chunk
+                # Surfaces the section's error, if it failed
+                await task
+                yield "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
     
     def validate_output(self, content: str) -> bool:
         """Validate research output meets minimum requirements."""
@@ -15,6 +15,9 @@ from app.utils.exceptions import (
     LLMAPIError,
     ValidationError,
     ReportNotFoundError,
+    JobNotFoundError,
+    BatchNotFoundError,
+    QueueFullError,
     StorageError,
     RateLimitError,
     TimeoutError,
@@ -132,6 +135,9 @@ def register_exception_handlers(app: FastAPI) -> None:
     app.add_exception_handler(LLMAPIError, collabgen_exception_handler)
     app.add_exception_handler(ValidationError, collabgen_exception_handler)
     app.add_exception_handler(ReportNotFoundError, collabgen_exception_handler)
+    app.add_exception_handler(JobNotFoundError, collabgen_exception_handler)
+    app.add_exception_handler(BatchNotFoundError, collabgen_exception_handler)
+    app.add_exception_handler(QueueFullError, collabgen_exception_handler)
     app.add_exception_handler(StorageError, collabgen_exception_handler)
     app.add_exception_handler(RateLimitError, collabgen_exception_handler)
     app.add_exception_handler(TimeoutError, collabgen_exception_handler)
@@ -4,6 +4,7 @@ from fastapi import APIRouter
 from app.api.routes.pipeline import router as pipeline_router
 from app.api.routes.agents import router as agents_router
 from app.api.routes.reports import router as reports_router
+from app.api.routes.jobs import router as jobs_router
 from app.api.routes.health import router as health_router
 
 # Main router that includes all sub-routers
@@ -13,6 +14,7 @@ api_router = APIRouter()
 api_router.include_router(pipeline_router)
 api_router.include_router(agents_router)
 api_router.include_router(reports_router)
+api_router.include_router(jobs_router)
 api_router.include_router(health_router)
 
 __all__ = ["api_router"]
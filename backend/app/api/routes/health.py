@@ -55,6 +55,9 @@ async def health_check() -> HealthResponse:
     - LLM API connectivity
     - Storage availability
     - Memory usage
+    
+    LLM and storage status come from recent call outcomes, so probing
+    this endpoint spends no tokens and writes no files.
     """
     settings = get_settings()
     
@@ -145,6 +148,20 @@ async def readiness() -> dict:
     }
 
 
+@router.get(
+    "/health/llm",
+    summary="LLM Client Statistics",
+    description="Client-side LLM statistics: cache, limiter, rate budgets, circuit breaker and connection pool.",
+)
+async def llm_stats() -> dict:
+    """
+    LLM client statistics.
+    
+    Reads in-process counters only; no API call is made.
+    """
+    return get_llm_service().stats
+
+
 @router.get(
     "/metrics",
     summary="Prometheus Metrics",
@@ -0,0 +1,120 @@
+"""
+Pipeline Job API endpoints.
+Queues pipeline runs for background workers and reports their progress.
+"""
+from fastapi import APIRouter, Depends, Query, Response
+
+from app.api.middleware import verify_api_key
+from app.models.requests import PipelineRequest
+from app.models.responses import JobQueueStats, PipelineJob
+from app.services.job_queue import get_job_queue
+
+router = APIRouter(prefix="/api/v1/jobs", tags=["Jobs"])
+
+
+@router.post(
+    "",
+    response_model=PipelineJob,
+    status_code=202,
+    summary="Submit Pipeline Job",
+    description="""
+    Queue a pipeline run and return immediately with a job ID.
+
+    Poll `GET /api/v1/jobs/{job_id}` (optionally with `wait` to long-poll)
+    for the result. Returns 503 when the queue is full.
+    """,
+    responses={
+        202: {"description": "Job queued"},
+        400: {"description": "Invalid input parameters"},
+        401: {"description": "Invalid or missing API key"},
+        503: {"description": "Job queue is full"},
+    },
+)
+async def submit_job(
+    request: PipelineRequest,
+    response: Response,
+    api_key: str = Depends(verify_api_key),
+) -> PipelineJob:
+    """
+    Submit a pipeline job.
+
+    - **company_name**: Primary company to analyze
+    - **partner_company**: Partner company for collaboration
+    - **domain**: Technology domain
+    """
+    job = await get_job_queue().submit(request)
+    response.headers["Location"] = f"{router.prefix}/{job.job_id}"
+    return job
+
+
+@router.get(
+    "/queue",
+    response_model=JobQueueStats,
+    summary="Get Job Queue Statistics",
+    description="Queue depth, running jobs and retained jobs by status.",
+    responses={
+        200: {"description": "Statistics retrieved successfully"},
+        401: {"description": "Invalid or missing API key"},
+    },
+)
+async def get_queue_stats(
+    api_key: str = Depends(verify_api_key),
+) -> JobQueueStats:
+    """Get job queue statistics."""
+    return get_job_queue().stats
+
+
+@router.get(
+    "/{job_id}",
+    response_model=PipelineJob,
+    summary="Get Pipeline Job",
+    description="""
+    Get a job's status, and its pipeline result once finished.
+
+    With `wait`, the request is held until the job finishes or `wait`
+    seconds pass (capped by JOB_LONG_POLL_MAX_SECONDS).
+    """,
+    responses={
+        200: {"description": "Job retrieved successfully"},
+        401: {"description": "Invalid or missing API key"},
+        404: {"description": "Job not found or expired"},
+    },
+)
+async def get_job(
+    job_id: str,
+    wait: float = Query(default=0.0, ge=0.0, description="Seconds to wait for the job to finish"),
+    api_key: str = Depends(verify_api_key),
+) -> PipelineJob:
+    """
+    Get a pipeline job.
+
+    - **job_id**: ID returned when the job was submitted
+    - **wait**: Long-poll timeout in seconds (default: 0)
+    """
+    job_queue = get_job_queue()
+    if wait > 0:
+        return await job_queue.wait(job_id, timeout=wait)
+    return await job_queue.get(job_id)
+
+
+@router.delete(
+    "/{job_id}",
+    response_model=PipelineJob,
+    summary="Cancel Pipeline Job",
+    description="Cancel a queued or running job. Finished jobs are returned unchanged.",
+    responses={
+        200: {"description": "Job cancelled"},
+        401: {"description": "Invalid or missing API key"},
+        404: {"description": "Job not found or expired"},
+    },
+)
+async def cancel_job(
+    job_id: str,
+    api_key: str = Depends(verify_api_key),
+) -> PipelineJob:
+    """
+    Cancel a pipeline job.
+
+    - **job_id**: ID returned when the job was submitted
+    """
+    return await get_job_queue().cancel(job_id)
@@ -2,20 +2,34 @@
 Pipeline API endpoints.
 Handles the main agent pipeline execution.
 """
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
 from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
 from app.api.middleware import verify_api_key, get_rate_limit_key
 from app.config import get_settings
-from app.models.requests import PipelineRequest
-from app.models.responses import PipelineResponse
+from app.models.requests import BatchPipelineRequest, PipelineRequest
+from app.models.responses import BatchPipelineStatus, PipelineResponse
+from app.services.batch_planner import get_batch_pipeline_service
+from app.services.job_queue import get_job_queue
 from app.services.pipeline_service import get_pipeline_orchestrator
+from app.utils.logging import get_logger
 
 router = APIRouter(prefix="/api/v1", tags=["Pipeline"])
 
 settings = get_settings()
 limiter = Limiter(key_func=get_rate_limit_key)
+logger = get_logger(__name__)
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Format a Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
 
 
 @router.post(
@@ -29,6 +43,11 @@ limiter = Limiter(key_func=get_rate_limit_key)
     3. Marketing Agent - Creates go-to-market strategies
     
     The pipeline runs sequentially, with each agent's output feeding into the next.
+    
+    The run goes through the job queue, so it shares the JOB_WORKERS bound
+    with `POST /api/v1/jobs`; the connection is held until it finishes.
+    Returns 503 when the queue is full. Prefer `POST /api/v1/jobs` for
+    new clients.
     """,
     responses={
         200: {"description": "Pipeline executed successfully"},
@@ -36,7 +55,7 @@ limiter = Limiter(key_func=get_rate_limit_key)
         401: {"description": "Invalid or missing API key"},
         429: {"description": "Rate limit exceeded"},
         500: {"description": "Internal server error"},
-        503: {"description": "LLM service unavailable"},
+        503: {"description": "LLM service unavailable or job queue full"},
         504: {"description": "Pipeline execution timeout"},
     },
 )
@@ -47,9 +66,139 @@ async def run_pipeline(
     """
     Run the complete agent pipeline.
     
+    - **company_name**: Primary company for analysis (1-100 chars)
+    - **partner_company**: Partner company for collaboration analysis (1-100 chars)
+    - **domain**: Industry domain (from whitelist: XR, AI, Robotics, etc.)
+    
+    Kept synchronous for existing clients, which expect the PipelineResponse
+    in the reply. The run is still queued as a job, so these requests wait
+    for a worker instead of each starting a pipeline of their own.
+    """
+    return await get_job_queue().run(request)
+
+
+@router.post(
+    "/run-pipeline/stream",
+    summary="Run Full Agent Pipeline (Streaming)",
+    description="""
+    Execute the complete agent pipeline and stream progress as Server-Sent Events.
+    
+    Events:
+    - `pipeline_started`: report ID assigned
+    - `stage_started` / `stage_completed` / `stage_failed`: stage transitions
+    - `token`: generated text for the running stage
+    - `completed`: the final pipeline response
+    - `error`: the pipeline failed unexpectedly
+    """,
+    responses={
+        200: {
+            "description": "Event stream",
+            "content": {"text/event-stream": {}},
+        },
+        400: {"description": "Invalid request parameters"},
+        401: {"description": "Invalid or missing API key"},
+        429: {"description": "Rate limit exceeded"},
+    },
+)
+async def run_pipeline_stream(
+    request: PipelineRequest,
+    api_key: str = Depends(verify_api_key),
+) -> StreamingResponse:
+    """
+    Run the complete agent pipeline, streaming tokens and stage transitions.
+    
     - **company_name**: Primary company for analysis (1-100 chars)
     - **partner_company**: Partner company for collaboration analysis (1-100 chars)
     - **domain**: Industry domain (from whitelist: XR, AI, Robotics, etc.)
     """
     pipeline = get_pipeline_orchestrator()
-    return await pipeline.run_pipeline(request)
+    
+    async def event_stream() -> AsyncIterator[str]:
+        queue: "asyncio.Queue[Optional[Tuple[str, Dict[str, Any]]]]" = asyncio.Queue()
+        
+        async def on_event(event: str, data: Dict[str, Any]) -> None:
+            await queue.put((event, data))
+        
+        task = asyncio.create_task(pipeline.run_pipeline(request, on_event=on_event))
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+        
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                yield format_sse(*item)
+            
+            try:
+                response = task.result()
+            except Exception as e:
+                logger.error("Streaming pipeline failed", error=str(e))
+                yield format_sse("error", {"message": "Pipeline execution failed"})
+            else:
+                yield format_sse("completed", response.model_dump(mode="json"))
+        finally:
+            # Client disconnected before the pipeline finished
+            if not task.done():
+                task.cancel()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post(
+    "/batch-pipeline",
+    response_model=BatchPipelineStatus,
+    status_code=202,
+    summary="Run a Batch of Pipelines",
+    description="""
+    Run the pipeline for many (company, partner, domain) items in the background.
+    
+    The batch is planned as one task graph: identical items share a run,
+    and research sections common to several items (a company's profile in
+    a domain, a domain's industry trends) are generated once and reused in
+    every report that needs them. Poll `GET /api/v1/batch-pipeline/{batch_id}`
+    for per-item progress; each finished item links to its saved report.
+    """,
+    responses={
+        202: {"description": "Batch planned and started"},
+        400: {"description": "Invalid request parameters"},
+        401: {"description": "Invalid or missing API key"},
+        429: {"description": "Rate limit exceeded"},
+    },
+)
+async def run_batch_pipeline(
+    request: BatchPipelineRequest,
+    api_key: str = Depends(verify_api_key),
+) -> BatchPipelineStatus:
+    """
+    Start a batch of pipeline runs.
+    
+    - **items**: List of {company_name, partner_company, domain} (at most BATCH_PIPELINE_MAX_ITEMS)
+    """
+    return await get_batch_pipeline_service().submit(request.items)
+
+
+@router.get(
+    "/batch-pipeline/{batch_id}",
+    response_model=BatchPipelineStatus,
+    summary="Get Batch Pipeline Progress",
+    description="Get the plan, LLM usage and per-item progress of a batch.",
+    responses={
+        200: {"description": "Batch retrieved successfully"},
+        401: {"description": "Invalid or missing API key"},
+        404: {"description": "Batch not found or expired"},
+    },
+)
+async def get_batch_pipeline(
+    batch_id: str,
+    api_key: str = Depends(verify_api_key),
+) -> BatchPipelineStatus:
+    """
+    Get a batch's progress.
+    
+    - **batch_id**: ID returned when the batch was started
+    """
+    return get_batch_pipeline_service().get(batch_id)
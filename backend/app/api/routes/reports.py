@@ -1,6 +1,6 @@
 """
 Report Management API endpoints.
-Handles report listing, retrieval, download, and deletion.
+Handles report listing, retrieval, download, deletion, and resuming.
 """
 from typing import Optional
 from fastapi import APIRouter, Depends, Query
@@ -8,7 +8,8 @@ from fastapi.responses import Response
 
 from app.api.middleware import verify_api_key
 from app.models.requests import ReportQuery
-from app.models.responses import ReportListResponse, ReportDetail
+from app.models.responses import PipelineResponse, ReportListResponse, ReportDetail
+from app.services.pipeline_service import get_pipeline_orchestrator
 from app.services.report_service import get_report_service
 
 router = APIRouter(prefix="/api/v1/reports", tags=["Reports"])
@@ -125,6 +126,37 @@ async def download_report(
     )
 
 
+@router.post(
+    "/{report_id}/resume",
+    response_model=PipelineResponse,
+    summary="Resume Report Pipeline",
+    description="""
+    Re-run the failed or skipped stages of a report.
+    
+    Completed sections are reused from the report's checkpoint; only the
+    first stage that did not complete, and the stages after it, run again.
+    """,
+    responses={
+        200: {"description": "Pipeline resumed successfully"},
+        400: {"description": "Invalid report ID format"},
+        401: {"description": "Invalid or missing API key"},
+        404: {"description": "Report not found"},
+        503: {"description": "LLM service unavailable"},
+    },
+)
+async def resume_report(
+    report_id: str,
+    api_key: str = Depends(verify_api_key),
+) -> PipelineResponse:
+    """
+    Resume a failed or partial report.
+    
+    - **report_id**: UUID of the report
+    """
+    pipeline = get_pipeline_orchestrator()
+    return await pipeline.resume_pipeline(report_id)
+
+
 @router.delete(
     "/{report_id}",
     status_code=204,
@@ -2,8 +2,9 @@
 Application configuration with environment variable validation.
 Uses Pydantic Settings for type-safe configuration management.
 """
+import json
 from functools import lru_cache
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings
 
@@ -24,6 +25,7 @@ class Settings(BaseSettings):
     # API Keys
     OPENAI_API_KEY: str = Field(..., description="OpenAI API key for GPT-4")
     OPENAI_MODEL: str = Field(default="gpt-4-turbo-preview", description="OpenAI model to use")
+    OPENAI_BASE_URL: Optional[str] = Field(default=None, description="OpenAI-compatible API base URL")
     API_KEY_SECRET: str = Field(default="collabgen-secret-key", description="Secret for hashing API keys")
     
     # Valid API Keys (comma-separated in env)
@@ -40,16 +42,119 @@ class Settings(BaseSettings):
     TIMEOUT_MARKETING_AGENT: int = 90
     TIMEOUT_PIPELINE: int = 300
     TIMEOUT_LLM_REQUEST: int = 60
+    TIMEOUT_STAGE_MIN_REMAINING: int = 10
+    TIMEOUT_CRITIC_AGENT: int = 60
+    
+    # Quality Gate (critic scores each section while the next stage runs)
+    PIPELINE_QUALITY_GATE_ENABLED: bool = False
+    PIPELINE_QUALITY_GATE_MAX_REVISIONS: int = Field(default=1, ge=0)
     
     # Retry Configuration
     MAX_RETRIES: int = 3
     RETRY_INITIAL_DELAY: float = 1.0
     RETRY_MAX_DELAY: float = 30.0
     RETRY_BACKOFF_FACTOR: int = 2
+    RETRY_BUDGET_RATIO: float = 0.1
+    RETRY_BUDGET_MIN_RETRIES: int = 10
+    RETRY_BUDGET_WINDOW_SECONDS: float = 10.0
     
     # Circuit Breaker
     CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = 5
     CIRCUIT_BREAKER_RECOVERY_TIMEOUT: int = 60
+    CIRCUIT_BREAKER_ERROR_RATE: float = 0.5
+    CIRCUIT_BREAKER_WINDOW_SECONDS: int = 60
+    CIRCUIT_BREAKER_HALF_OPEN_MAX_CALLS: int = 1
+    
+    # LLM Response Cache
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_TTL_SECONDS: int = 86400
+    LLM_CACHE_MAX_MEMORY_MB: int = 64
+    LLM_CACHE_DISK_ENABLED: bool = True
+    LLM_CACHE_DIRECTORY: str = "./cache"
+    
+    # LLM Semantic (near-duplicate) Cache (opt-in)
+    LLM_SEMANTIC_CACHE_ENABLED: bool = False
+    LLM_SEMANTIC_CACHE_THRESHOLD: float = 0.85
+    LLM_SEMANTIC_CACHE_AGENT_THRESHOLDS: str = Field(
+        default="", description="JSON object mapping agent name to similarity threshold"
+    )
+    LLM_SEMANTIC_CACHE_MAX_ENTRIES: int = 5000
+    
+    # LLM Concurrency Limiter (AIMD, one per backend)
+    LLM_CONCURRENCY_INITIAL: int = 4
+    LLM_CONCURRENCY_MIN: int = 1
+    LLM_CONCURRENCY_MAX: int = 32
+    LLM_CONCURRENCY_LATENCY_TOLERANCE: float = 2.0
+    LLM_CONCURRENCY_MAX_WAIT: float = 30.0
+    
+    # LLM Backend Pool (JSON list; empty uses OPENAI_API_KEY / OPENAI_BASE_URL)
+    LLM_BACKENDS: str = Field(default="", description="JSON list of {name, api_key, base_url, model, rpm, tpm, max_concurrency}")
+    LLM_BACKEND_DRAIN_SECONDS: float = 30.0
+    
+    # LLM Token Budgeting (context window 0 = infer from model name)
+    LLM_CONTEXT_WINDOW: int = 0
+    LLM_MIN_OUTPUT_TOKENS: int = 256
+    
+    # Hedged LLM Requests (opt-in)
+    LLM_HEDGING_ENABLED: bool = False
+    LLM_HEDGE_PERCENTILE: float = 95.0
+    LLM_HEDGE_BUDGET_PERCENT: float = 10.0
+    LLM_HEDGE_MIN_SAMPLES: int = 20
+    
+    # Offline Batch Execution
+    LLM_BATCH_BACKEND: str = Field(default="local", pattern="^(local|openai)$")
+    LLM_BATCH_DIRECTORY: str = "./batches"
+    LLM_BATCH_POLL_INTERVAL: float = 30.0
+    LLM_BATCH_COMPLETION_WINDOW: str = "24h"
+    LLM_BATCH_MAX_REQUESTS: int = 50000
+    LLM_BATCH_LOCAL_CONCURRENCY: int = 4
+    LLM_BATCH_TIMEOUT: int = 86400
+    
+    # LLM HTTP Connection Pool
+    LLM_HTTP_MAX_CONNECTIONS: int = 20
+    LLM_HTTP_MAX_KEEPALIVE: int = 10
+    LLM_HTTP_KEEPALIVE_EXPIRY: float = 120.0
+    LLM_HTTP_CONNECT_TIMEOUT: float = 10.0
+    LLM_HTTP2_ENABLED: bool = True
+    LLM_HTTP_WARMUP_CONNECTIONS: int = 2
+    LLM_HTTP_WARMUP_TIMEOUT: float = 5.0
+    
+    # LLM Record/Replay Transport (live, record or replay)
+    LLM_TRANSPORT_MODE: str = Field(default="live", pattern="^(live|record|replay)$")
+    LLM_CASSETTE_PATH: str = "./cassettes/llm.jsonl"
+    LLM_CASSETTE_KEY: str = "exact"  # exact, prompt or package.module:function
+    LLM_REPLAY_LATENCY_SCALE: float = Field(default=1.0, ge=0)
+    
+    # Provider Rate Budgets (per backend unless set on the LLM_BACKENDS entry; 0 disables)
+    LLM_RATE_LIMIT_RPM: int = 0
+    LLM_RATE_LIMIT_TPM: int = 0
+    LLM_RATE_LIMIT_MAX_WAIT: float = 60.0
+    
+    # Health Checks (passive, from live traffic; probe only when idle)
+    HEALTH_WINDOW_SECONDS: float = 60.0
+    HEALTH_FAILURE_THRESHOLD: float = Field(default=0.5, gt=0, le=1)
+    HEALTH_PROBE_STALENESS_SECONDS: float = 30.0
+    HEALTH_PROBE_TIMEOUT: float = 5.0
+    
+    # Research Fan-out (company profiles, domain trends and synthesis as concurrent calls)
+    RESEARCH_FAN_OUT_ENABLED: bool = True
+    
+    # Pipeline Job Queue (asynchronous /jobs endpoints)
+    JOB_WORKERS: int = Field(default=2, ge=1)
+    JOB_QUEUE_MAX_DEPTH: int = Field(default=100, ge=1)
+    JOB_RETENTION_SECONDS: float = 3600.0
+    JOB_LONG_POLL_MAX_SECONDS: float = 30.0
+    
+    # Durable Job Store (SQLite WAL; jobs survive restarts)
+    JOB_STORE_ENABLED: bool = True
+    JOB_STORE_DIRECTORY: str = "./jobs"
+    JOB_LEASE_SECONDS: float = Field(default=60.0, gt=0)
+    JOB_HEARTBEAT_SECONDS: float = Field(default=15.0, gt=0)
+    
+    # Batch Pipeline Endpoint (shared research sections across many pairs)
+    BATCH_PIPELINE_MAX_ITEMS: int = Field(default=100, ge=1)
+    BATCH_PIPELINE_CONCURRENCY: int = Field(default=4, ge=1)
+    BATCH_PIPELINE_RETENTION_SECONDS: float = 3600.0
     
     # Storage
     REPORTS_DIRECTORY: str = "./reports"
@@ -71,6 +176,18 @@ class Settings(BaseSettings):
     def parse_api_keys(cls, v: str) -> str:
         return v.strip() if v else ""
     
+    @field_validator("LLM_BACKENDS")
+    @classmethod
+    def validate_llm_backends(cls, v: str) -> str:
+        if not v.strip():
+            return ""
+        backends = json.loads(v)
+        if not isinstance(backends, list) or not all(
+            isinstance(b, dict) and b.get("api_key") for b in backends
+        ):
+            raise ValueError("LLM_BACKENDS must be a JSON list of objects with an api_key")
+        return v
+    
     @property
     def valid_api_keys_list(self) -> List[str]:
         """Get list of valid API keys."""
@@ -83,6 +200,28 @@ class Settings(BaseSettings):
         """Get list of CORS origins."""
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",") if origin.strip()]
     
+    @property
+    def semantic_cache_thresholds(self) -> Dict[str, float]:
+        """Get per-agent semantic cache thresholds."""
+        if not self.LLM_SEMANTIC_CACHE_AGENT_THRESHOLDS.strip():
+            return {}
+        return {
+            name: float(value)
+            for name, value in json.loads(self.LLM_SEMANTIC_CACHE_AGENT_THRESHOLDS).items()
+        }
+    
+    @property
+    def llm_backends_list(self) -> List[Dict[str, Any]]:
+        """Get LLM backend definitions, defaulting to the single OpenAI key."""
+        if self.LLM_BACKENDS:
+            return json.loads(self.LLM_BACKENDS)
+        return [{
+            "name": "default",
+            "api_key": self.OPENAI_API_KEY,
+            "base_url": self.OPENAI_BASE_URL,
+            "model": self.OPENAI_MODEL,
+        }]
+    
     @property
     def allowed_domains_list(self) -> List[str]:
         """Get list of allowed domains."""
@@ -16,6 +16,9 @@ from app.api import (
     register_exception_handlers,
     limiter,
 )
+from app.services.llm_service import get_llm_service
+from app.services.batch_planner import get_batch_pipeline_service
+from app.services.job_queue import get_job_queue
 from app.utils.logging import setup_logging, get_logger
 
 
@@ -36,10 +39,20 @@ async def lifespan(app: FastAPI):
     )
     
     # Startup tasks
+    llm_service = get_llm_service()
+    await llm_service.warm_up()
+    job_queue = get_job_queue()
+    # Pick up jobs a stopped or crashed instance left behind
+    await job_queue.recover()
+    job_queue.start()
+    
     yield
     
     # Shutdown tasks
     logger.info("Application shutting down")
+    await job_queue.stop()
+    await get_batch_pipeline_service().stop()
+    await llm_service.close()
 
 
 def create_app() -> FastAPI:
@@ -1,6 +1,7 @@
 """Models package."""
 from app.models.requests import (
     PipelineRequest,
+    BatchPipelineRequest,
     ResearchAgentRequest,
     ProductAgentRequest,
     MarketingAgentRequest,
@@ -10,9 +11,15 @@ from app.models.responses import (
     ErrorResponse,
     AgentResponse,
     SectionStatus,
+    UsageMetrics,
     PipelineMetadata,
     PipelineSections,
     PipelineResponse,
+    PipelineJob,
+    JobQueueStats,
+    BatchPipelineItem,
+    BatchPlanStats,
+    BatchPipelineStatus,
     ReportSummary,
     ReportDetail,
     ReportListResponse,
@@ -23,6 +30,7 @@ from app.models.responses import (
 __all__ = [
     # Requests
     "PipelineRequest",
+    "BatchPipelineRequest",
     "ResearchAgentRequest",
     "ProductAgentRequest",
     "MarketingAgentRequest",
@@ -31,9 +39,15 @@ __all__ = [
     "ErrorResponse",
     "AgentResponse",
     "SectionStatus",
+    "UsageMetrics",
     "PipelineMetadata",
     "PipelineSections",
     "PipelineResponse",
+    "PipelineJob",
+    "JobQueueStats",
+    "BatchPipelineItem",
+    "BatchPlanStats",
+    "BatchPipelineStatus",
     "ReportSummary",
     "ReportDetail",
     "ReportListResponse",
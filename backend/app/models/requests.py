@@ -3,7 +3,7 @@ Pydantic models for API request validation.
 Implements strict validation rules as per specification.
 """
 import re
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, Field, field_validator
 
 from app.config import get_settings
@@ -52,6 +52,25 @@ class PipelineRequest(BaseModel):
         return v
 
 
+class BatchPipelineRequest(BaseModel):
+    """Request model for a batch of pipeline runs."""
+    
+    items: List[PipelineRequest] = Field(
+        ...,
+        min_length=1,
+        description="(company, partner, domain) items to run"
+    )
+    
+    @field_validator("items")
+    @classmethod
+    def validate_items(cls, v: List[PipelineRequest]) -> List[PipelineRequest]:
+        """Validate batch size against the configured maximum."""
+        settings = get_settings()
+        if len(v) > settings.BATCH_PIPELINE_MAX_ITEMS:
+            raise ValueError(f"A batch may contain at most {settings.BATCH_PIPELINE_MAX_ITEMS} items")
+        return v
+
+
 class ResearchAgentRequest(BaseModel):
     """Request model for the Research Agent."""
     
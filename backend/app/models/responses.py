@@ -34,6 +34,19 @@ class SectionStatus(BaseModel):
     status: Literal["completed", "failed", "skipped"] = Field(...)
     content: str = Field(default="")
     error: Optional[str] = Field(default=None)
+    quality_score: Optional[int] = Field(default=None, description="Critic score (1-10) in quality-gated mode")
+    revisions: int = Field(default=0, description="Times the critic sent the section back")
+
+
+class UsageMetrics(BaseModel):
+    """LLM usage for a pipeline or a single stage."""
+    
+    prompt_tokens: int = Field(default=0)
+    completion_tokens: int = Field(default=0)
+    total_tokens: int = Field(default=0)
+    cached_tokens: int = Field(default=0, description="Prompt tokens served from the provider's prompt cache")
+    llm_calls: int = Field(default=0)
+    llm_time_ms: float = Field(default=0)
 
 
 class PipelineMetadata(BaseModel):
@@ -42,6 +55,8 @@ class PipelineMetadata(BaseModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     execution_time_ms: float = Field(...)
     tokens_used: int = Field(default=0)
+    usage: UsageMetrics = Field(default_factory=UsageMetrics)
+    stage_usage: Dict[str, UsageMetrics] = Field(default_factory=dict, description="Usage per stage")
 
 
 class PipelineSections(BaseModel):
@@ -62,6 +77,74 @@ class PipelineResponse(BaseModel):
     metadata: PipelineMetadata
 
 
+class PipelineJob(BaseModel):
+    """An asynchronous pipeline run submitted through the job queue."""
+    
+    job_id: str = Field(...)
+    status: Literal["queued", "running", "completed", "failed", "cancelled"] = Field(...)
+    company_name: str = Field(...)
+    partner_company: str = Field(...)
+    domain: str = Field(...)
+    created_at: datetime = Field(...)
+    started_at: Optional[datetime] = Field(default=None)
+    finished_at: Optional[datetime] = Field(default=None)
+    queue_position: Optional[int] = Field(default=None, description="Jobs ahead of this one while queued")
+    report_id: Optional[str] = Field(default=None, description="Report the job writes")
+    completed_stages: List[str] = Field(default_factory=list, description="Stages checkpointed so far")
+    attempts: int = Field(default=0, description="Times the job was reclaimed after an interrupted run")
+    error: Optional[str] = Field(default=None)
+    result: Optional[PipelineResponse] = Field(default=None, description="Pipeline response once finished")
+
+
+class JobQueueStats(BaseModel):
+    """Pipeline job queue gauges."""
+    
+    queue_depth: int = Field(..., description="Jobs waiting for a worker")
+    max_depth: int = Field(...)
+    running: int = Field(...)
+    workers: int = Field(...)
+    jobs: Dict[str, int] = Field(default_factory=dict, description="Retained jobs by status")
+
+
+class BatchPipelineItem(BaseModel):
+    """Progress of one item of a batch pipeline run."""
+    
+    index: int = Field(..., description="Position of the item in the request")
+    company_name: str = Field(...)
+    partner_company: str = Field(...)
+    domain: str = Field(...)
+    status: Literal["pending", "running", "completed", "partial", "failed"] = Field(...)
+    completed_stages: List[str] = Field(default_factory=list)
+    report_id: Optional[str] = Field(default=None)
+    error: Optional[str] = Field(default=None)
+    duplicate_of: Optional[int] = Field(
+        default=None,
+        description="Index of an identical earlier item whose run this item shares",
+    )
+
+
+class BatchPlanStats(BaseModel):
+    """Deduplication achieved by a batch plan."""
+    
+    items: int = Field(...)
+    unique_pipelines: int = Field(..., description="Pipelines run after merging identical items")
+    research_sections: int = Field(..., description="Distinct research sections generated")
+    research_sections_requested: int = Field(..., description="Research sections without sharing")
+
+
+class BatchPipelineStatus(BaseModel):
+    """A batch pipeline run and the progress of its items."""
+    
+    batch_id: str = Field(...)
+    status: Literal["running", "completed"] = Field(...)
+    created_at: datetime = Field(...)
+    finished_at: Optional[datetime] = Field(default=None)
+    completed_items: int = Field(..., description="Items that finished, whatever their outcome")
+    plan: BatchPlanStats = Field(...)
+    usage: UsageMetrics = Field(default_factory=UsageMetrics, description="LLM usage of the whole batch so far")
+    items: List[BatchPipelineItem] = Field(...)
+
+
 class ReportSummary(BaseModel):
     """Summary of a stored report."""
     
@@ -87,6 +170,8 @@ class ReportDetail(BaseModel):
     created_at: datetime = Field(...)
     execution_time_ms: float = Field(...)
     tokens_used: int = Field(default=0)
+    usage: UsageMetrics = Field(default_factory=UsageMetrics)
+    stage_usage: Dict[str, UsageMetrics] = Field(default_factory=dict)
 
 
 class ReportListResponse(BaseModel):
@@ -0,0 +1,121 @@
+"""
+Offline batch runs of the agent pipeline.
+Runs many pipelines concurrently with every LLM call routed through a
+batch collector, so each stage of the sweep becomes one batch job.
+
+Usage:
+    python -m app.services.batch_pipeline jobs.jsonl [--output results.jsonl]
+
+Each line of the job file is a PipelineRequest
+({"company_name": ..., "partner_company": ..., "domain": ...}).
+"""
+import argparse
+import asyncio
+import json
+from pathlib import Path
+from typing import List, Optional
+
+from app.config import get_settings
+from app.models.requests import PipelineRequest
+from app.models.responses import PipelineResponse
+from app.services.llm_batch import BatchBackend, LLMBatchCollector, batch_scope, build_batch_backend
+from app.services.llm_service import get_llm_service
+from app.services.pipeline_service import PipelineOrchestrator
+from app.utils.logging import get_logger, setup_logging
+
+logger = get_logger(__name__)
+
+
+class BatchPipelineRunner:
+    """
+    Runs pipelines in batch mode.
+
+    All pipelines advance in lock-step: their research calls form one
+    batch, then their product calls, then their marketing calls. Stage,
+    pipeline and critic timeouts are replaced by LLM_BATCH_TIMEOUT.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[BatchBackend] = None,
+        orchestrator: Optional[PipelineOrchestrator] = None,
+    ):
+        self.settings = get_settings()
+        self.backend = backend or build_batch_backend(self.settings, get_llm_service())
+        batch_timeout = self.settings.LLM_BATCH_TIMEOUT
+        self.orchestrator = orchestrator or PipelineOrchestrator(
+            settings=self.settings.model_copy(update={
+                "TIMEOUT_PIPELINE": batch_timeout,
+                "TIMEOUT_RESEARCH_AGENT": batch_timeout,
+                "TIMEOUT_PRODUCT_AGENT": batch_timeout,
+                "TIMEOUT_MARKETING_AGENT": batch_timeout,
+                "TIMEOUT_CRITIC_AGENT": batch_timeout,
+            })
+        )
+
+    def _collector(self) -> LLMBatchCollector:
+        return LLMBatchCollector(
+            backend=self.backend,
+            directory=self.settings.LLM_BATCH_DIRECTORY,
+            poll_interval=self.settings.LLM_BATCH_POLL_INTERVAL,
+            max_requests=self.settings.LLM_BATCH_MAX_REQUESTS,
+        )
+
+    async def run(
+        self,
+        requests: List[PipelineRequest],
+        save_report: bool = True,
+    ) -> List[PipelineResponse]:
+        """
+        Run every request through the pipeline in batch mode.
+
+        Returns:
+            One PipelineResponse per request, in order
+        """
+        collector = self._collector()
+        collector.add_participants(len(requests))
+
+        async def run_one(request: PipelineRequest) -> PipelineResponse:
+            try:
+                return await self.orchestrator.run_pipeline(request, save_report=save_report)
+            finally:
+                collector.leave()
+
+        logger.info("Batch pipeline run started", pipelines=len(requests))
+        with batch_scope(collector):
+            responses = await asyncio.gather(*(run_one(r) for r in requests))
+        logger.info("Batch pipeline run completed", pipelines=len(requests), **collector.stats)
+        return list(responses)
+
+
+def load_jobs(path: Path) -> List[PipelineRequest]:
+    """Read pipeline requests from a JSONL job file."""
+    with open(path, encoding="utf-8") as f:
+        return [PipelineRequest(**json.loads(line)) for line in f if line.strip()]
+
+
+async def _main(jobs_path: Path, output_path: Optional[Path]) -> None:
+    requests = load_jobs(jobs_path)
+    responses = await BatchPipelineRunner().run(requests)
+    if output_path is not None:
+        with open(output_path, "w", encoding="utf-8") as f:
+            for response in responses:
+                f.write(json.dumps({
+                    "report_id": response.report_id,
+                    "status": response.status,
+                    "tokens_used": response.metadata.tokens_used,
+                }) + "\n")
+    await get_llm_service().close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run pipelines in offline batch mode")
+    parser.add_argument("jobs", type=Path, help="JSONL file of pipeline requests")
+    parser.add_argument("--output", type=Path, default=None, help="JSONL summary output")
+    args = parser.parse_args()
+    setup_logging()
+    asyncio.run(_main(args.jobs, args.output))
+
+
+if __name__ == "__main__":
+    main()
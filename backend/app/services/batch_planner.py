@@ -0,0 +1,371 @@
+"""
+Batch pipeline runs with shared research.
+Plans many (company, partner, domain) items as one task graph: identical
+items share a pipeline run, and research sections needed by several items
+(company profiles, domain trends) are generated once and merged into
+every report that uses them. Product and marketing then run per item
+through the PipelineOrchestrator, with the merged research as a reused stage.
+"""
+import asyncio
+import json
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.agents.research_agent import ResearchAgent, ResearchSubtask
+from app.config import get_settings
+from app.models.requests import PipelineRequest
+from app.models.responses import (
+    BatchPipelineItem,
+    BatchPipelineStatus,
+    BatchPlanStats,
+    SectionStatus,
+    UsageMetrics,
+)
+from app.services.pipeline_service import STAGES, get_pipeline_orchestrator
+from app.services.usage_tracker import UsageAccumulator, track_usage
+from app.utils.exceptions import BatchNotFoundError
+from app.utils.logging import get_logger
+from app.utils.telemetry import BATCH_RESEARCH_SECTIONS
+
+logger = get_logger(__name__)
+
+
+def section_key(subtask: ResearchSubtask) -> str:
+    """Identify a research section by the inputs it is generated from."""
+    return json.dumps(subtask.cache_inputs, sort_keys=True)
+
+
+def research_inputs(request: PipelineRequest) -> Dict[str, str]:
+    """Research agent inputs of a request."""
+    return {
+        "company_name": request.company_name,
+        "partner_company": request.partner_company,
+        "domain": request.domain,
+    }
+
+
+@dataclass
+class BatchPlan:
+    """Deduplicated work for a batch of pipeline requests."""
+
+    items: List[PipelineRequest]
+    # Distinct requests; identical items share one run
+    pipelines: List[PipelineRequest]
+    # Index into `pipelines` of each item's run
+    item_pipelines: List[int]
+    # Research sections of each pipeline, in report order (empty without fan-out)
+    pipeline_subtasks: List[List[ResearchSubtask]]
+    # Distinct research sections by section_key
+    sections: Dict[str, ResearchSubtask]
+
+    @property
+    def stats(self) -> BatchPlanStats:
+        return BatchPlanStats(
+            items=len(self.items),
+            unique_pipelines=len(self.pipelines),
+            research_sections=len(self.sections),
+            research_sections_requested=sum(
+                len(self.pipeline_subtasks[index]) for index in self.item_pipelines
+            ),
+        )
+
+
+def plan_batch(
+    items: List[PipelineRequest],
+    research_agent: ResearchAgent,
+    fan_out: bool = True,
+) -> BatchPlan:
+    """
+    Plan a batch: merge identical items and share common research sections.
+
+    Args:
+        items: Requested pipeline runs
+        research_agent: Agent that splits research into sections
+        fan_out: Whether research is split into sections; without it each
+            pipeline's research is a single call and nothing is shared
+
+    Returns:
+        BatchPlan for the items
+    """
+    pipelines: List[PipelineRequest] = []
+    item_pipelines: List[int] = []
+    indexes: Dict[Tuple[str, str, str], int] = {}
+    for item in items:
+        key = (item.company_name, item.partner_company, item.domain)
+        if key not in indexes:
+            indexes[key] = len(pipelines)
+            pipelines.append(item)
+        item_pipelines.append(indexes[key])
+
+    pipeline_subtasks = [
+        research_agent.build_subtasks(**research_inputs(request)) if fan_out else []
+        for request in pipelines
+    ]
+    sections: Dict[str, ResearchSubtask] = {}
+    for subtasks in pipeline_subtasks:
+        for subtask in subtasks:
+            sections.setdefault(section_key(subtask), subtask)
+
+    return BatchPlan(
+        items=items,
+        pipelines=pipelines,
+        item_pipelines=item_pipelines,
+        pipeline_subtasks=pipeline_subtasks,
+        sections=sections,
+    )
+
+
+@dataclass
+class Batch:
+    """One submitted batch and the progress of its items."""
+
+    batch_id: str
+    plan: BatchPlan
+    items: List[BatchPipelineItem]
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+    usage: UsageAccumulator = field(default_factory=UsageAccumulator)
+    task: Optional[asyncio.Task] = None
+    # Monotonic time the batch finished, for retention
+    finished_monotonic: float = 0.0
+
+    @property
+    def is_finished(self) -> bool:
+        return self.finished_at is not None
+
+    def update(self, pipeline: int, **fields) -> None:
+        """Set progress fields on every item sharing a pipeline run."""
+        for index, item in enumerate(self.items):
+            if self.plan.item_pipelines[index] == pipeline:
+                for name, value in fields.items():
+                    setattr(item, name, value)
+
+    def to_model(self) -> BatchPipelineStatus:
+        return BatchPipelineStatus(
+            batch_id=self.batch_id,
+            status="completed" if self.is_finished else "running",
+            created_at=self.created_at,
+            finished_at=self.finished_at,
+            completed_items=sum(
+                1 for item in self.items if item.status in ("completed", "partial", "failed")
+            ),
+            plan=self.plan.stats,
+            usage=UsageMetrics(**self.usage.to_dict()),
+            items=[item.model_copy() for item in self.items],
+        )
+
+
+class BatchPipelineService:
+    """
+    Runs batches of pipelines in the background and tracks their progress.
+
+    At most `concurrency` pipelines of a batch run at once. A research
+    section is generated by the first pipeline that needs it; later
+    pipelines wait for the same result. A section that fails fails every
+    item that uses it. Finished batches are kept for retention_seconds.
+    """
+
+    def __init__(
+        self,
+        orchestrator=None,
+        concurrency: int = 4,
+        retention_seconds: float = 3600.0,
+    ):
+        self._orchestrator = orchestrator
+        self.concurrency = concurrency
+        self.retention_seconds = retention_seconds
+        self._batches: Dict[str, Batch] = {}
+
+    @property
+    def orchestrator(self):
+        """Pipeline orchestrator that runs the product and marketing stages."""
+        if self._orchestrator is None:
+            self._orchestrator = get_pipeline_orchestrator()
+        return self._orchestrator
+
+    @orchestrator.setter
+    def orchestrator(self, orchestrator) -> None:
+        self._orchestrator = orchestrator
+
+    async def submit(self, items: List[PipelineRequest]) -> BatchPipelineStatus:
+        """Plan a batch and start running it."""
+        self._prune()
+        settings = get_settings()
+        plan = plan_batch(items, self.orchestrator.research_agent, settings.RESEARCH_FAN_OUT_ENABLED)
+        first_item: Dict[int, int] = {}
+        batch_items = []
+        for index, (item, pipeline) in enumerate(zip(items, plan.item_pipelines)):
+            batch_items.append(BatchPipelineItem(
+                index=index,
+                company_name=item.company_name,
+                partner_company=item.partner_company,
+                domain=item.domain,
+                status="pending",
+                duplicate_of=first_item.get(pipeline),
+            ))
+            first_item.setdefault(pipeline, index)
+
+        batch = Batch(batch_id=str(uuid.uuid4()), plan=plan, items=batch_items)
+        self._batches[batch.batch_id] = batch
+        batch.task = asyncio.create_task(self._run(batch))
+
+        stats = plan.stats
+        BATCH_RESEARCH_SECTIONS.labels(source="generated").inc(stats.research_sections)
+        BATCH_RESEARCH_SECTIONS.labels(source="shared").inc(
+            stats.research_sections_requested - stats.research_sections
+        )
+        logger.info("Batch pipeline started", batch_id=batch.batch_id, **stats.model_dump())
+        return batch.to_model()
+
+    def get(self, batch_id: str) -> BatchPipelineStatus:
+        """
+        Get a batch's progress.
+
+        Raises:
+            BatchNotFoundError: If the batch does not exist or has expired
+        """
+        self._prune()
+        batch = self._batches.get(batch_id)
+        if batch is None:
+            raise BatchNotFoundError(batch_id)
+        return batch.to_model()
+
+    async def stop(self) -> None:
+        """Cancel every running batch."""
+        tasks = [batch.task for batch in self._batches.values() if batch.task and not batch.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, batch: Batch) -> None:
+        settings = get_settings()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        sections: Dict[str, asyncio.Task] = {}
+
+        def section(subtask: ResearchSubtask) -> asyncio.Task:
+            key = section_key(subtask)
+            if key not in sections:
+                sections[key] = asyncio.create_task(asyncio.wait_for(
+                    self.orchestrator.research_agent.generate_section(subtask),
+                    timeout=settings.TIMEOUT_RESEARCH_AGENT,
+                ))
+            return sections[key]
+
+        try:
+            with track_usage() as usage:
+                batch.usage = usage
+                await asyncio.gather(*(
+                    self._run_pipeline(batch, index, section, semaphore)
+                    for index in range(len(batch.plan.pipelines))
+                ))
+        finally:
+            for task in sections.values():
+                task.cancel()
+            batch.finished_at = datetime.utcnow()
+            batch.finished_monotonic = time.monotonic()
+
+        logger.info(
+            "Batch pipeline completed",
+            batch_id=batch.batch_id,
+            sections_generated=len(sections),
+            tokens_used=batch.usage.total_tokens,
+            llm_calls=batch.usage.llm_calls,
+        )
+
+    async def _run_pipeline(
+        self,
+        batch: Batch,
+        index: int,
+        section: Callable[[ResearchSubtask], asyncio.Task],
+        semaphore: asyncio.Semaphore,
+    ) -> None:
+        """Run one distinct pipeline of the batch, recording progress on its items."""
+        request = batch.plan.pipelines[index]
+        subtasks = batch.plan.pipeline_subtasks[index]
+        async with semaphore:
+            batch.update(index, status="running")
+            reused = None
+            if subtasks:
+                results = await asyncio.gather(*(section(s) for s in subtasks), return_exceptions=True)
+                errors = [result for result in results if isinstance(result, BaseException)]
+                if errors:
+                    error = errors[0]
+                    logger.error(
+                        "Batch research section failed",
+                        batch_id=batch.batch_id,
+                        error=str(error),
+                        error_type=type(error).__name__,
+                    )
+                    batch.update(
+                        index,
+                        status="failed",
+                        error=f"Research failed: {str(error) or type(error).__name__}",
+                    )
+                    return
+                research = self.orchestrator.research_agent.merge_sections(
+                    subtasks, results, **research_inputs(request)
+                )
+                reused = {"research": SectionStatus(status="completed", content=research)}
+                batch.update(index, completed_stages=["research"])
+
+            async def on_checkpoint(stages: Dict[str, SectionStatus]) -> None:
+                batch.update(index, completed_stages=[
+                    stage for stage in STAGES
+                    if stage in stages and stages[stage].status == "completed"
+                ])
+
+            try:
+                response = await self.orchestrator.run_pipeline(
+                    request,
+                    reused=reused,
+                    on_checkpoint=on_checkpoint,
+                )
+            except Exception as e:
+                logger.error("Batch pipeline item failed", batch_id=batch.batch_id, error=str(e))
+                batch.update(index, status="failed", error=str(e) or type(e).__name__)
+                return
+
+            sections = response.sections
+            error = next(
+                (
+                    status.error
+                    for status in (sections.research, sections.product, sections.marketing)
+                    if status.status != "completed" and status.error
+                ),
+                None,
+            )
+            batch.update(
+                index,
+                status=response.status,
+                report_id=response.report_id,
+                error=error,
+            )
+
+    def _prune(self) -> None:
+        """Forget finished batches past the retention period."""
+        cutoff = time.monotonic() - self.retention_seconds
+        expired = [
+            batch_id for batch_id, batch in self._batches.items()
+            if batch.is_finished and batch.finished_monotonic < cutoff
+        ]
+        for batch_id in expired:
+            del self._batches[batch_id]
+
+
+# Singleton instance
+_batch_pipeline_service: Optional[BatchPipelineService] = None
+
+
+def get_batch_pipeline_service() -> BatchPipelineService:
+    """Get the batch pipeline service singleton."""
+    global _batch_pipeline_service
+    if _batch_pipeline_service is None:
+        settings = get_settings()
+        _batch_pipeline_service = BatchPipelineService(
+            concurrency=settings.BATCH_PIPELINE_CONCURRENCY,
+            retention_seconds=settings.BATCH_PIPELINE_RETENTION_SECONDS,
+        )
+    return _batch_pipeline_service
@@ -0,0 +1,167 @@
+"""
+Circuit breaker with closed / open / half-open states.
+Trips on a sliding-window error rate and recovers through probe calls.
+"""
+import time
+from collections import deque
+from typing import Deque, Dict, Tuple
+
+from app.utils.logging import get_logger
+from app.utils.telemetry import CIRCUIT_BREAKER_STATE, CIRCUIT_BREAKER_TRANSITIONS
+
+logger = get_logger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitBreaker:
+    """
+    Sliding-window circuit breaker.
+
+    - closed: calls flow; the breaker opens once the window holds at least
+      `failure_threshold` failures and the failure rate reaches `error_rate`
+    - open: calls are rejected until `recovery_timeout` seconds have passed
+    - half_open: up to `half_open_max_calls` probes are let through; one
+      failure reopens the circuit, `half_open_max_calls` successes close it
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        error_rate: float = 0.5,
+        window_seconds: float = 60.0,
+        recovery_timeout: float = 60.0,
+        half_open_max_calls: int = 1,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.error_rate = error_rate
+        self.window_seconds = window_seconds
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self._transitions: Dict[str, int] = {}
+        CIRCUIT_BREAKER_STATE.labels(breaker=name).set(_STATE_VALUES[CLOSED])
+
+    @property
+    def state(self) -> str:
+        """Current state, moving open to half-open once the timer expires."""
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._transition(HALF_OPEN)
+        return self._state
+
+    @property
+    def is_open(self) -> bool:
+        """Whether calls are currently being rejected outright."""
+        return self.state == OPEN
+
+    @property
+    def stats(self) -> Dict[str, object]:
+        """Get state, window counts and transition counters."""
+        self._trim()
+        failures = sum(1 for _, ok in self._outcomes if not ok)
+        return {
+            "state": self.state,
+            "window_calls": len(self._outcomes),
+            "window_failures": failures,
+            "transitions": dict(self._transitions),
+        }
+
+    def allow_request(self) -> bool:
+        """
+        Check whether a call may proceed.
+
+        In half-open state this takes one of the limited probe permits; the
+        caller must report the outcome with record_success/record_failure.
+        """
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == OPEN:
+            return False
+
+        if self._probes_in_flight >= self.half_open_max_calls:
+            if time.monotonic() - self._opened_at >= 2 * self.recovery_timeout:
+                # Probes never reported back (e.g. cancelled); start over
+                self._transition(OPEN)
+            return False
+        self._probes_in_flight += 1
+        return True
+
+    def record_success(self) -> None:
+        """Record a successful call."""
+        if self._state == HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            self._probe_successes += 1
+            if self._probe_successes >= self.half_open_max_calls:
+                self._transition(CLOSED)
+            return
+        self._append(True)
+
+    def record_failure(self) -> None:
+        """Record a failed call."""
+        if self._state == HALF_OPEN:
+            self._transition(OPEN)
+            return
+        self._append(False)
+        if self._state == CLOSED and self._should_trip():
+            self._transition(OPEN)
+
+    def release(self) -> None:
+        """Return a probe permit for a call that ended without a verdict."""
+        if self._state == HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+    
+    def reset(self) -> None:
+        """Force the breaker closed and clear the window."""
+        self._transition(CLOSED)
+
+    def _append(self, ok: bool) -> None:
+        self._outcomes.append((time.monotonic(), ok))
+        self._trim()
+
+    def _trim(self) -> None:
+        """Drop outcomes older than the window."""
+        cutoff = time.monotonic() - self.window_seconds
+        while self._outcomes and self._outcomes[0][0] < cutoff:
+            self._outcomes.popleft()
+
+    def _should_trip(self) -> bool:
+        failures = sum(1 for _, ok in self._outcomes if not ok)
+        if failures < self.failure_threshold:
+            return False
+        return failures / len(self._outcomes) >= self.error_rate
+
+    def _transition(self, new_state: str) -> None:
+        previous = self._state
+        self._state = new_state
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        if new_state == OPEN:
+            self._opened_at = time.monotonic()
+        if new_state == CLOSED:
+            self._outcomes.clear()
+
+        if previous == new_state:
+            return
+        key = f"{previous}->{new_state}"
+        self._transitions[key] = self._transitions.get(key, 0) + 1
+        CIRCUIT_BREAKER_TRANSITIONS.labels(
+            breaker=self.name, from_state=previous, to_state=new_state
+        ).inc()
+        CIRCUIT_BREAKER_STATE.labels(breaker=self.name).set(_STATE_VALUES[new_state])
+        logger.warning(
+            "Circuit breaker state changed",
+            breaker=self.name,
+            from_state=previous,
+            to_state=new_state,
+        )
@@ -0,0 +1,247 @@
+"""
+Adaptive (AIMD) concurrency limiter for outbound LLM calls.
+Grows the limit additively while calls are healthy and cuts it
+multiplicatively on overload signals.
+"""
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Deque, Dict, Optional
+
+import openai
+
+from app.utils.exceptions import LLMAPIError
+from app.utils.logging import get_logger
+from app.utils.telemetry import (
+    LLM_CONCURRENCY_IN_FLIGHT,
+    LLM_CONCURRENCY_LIMIT,
+    LLM_CONCURRENCY_QUEUE_DEPTH,
+)
+
+logger = get_logger(__name__)
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """Check whether an error signals provider overload (429 or timeout)."""
+    return isinstance(
+        error,
+        (openai.RateLimitError, openai.APITimeoutError, asyncio.TimeoutError),
+    )
+
+
+@dataclass
+class SlotUsage:
+    """Work done while holding a slot, reported by the caller."""
+
+    completion_tokens: Optional[int] = None
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Bounds the number of outstanding calls with an AIMD-controlled limit.
+
+    - Success under the latency tolerance: limit += increase_step / limit
+    - Overload (429, timeout) or latency spike: limit *= decrease_factor
+    - Other errors leave the limit unchanged
+
+    Latency is compared per completion token, since a long generation is
+    slow without the provider being congested. Calls that do not report
+    their completion tokens give no latency signal.
+
+    Callers over the limit queue in FIFO order for at most max_wait_seconds.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        increase_step: float = 1.0,
+        decrease_factor: float = 0.5,
+        latency_tolerance: float = 2.0,
+        max_wait_seconds: float = 30.0,
+        decrease_cooldown_seconds: float = 1.0,
+        is_overload: Callable[[BaseException], bool] = is_overload_error,
+        name: str = "default",
+    ):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.max_wait_seconds = max_wait_seconds
+        self.decrease_cooldown_seconds = decrease_cooldown_seconds
+        self._is_overload = is_overload
+        self._limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._latency_ewma: Optional[float] = None
+        self._samples = 0
+        self._last_decrease = 0.0
+        self._publish()
+
+    @property
+    def limit(self) -> int:
+        """Current concurrency limit."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of calls currently holding a slot."""
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of callers waiting for a slot."""
+        return len(self._waiters)
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        """Get limiter gauges."""
+        return {
+            "limit": self.limit,
+            "in_flight": self._in_flight,
+            "queue_depth": self.queue_depth,
+            "latency_per_token_ewma_seconds": self._latency_ewma or 0.0,
+        }
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[SlotUsage]:
+        """
+        Hold a concurrency slot for the duration of the block.
+
+        The block sets completion_tokens on the yielded SlotUsage once the
+        provider reports usage.
+
+        Raises:
+            LLMAPIError: If no slot frees up within max_wait_seconds
+        """
+        await self.acquire()
+        start = time.monotonic()
+        usage = SlotUsage()
+        try:
+            yield usage
+        except BaseException as e:
+            self.release(time.monotonic() - start, overloaded=self._is_overload(e), success=False)
+            raise
+        else:
+            self.release(
+                time.monotonic() - start,
+                overloaded=False,
+                success=True,
+                completion_tokens=usage.completion_tokens,
+            )
+
+    async def acquire(self) -> None:
+        """Wait for a free slot."""
+        if self._in_flight < self.limit and not self._waiters:
+            self._in_flight += 1
+            self._publish()
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._publish()
+        try:
+            await asyncio.wait_for(waiter, timeout=self.max_wait_seconds)
+        except asyncio.TimeoutError:
+            self._abandon(waiter)
+            raise LLMAPIError(
+                message="LLM concurrency limit reached; timed out waiting for a slot",
+                provider="OpenAI",
+                details={
+                    "state": "concurrency_limited",
+                    "limit": self.limit,
+                    "queue_depth": self.queue_depth,
+                },
+            )
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+
+    def release(
+        self,
+        latency: float,
+        overloaded: bool = False,
+        success: bool = True,
+        completion_tokens: Optional[int] = None,
+    ) -> None:
+        """Return a slot and adjust the limit from the call outcome."""
+        self._in_flight -= 1
+
+        if overloaded:
+            self._decrease("overload")
+        elif success:
+            per_token = latency / completion_tokens if completion_tokens else None
+            if per_token is not None and self._is_latency_spike(per_token):
+                self._decrease("latency")
+            else:
+                self._limit = min(
+                    float(self.max_limit),
+                    self._limit + self.increase_step / max(self._limit, 1.0),
+                )
+            if per_token is not None:
+                self._observe_latency(per_token)
+
+        self._wake()
+        self._publish()
+
+    def _abandon(self, waiter: asyncio.Future) -> None:
+        """Clean up a waiter that stopped waiting."""
+        if waiter.done() and not waiter.cancelled():
+            # A slot was handed over just as we gave up; give it back
+            self._in_flight -= 1
+            self._wake()
+        else:
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+        self._publish()
+
+    def _wake(self) -> None:
+        """Hand free slots to queued waiters in FIFO order."""
+        while self._waiters and self._in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self._in_flight += 1
+            waiter.set_result(None)
+
+    def _is_latency_spike(self, latency: float) -> bool:
+        """Check a per-token latency sample against the smoothed baseline."""
+        if self._latency_ewma is None or self._samples < 5:
+            return False
+        return latency > self._latency_ewma * self.latency_tolerance
+
+    def _observe_latency(self, latency: float) -> None:
+        """Fold a latency sample into the moving average."""
+        self._samples += 1
+        if self._latency_ewma is None:
+            self._latency_ewma = latency
+        else:
+            self._latency_ewma = 0.8 * self._latency_ewma + 0.2 * latency
+
+    def _decrease(self, reason: str) -> None:
+        """Cut the limit multiplicatively, at most once per cooldown."""
+        now = time.monotonic()
+        if now - self._last_decrease < self.decrease_cooldown_seconds:
+            return
+        self._last_decrease = now
+        previous = self.limit
+        self._limit = max(float(self.min_limit), self._limit * self.decrease_factor)
+        logger.warning(
+            "LLM concurrency limit decreased",
+            reason=reason,
+            previous_limit=previous,
+            limit=self.limit,
+        )
+
+    def _publish(self) -> None:
+        """Update Prometheus gauges."""
+        LLM_CONCURRENCY_LIMIT.labels(backend=self.name).set(self.limit)
+        LLM_CONCURRENCY_IN_FLIGHT.labels(backend=self.name).set(self._in_flight)
+        LLM_CONCURRENCY_QUEUE_DEPTH.labels(backend=self.name).set(len(self._waiters))
@@ -0,0 +1,85 @@
+"""
+Request deadlines propagated through contextvars.
+A deadline set by the pipeline bounds every stage and LLM call beneath it.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from app.utils.exceptions import DeadlineExceededError
+
+
+class Deadline:
+    """An absolute point in (monotonic) time by which work must finish."""
+
+    def __init__(self, seconds: float, name: str = ""):
+        self.name = name
+        self.budget_seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    @property
+    def remaining(self) -> float:
+        """Seconds left, never negative."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        """Whether the deadline has passed."""
+        return self.remaining <= 0
+
+    def cap(self, timeout: float) -> float:
+        """Limit a per-operation timeout to the time left."""
+        return min(timeout, self.remaining)
+
+
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar(
+    "collabgen_deadline", default=None
+)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Get the deadline active in the current context, if any."""
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(seconds: float, name: str = "") -> Iterator[Deadline]:
+    """
+    Run the enclosed block under a deadline.
+
+    A nested scope can only tighten the deadline, never extend it.
+    """
+    deadline = Deadline(seconds, name=name)
+    parent = _current_deadline.get()
+    if parent is not None and parent.expires_at < deadline.expires_at:
+        deadline.expires_at = parent.expires_at
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def time_left() -> Optional[float]:
+    """Seconds left on the active deadline, or None without one."""
+    deadline = _current_deadline.get()
+    return deadline.remaining if deadline is not None else None
+
+
+def capped_timeout(timeout: float) -> float:
+    """Limit a per-operation timeout to the active deadline."""
+    deadline = _current_deadline.get()
+    return deadline.cap(timeout) if deadline is not None else timeout
+
+
+def check_deadline(operation: str, min_seconds: float = 0.0) -> None:
+    """
+    Fail fast when the active deadline cannot fit `operation`.
+
+    Raises:
+        DeadlineExceededError: If fewer than min_seconds remain
+    """
+    deadline = _current_deadline.get()
+    if deadline is not None and deadline.remaining <= min_seconds:
+        raise DeadlineExceededError(operation=operation, timeout_seconds=deadline.budget_seconds)
@@ -0,0 +1,141 @@
+"""
+Passive health signals derived from live traffic.
+Components record the outcome of their real operations; health checks
+read the rolling window and only run an active probe when the component
+has been idle, caching the probe result for a staleness window.
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from app.config import Settings
+from app.utils.logging import get_logger
+from app.utils.telemetry import COMPONENT_HEALTHY
+
+logger = get_logger(__name__)
+
+
+class HealthSignal:
+    """
+    Health of one dependency, computed from recent call outcomes.
+
+    While outcomes exist inside the rolling window, the component is
+    healthy when its failure rate is below failure_threshold. With no
+    recent traffic, the active probe decides; its result is reused for
+    staleness_seconds, and concurrent checks share one probe run.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        probe: Callable[[], Awaitable[bool]],
+        window_seconds: float = 60.0,
+        staleness_seconds: float = 30.0,
+        failure_threshold: float = 0.5,
+        probe_timeout: float = 5.0,
+    ):
+        self.name = name
+        self.probe = probe
+        self.window_seconds = window_seconds
+        self.staleness_seconds = staleness_seconds
+        self.failure_threshold = failure_threshold
+        self.probe_timeout = probe_timeout
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._failures = 0
+        self._probe_result: Optional[bool] = None
+        self._probe_at = 0.0
+        self._probe_lock = asyncio.Lock()
+        self._stats: Dict[str, int] = {"probes": 0, "probe_failures": 0}
+
+    def record(self, ok: bool) -> None:
+        """Record the outcome of one real operation."""
+        self._outcomes.append((time.monotonic(), ok))
+        if not ok:
+            self._failures += 1
+        self._trim()
+
+    def passive_status(self) -> Optional[bool]:
+        """Health from the rolling window, or None if there was no recent traffic."""
+        self._trim()
+        if not self._outcomes:
+            return None
+        return self._failures / len(self._outcomes) < self.failure_threshold
+
+    async def check(self) -> bool:
+        """
+        Get the current health without spending work on the hot path.
+
+        Returns:
+            True if healthy, False otherwise
+        """
+        healthy = self.passive_status()
+        if healthy is None:
+            healthy = self._fresh_probe_result()
+        if healthy is None:
+            healthy = await self._run_probe()
+        COMPONENT_HEALTHY.labels(component=self.name).set(1 if healthy else 0)
+        return healthy
+
+    def _fresh_probe_result(self) -> Optional[bool]:
+        if self._probe_result is None:
+            return None
+        if time.monotonic() - self._probe_at > self.staleness_seconds:
+            return None
+        return self._probe_result
+
+    async def _run_probe(self) -> bool:
+        """Run the active probe once for all concurrent callers."""
+        async with self._probe_lock:
+            cached = self._fresh_probe_result()
+            if cached is not None:
+                return cached
+            self._stats["probes"] += 1
+            try:
+                healthy = bool(await asyncio.wait_for(self.probe(), timeout=self.probe_timeout))
+            except Exception as e:
+                logger.warning("Health probe failed", component=self.name, error=str(e))
+                healthy = False
+            if not healthy:
+                self._stats["probe_failures"] += 1
+            self._probe_result = healthy
+            self._probe_at = time.monotonic()
+            return healthy
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Get window counts and the age of the last probe."""
+        self._trim()
+        return {
+            **self._stats,
+            "window_outcomes": len(self._outcomes),
+            "window_failures": self._failures,
+            "last_probe_result": self._probe_result,
+            "last_probe_age_seconds": (
+                round(time.monotonic() - self._probe_at, 2)
+                if self._probe_result is not None else None
+            ),
+        }
+
+    def _trim(self) -> None:
+        cutoff = time.monotonic() - self.window_seconds
+        while self._outcomes and self._outcomes[0][0] < cutoff:
+            _, ok = self._outcomes.popleft()
+            if not ok:
+                self._failures -= 1
+
+
+def build_health_signal(
+    settings: Settings,
+    name: str,
+    probe: Callable[[], Awaitable[bool]],
+) -> HealthSignal:
+    """Build a health signal configured from the HEALTH_* settings."""
+    return HealthSignal(
+        name=name,
+        probe=probe,
+        window_seconds=settings.HEALTH_WINDOW_SECONDS,
+        staleness_seconds=settings.HEALTH_PROBE_STALENESS_SECONDS,
+        failure_threshold=settings.HEALTH_FAILURE_THRESHOLD,
+        probe_timeout=settings.HEALTH_PROBE_TIMEOUT,
+    )
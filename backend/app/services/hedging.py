@@ -0,0 +1,162 @@
+"""
+Hedged requests for tail-latency reduction.
+Sends a backup request when the primary is slower than a rolling latency
+percentile, keeping whichever finishes first.
+"""
+import asyncio
+import math
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Set
+
+from app.utils.logging import get_logger
+from app.utils.telemetry import LLM_HEDGE_EVENTS
+
+logger = get_logger(__name__)
+
+# Histogram for calls that do not name an operation
+DEFAULT_KEY = "default"
+
+
+class LatencyHistogram:
+    """Rolling window of latency samples with percentile lookup."""
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        """Add a latency sample."""
+        self._samples.append(seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Get the p-th percentile (0-100), or None with no samples."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+
+class HedgingPolicy:
+    """
+    Runs calls with an optional hedge.
+
+    A hedge is sent once the primary has been running longer than the
+    configured latency percentile, but only while hedge spend stays within
+    `budget_percent` of primary spend (measured in estimated tokens).
+
+    Latencies are kept per key (agent and operation), since a short
+    critique and a long report section have very different tails. The
+    caller reports samples with record(), timing only the provider
+    request so waits for a backend, rate budget or concurrency slot do
+    not inflate the percentile.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        budget_percent: float = 10.0,
+        min_samples: int = 20,
+        window: int = 200,
+    ):
+        self.percentile = percentile
+        self.budget_percent = budget_percent
+        self.min_samples = min_samples
+        self.window = window
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self._primary_cost = 0
+        self._hedge_cost = 0
+        self._stats: Dict[str, int] = {
+            "calls": 0,
+            "hedged": 0,
+            "hedge_wins": 0,
+            "budget_denied": 0,
+        }
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Get hedging counters, spend and the current hedge delay."""
+        return {
+            **self._stats,
+            "primary_tokens": self._primary_cost,
+            "hedge_tokens": self._hedge_cost,
+            "hedge_delay_seconds": {key: self.hedge_delay(key) for key in self.histograms},
+        }
+
+    def record(self, key: str, seconds: float) -> None:
+        """Add a provider latency sample for `key`."""
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = LatencyHistogram(window=self.window)
+        histogram.record(seconds)
+
+    def hedge_delay(self, key: str = DEFAULT_KEY) -> Optional[float]:
+        """Delay before hedging a `key` call, or None until enough samples exist."""
+        histogram = self.histograms.get(key)
+        if histogram is None or len(histogram) < self.min_samples:
+            return None
+        return histogram.percentile(self.percentile)
+
+    def _spend_hedge(self, cost: int) -> bool:
+        """Reserve budget for a hedge; False if it would exceed the cap."""
+        if self._hedge_cost + cost > self._primary_cost * self.budget_percent / 100:
+            self._stats["budget_denied"] += 1
+            LLM_HEDGE_EVENTS.labels(event="budget_denied").inc()
+            return False
+        self._hedge_cost += cost
+        return True
+
+    async def run(
+        self,
+        call: Callable[[], Awaitable[Any]],
+        cost: int = 1,
+        key: str = DEFAULT_KEY,
+    ) -> Any:
+        """
+        Run `call`, hedging it with a second identical call if it is slow.
+
+        Args:
+            call: Zero-argument coroutine function issuing the request
+            cost: Estimated token cost of one call, for the hedge budget
+            key: Histogram the hedge delay is read from
+
+        Returns:
+            The result of whichever call finished first successfully
+        """
+        self._stats["calls"] += 1
+        self._primary_cost += cost
+        primary = self._start(call)
+        tasks: Set[asyncio.Task] = {primary}
+
+        try:
+            delay = self.hedge_delay(key)
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done and self._spend_hedge(cost):
+                    self._stats["hedged"] += 1
+                    LLM_HEDGE_EVENTS.labels(event="hedged").inc()
+                    logger.info("Hedging slow LLM call", key=key, delay_seconds=round(delay, 3))
+                    tasks.add(self._start(call))
+
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self._stats["hedge_wins"] += 1
+                            LLM_HEDGE_EVENTS.labels(event="hedge_won").inc()
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def _start(self, call: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """Start one attempt of a call."""
+        return asyncio.ensure_future(call())
@@ -0,0 +1,572 @@
+"""
+Asynchronous pipeline job queue.
+Submitted pipelines wait in a bounded queue and run on a fixed pool of
+worker tasks, so the number of concurrent pipelines is set by
+JOB_WORKERS instead of by how many clients hold a connection open.
+With a JobStore, jobs are persisted and leased so that another instance
+(or this one after a restart) picks up work a stopped process left behind.
+"""
+import asyncio
+import os
+import socket
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Deque, Dict, List, Optional
+
+from app.config import get_settings
+from app.models.requests import PipelineRequest
+from app.models.responses import JobQueueStats, PipelineJob, PipelineResponse, SectionStatus
+from app.services.job_store import JobStore
+from app.utils.exceptions import (
+    CollabGenException,
+    JobNotFoundError,
+    QueueFullError,
+    ReportNotFoundError,
+)
+from app.utils.logging import get_logger
+from app.utils.telemetry import JOB_QUEUE_DEPTH, JOB_RUNNING, JOBS_FINISHED, JOBS_RECLAIMED
+
+logger = get_logger(__name__)
+
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+
+
+@dataclass
+class Job:
+    """One submitted pipeline run and its lifecycle state."""
+
+    job_id: str
+    request: PipelineRequest
+    status: str = "queued"
+    report_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    result: Optional[PipelineResponse] = None
+    # What the pipeline raised, for callers waiting in-process; not stored
+    exception: Optional[BaseException] = None
+    completed_stages: List[str] = field(default_factory=list)
+    # Runs interrupted by a stopped instance; later runs resume the report
+    attempts: int = 0
+    task: Optional[asyncio.Task] = None
+    # Set once another instance holds the job; this copy is then stale
+    lost: bool = False
+    finished: asyncio.Event = field(default_factory=asyncio.Event)
+    # Monotonic time the job finished, for retention
+    finished_monotonic: float = 0.0
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    def to_model(self, queue_position: Optional[int] = None) -> PipelineJob:
+        return PipelineJob(
+            job_id=self.job_id,
+            status=self.status,
+            company_name=self.request.company_name,
+            partner_company=self.request.partner_company,
+            domain=self.request.domain,
+            created_at=self.created_at,
+            started_at=self.started_at,
+            finished_at=self.finished_at,
+            queue_position=queue_position,
+            report_id=self.report_id,
+            completed_stages=self.completed_stages,
+            attempts=self.attempts,
+            error=self.error,
+            result=self.result,
+        )
+
+    def to_row(self) -> Dict[str, Any]:
+        """Columns for JobStore.add."""
+        return {
+            "job_id": self.job_id,
+            "request": self.request.model_dump(),
+            "report_id": self.report_id,
+            "status": self.status,
+            "created_at": self.created_at.isoformat(),
+        }
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "Job":
+        """Rebuild a job loaded from the JobStore."""
+        def parse(value: Optional[str]) -> Optional[datetime]:
+            return datetime.fromisoformat(value) if value else None
+
+        job = cls(
+            job_id=row["job_id"],
+            request=PipelineRequest(**row["request"]),
+            status=row["status"],
+            report_id=row["report_id"],
+            created_at=parse(row["created_at"]),
+            started_at=parse(row["started_at"]),
+            finished_at=parse(row["finished_at"]),
+            error=row["error"],
+            result=PipelineResponse.model_validate_json(row["result"]) if row["result"] else None,
+            completed_stages=row["completed_stages"],
+            attempts=row["attempts"],
+        )
+        if job.is_finished:
+            job.finished.set()
+        return job
+
+
+class JobQueue:
+    """
+    Bounded FIFO queue of pipeline jobs served by a pool of workers.
+
+    Submissions beyond max_depth queued jobs are rejected. Finished jobs
+    are kept for retention_seconds so clients can collect the result.
+    Workers start with the application, or on the first submission.
+
+    With a store, every job is written through to it and leased to this
+    instance; a heartbeat task renews the leases, reclaims jobs whose
+    lease expired elsewhere and purges expired results. A reclaimed job
+    that had started resumes its report from the last checkpointed stage.
+    Writes are conditional on the lease: a job whose lease another
+    instance has taken over is dropped here and its local run cancelled.
+    """
+
+    def __init__(
+        self,
+        orchestrator=None,
+        workers: int = 2,
+        max_depth: int = 100,
+        retention_seconds: float = 3600.0,
+        long_poll_max_seconds: float = 30.0,
+        store: Optional[JobStore] = None,
+        lease_seconds: float = 60.0,
+        heartbeat_seconds: float = 15.0,
+    ):
+        self._orchestrator = orchestrator
+        self.workers = workers
+        self.max_depth = max_depth
+        self.retention_seconds = retention_seconds
+        self.long_poll_max_seconds = long_poll_max_seconds
+        self.store = store
+        self.lease_seconds = lease_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        # Lease holder name, unique per process and queue
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._jobs: Dict[str, Job] = {}
+        self._pending: Deque[Job] = deque()
+        self._available = asyncio.Condition()
+        self._workers: List[asyncio.Task] = []
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._running = 0
+
+    @property
+    def orchestrator(self):
+        """Pipeline orchestrator that runs the jobs."""
+        if self._orchestrator is None:
+            from app.services.pipeline_service import get_pipeline_orchestrator
+
+            self._orchestrator = get_pipeline_orchestrator()
+        return self._orchestrator
+
+    @orchestrator.setter
+    def orchestrator(self, orchestrator) -> None:
+        self._orchestrator = orchestrator
+
+    @property
+    def depth(self) -> int:
+        """Number of jobs waiting for a worker."""
+        return len(self._pending)
+
+    @property
+    def stats(self) -> JobQueueStats:
+        """Get queue depth, running jobs and retained jobs by status."""
+        counts: Dict[str, int] = {}
+        for job in self._jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return JobQueueStats(
+            queue_depth=self.depth,
+            max_depth=self.max_depth,
+            running=self._running,
+            workers=len(self._workers),
+            jobs=counts,
+        )
+
+    def start(self) -> None:
+        """Start the worker tasks, and the heartbeat with a store (no-op if running)."""
+        if self._workers:
+            return
+        self._workers = [
+            asyncio.create_task(self._worker(index), name=f"pipeline-job-worker-{index}")
+            for index in range(self.workers)
+        ]
+        if self.store is not None:
+            self._heartbeat_task = asyncio.create_task(self._heartbeat(), name="pipeline-job-heartbeat")
+        logger.info("Job workers started", workers=self.workers, max_depth=self.max_depth)
+
+    async def stop(self) -> None:
+        """
+        Stop the workers.
+
+        Without a store, jobs they were running fail as interrupted. With
+        one, the unfinished jobs' leases are released so the next instance
+        to start reclaims them straight away.
+        """
+        tasks = list(self._workers)
+        if self._heartbeat_task is not None:
+            tasks.append(self._heartbeat_task)
+        self._workers, self._heartbeat_task = [], None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self.store is not None:
+            released = await self.store.release(self.owner)
+            logger.info("Job leases released", released=released)
+        if tasks:
+            logger.info("Job workers stopped", queued=self.depth)
+
+    async def recover(self) -> int:
+        """
+        Queue jobs reclaimed from expired leases in the store.
+
+        Called on startup and by every heartbeat. Reclaimed jobs are
+        accepted even beyond max_depth, since they were accepted once.
+
+        Returns:
+            Number of jobs reclaimed
+        """
+        if self.store is None:
+            return 0
+        rows = await self.store.reclaim(self.owner, self.lease_seconds)
+        jobs = []
+        for row in rows:
+            local = self._jobs.get(row["job_id"])
+            if local is not None and local in self._pending:
+                # Released by this queue's own stop and still waiting here
+                local.attempts = row["attempts"]
+                continue
+            if local is not None:
+                # Stale copy of a job this queue has lost or stopped running
+                self._disown(local)
+            jobs.append(Job.from_row(row))
+        if not jobs:
+            return 0
+
+        async with self._available:
+            for job in jobs:
+                self._jobs[job.job_id] = job
+                self._pending.append(job)
+            self._available.notify(len(jobs))
+        JOBS_RECLAIMED.inc(len(jobs))
+        self._publish()
+        logger.info(
+            "Reclaimed pipeline jobs",
+            jobs=[job.job_id for job in jobs],
+            resuming=sum(1 for job in jobs if job.attempts),
+        )
+        return len(jobs)
+
+    async def submit(self, request: PipelineRequest) -> PipelineJob:
+        """
+        Queue a pipeline run.
+
+        Raises:
+            QueueFullError: If max_depth jobs are already queued
+        """
+        self._prune()
+        if self.depth >= self.max_depth:
+            raise QueueFullError(self.depth, self.max_depth)
+
+        job = Job(job_id=str(uuid.uuid4()), request=request)
+        if self.store is not None:
+            await self.store.add(job.to_row(), self.owner, self.lease_seconds)
+        self._jobs[job.job_id] = job
+        async with self._available:
+            self._pending.append(job)
+            self._available.notify()
+        self._publish()
+        self.start()
+
+        logger.info("Job queued", job_id=job.job_id, queue_depth=self.depth)
+        return job.to_model(queue_position=self.depth - 1)
+
+    async def run(self, request: PipelineRequest) -> PipelineResponse:
+        """
+        Queue a pipeline run and wait for its result.
+
+        For synchronous endpoints: the run counts against the same workers
+        and queue bound as submitted jobs. Cancelling the caller cancels
+        the job.
+
+        Returns:
+            The pipeline response, including one whose status is "failed"
+
+        Raises:
+            QueueFullError: If max_depth jobs are already queued
+            Exception: Whatever the pipeline raised
+        """
+        submitted = await self.submit(request)
+        job = self._jobs[submitted.job_id]
+        try:
+            await job.finished.wait()
+        except asyncio.CancelledError:
+            if not job.is_finished and not job.lost:
+                await self.cancel(job.job_id)
+            raise
+
+        if job.result is not None and not job.lost:
+            return job.result
+        if job.exception is not None:
+            raise job.exception
+        raise CollabGenException(
+            message=f"Pipeline job did not complete ({job.status})",
+            details={"job_id": job.job_id, "status": job.status, "error": job.error},
+        )
+
+    async def get(self, job_id: str) -> PipelineJob:
+        """
+        Get a job's current state.
+
+        Raises:
+            JobNotFoundError: If the job does not exist or has expired
+        """
+        job = await self._get(job_id)
+        return job.to_model(queue_position=self._position(job))
+
+    async def wait(self, job_id: str, timeout: float) -> PipelineJob:
+        """
+        Long-poll a job until it finishes or `timeout` seconds pass.
+
+        The wait is capped at long_poll_max_seconds. Jobs held by another
+        instance are returned as stored, without waiting.
+
+        Raises:
+            JobNotFoundError: If the job does not exist or has expired
+        """
+        job = await self._get(job_id)
+        timeout = min(timeout, self.long_poll_max_seconds)
+        if not job.is_finished and job.job_id in self._jobs and timeout > 0:
+            try:
+                await asyncio.wait_for(job.finished.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            if job.lost:
+                job = await self._get(job_id)
+        return job.to_model(queue_position=self._position(job))
+
+    async def cancel(self, job_id: str) -> PipelineJob:
+        """
+        Cancel a queued or running job.
+
+        Finished jobs, and jobs held by another instance, are returned
+        unchanged.
+
+        Raises:
+            JobNotFoundError: If the job does not exist or has expired
+        """
+        job = await self._get(job_id)
+        if job.job_id not in self._jobs:
+            return job.to_model()
+        if job.status == "queued":
+            self._pending.remove(job)
+            await self._finish(job, "cancelled")
+        elif job.status == "running" and job.task is not None:
+            job.task.cancel()
+            # The worker records the outcome
+            await job.finished.wait()
+        return job.to_model()
+
+    async def _get(self, job_id: str) -> Job:
+        self._prune()
+        job = self._jobs.get(job_id)
+        if job is None and self.store is not None:
+            row = await self.store.load(job_id)
+            if row is not None:
+                job = Job.from_row(row)
+        if job is None:
+            raise JobNotFoundError(job_id)
+        return job
+
+    def _position(self, job: Job) -> Optional[int]:
+        if job.status != "queued" or job not in self._pending:
+            return None
+        return self._pending.index(job)
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            async with self._available:
+                await self._available.wait_for(lambda: bool(self._pending))
+                job = self._pending.popleft()
+            await self._run(job)
+
+    async def _heartbeat(self) -> None:
+        """Renew this instance's leases, adopt expired ones and purge old results."""
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            try:
+                await self.store.heartbeat(self.owner, self.lease_seconds)
+                await self.recover()
+                cutoff = datetime.utcnow() - timedelta(seconds=self.retention_seconds)
+                await self.store.purge(cutoff.isoformat())
+            except Exception as e:
+                logger.warning("Job store heartbeat failed", error=str(e))
+
+    async def _persist(self, job: Job, **fields: Any) -> bool:
+        """
+        Write job fields through to the store, if any.
+
+        Returns:
+            False if another instance has taken over the job's lease, in
+            which case the job is dropped here
+        """
+        if self.store is None:
+            return True
+        if job.lost:
+            return False
+        try:
+            stored = await self.store.update(job.job_id, self.owner, **fields)
+        except Exception as e:
+            logger.error("Failed to persist job", job_id=job.job_id, error=str(e))
+            return True
+        if not stored:
+            logger.warning("Job lease lost to another instance", job_id=job.job_id, status=job.status)
+            self._disown(job)
+        return stored
+
+    def _disown(self, job: Job) -> None:
+        """Forget a job held elsewhere, cancelling its local run if any."""
+        if job.lost:
+            return
+        job.lost = True
+        if self._jobs.get(job.job_id) is job:
+            del self._jobs[job.job_id]
+        if job in self._pending:
+            self._pending.remove(job)
+        if job.task is not None and not job.task.done():
+            job.task.cancel()
+        # Waiters reload the job from the store
+        job.finished.set()
+        self._publish()
+
+    async def _run(self, job: Job) -> None:
+        """Run one job to completion, failure or cancellation."""
+        job.status = "running"
+        job.started_at = datetime.utcnow()
+        self._running += 1
+        self._publish()
+        if not await self._persist(job, status=job.status, started_at=job.started_at.isoformat()):
+            self._running -= 1
+            self._publish()
+            return
+        logger.info("Job started", job_id=job.job_id, attempt=job.attempts + 1)
+
+        job.task = asyncio.create_task(self._pipeline(job))
+        try:
+            await asyncio.wait({job.task})
+        except asyncio.CancelledError:
+            # The worker itself is stopping
+            job.task.cancel()
+            await asyncio.gather(job.task, return_exceptions=True)
+            self._running -= 1
+            if self.store is None:
+                await self._finish(job, "failed", error="Job interrupted by shutdown")
+            else:
+                # Left running in the store until its lease is released
+                job.status = "queued"
+                self._publish()
+            raise
+
+        if job.task.cancelled():
+            await self._finish(job, "cancelled")
+        elif job.task.exception() is not None:
+            error = job.task.exception()
+            job.exception = error
+            logger.error("Job failed", job_id=job.job_id, error=str(error), error_type=type(error).__name__)
+            await self._finish(job, "failed", error=str(error) or type(error).__name__)
+        else:
+            response = job.task.result()
+            if response.status == "failed":
+                await self._finish(job, "failed", error="Pipeline failed", result=response)
+            else:
+                await self._finish(job, "completed", result=response)
+
+    async def _pipeline(self, job: Job) -> PipelineResponse:
+        """Run a job's pipeline, resuming its report if an earlier run was interrupted."""
+        async def on_checkpoint(sections: Dict[str, SectionStatus]) -> None:
+            job.completed_stages = [
+                stage for stage, status in sections.items() if status.status == "completed"
+            ]
+            await self._persist(job, completed_stages=job.completed_stages)
+
+        if job.attempts:
+            try:
+                return await self.orchestrator.resume_pipeline(job.report_id, on_checkpoint=on_checkpoint)
+            except ReportNotFoundError:
+                # Interrupted before the first stage was checkpointed
+                pass
+        return await self.orchestrator.run_pipeline(
+            job.request,
+            report_id=job.report_id,
+            on_checkpoint=on_checkpoint,
+        )
+
+    async def _finish(
+        self,
+        job: Job,
+        status: str,
+        error: Optional[str] = None,
+        result: Optional[PipelineResponse] = None,
+    ) -> None:
+        if job.status == "running":
+            self._running -= 1
+        job.status = status
+        job.error = error
+        job.result = result
+        job.finished_at = datetime.utcnow()
+        job.finished_monotonic = time.monotonic()
+        stored = await self._persist(
+            job,
+            status=status,
+            error=error,
+            result=result.model_dump_json() if result is not None else None,
+            finished_at=job.finished_at.isoformat(),
+        )
+        job.finished.set()
+        self._publish()
+        if stored:
+            JOBS_FINISHED.labels(status=status).inc()
+            logger.info("Job finished", job_id=job.job_id, status=status)
+
+    def _prune(self) -> None:
+        """Forget finished jobs past the retention period."""
+        cutoff = time.monotonic() - self.retention_seconds
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.is_finished and job.finished_monotonic < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _publish(self) -> None:
+        JOB_QUEUE_DEPTH.set(self.depth)
+        JOB_RUNNING.set(self._running)
+
+
+# Singleton instance
+_job_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    """Get the job queue singleton."""
+    global _job_queue
+    if _job_queue is None:
+        settings = get_settings()
+        _job_queue = JobQueue(
+            workers=settings.JOB_WORKERS,
+            max_depth=settings.JOB_QUEUE_MAX_DEPTH,
+            retention_seconds=settings.JOB_RETENTION_SECONDS,
+            long_poll_max_seconds=settings.JOB_LONG_POLL_MAX_SECONDS,
+            store=JobStore(settings.JOB_STORE_DIRECTORY) if settings.JOB_STORE_ENABLED else None,
+            lease_seconds=settings.JOB_LEASE_SECONDS,
+            heartbeat_seconds=settings.JOB_HEARTBEAT_SECONDS,
+        )
+    return _job_queue
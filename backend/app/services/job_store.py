@@ -0,0 +1,224 @@
+"""
+Durable store for pipeline jobs.
+A SQLite database in WAL mode recording each job's state, checkpointed
+stages and the lease held by the instance running it, so jobs outlive
+the process that accepted them.
+"""
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+UNFINISHED_STATUSES = ("queued", "running")
+
+
+class JobStore:
+    """
+    SQLite table of pipeline jobs with leases.
+
+    The instance that holds a job (queued or running) owns its lease and
+    renews it with heartbeats. A job whose lease expires belonged to an
+    instance that crashed or was stopped, and any instance may reclaim it.
+    """
+
+    def __init__(self, directory: str):
+        self.db_path = Path(directory) / "jobs.sqlite3"
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+
+    async def add(self, row: Dict[str, Any], owner: str, lease_seconds: float) -> None:
+        """Insert a newly queued job leased to `owner`."""
+        await asyncio.to_thread(self._add, row, owner, lease_seconds)
+
+    async def update(self, job_id: str, owner: str, **fields: Any) -> bool:
+        """
+        Update columns of a job (status, timestamps, result, stages...) held by `owner`.
+
+        Returns:
+            False if `owner` no longer holds the job, which is left unchanged
+        """
+        return await asyncio.to_thread(self._update, job_id, owner, fields)
+
+    async def load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job row, or None if it does not exist."""
+        return await asyncio.to_thread(self._load, job_id)
+
+    async def heartbeat(self, owner: str, lease_seconds: float) -> int:
+        """
+        Renew the leases of all unfinished jobs held by `owner`.
+
+        Returns:
+            Number of leases renewed
+        """
+        return await asyncio.to_thread(self._heartbeat, owner, lease_seconds)
+
+    async def release(self, owner: str) -> int:
+        """
+        Expire the leases held by `owner` so another instance can take over.
+
+        Returns:
+            Number of leases released
+        """
+        return await asyncio.to_thread(self._release, owner)
+
+    async def reclaim(self, owner: str, lease_seconds: float) -> List[Dict[str, Any]]:
+        """
+        Take over unfinished jobs whose lease has expired.
+
+        Jobs leased to `owner` itself are skipped: they are still queued
+        or running here, and only missed a heartbeat. Reclaimed jobs go back to "queued"; jobs that were running have
+        their attempt count incremented so they resume instead of restarting.
+
+        Returns:
+            The reclaimed job rows, oldest first
+        """
+        return await asyncio.to_thread(self._reclaim, owner, lease_seconds)
+
+    async def purge(self, finished_before: str) -> int:
+        """
+        Delete finished jobs that finished before an ISO timestamp.
+
+        Returns:
+            Number of jobs deleted
+        """
+        return await asyncio.to_thread(self._purge, finished_before)
+
+    # Runs in worker threads
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the SQLite database on first use."""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            # Autocommit; reclaim opens its own write transaction
+            conn = sqlite3.connect(
+                str(self.db_path),
+                check_same_thread=False,
+                isolation_level=None,
+                timeout=10,
+            )
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "job_id TEXT PRIMARY KEY, request TEXT NOT NULL, report_id TEXT NOT NULL, "
+                "status TEXT NOT NULL, created_at TEXT NOT NULL, started_at TEXT, "
+                "finished_at TEXT, error TEXT, result TEXT, "
+                "completed_stages TEXT NOT NULL DEFAULT '[]', attempts INTEGER NOT NULL DEFAULT 0, "
+                "owner TEXT, lease_expires_at REAL NOT NULL DEFAULT 0, heartbeat_at REAL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS jobs_status_lease ON jobs (status, lease_expires_at)"
+            )
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _row(row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        data = dict(row)
+        data["request"] = json.loads(data["request"])
+        data["completed_stages"] = json.loads(data["completed_stages"])
+        return data
+
+    def _add(self, row: Dict[str, Any], owner: str, lease_seconds: float) -> None:
+        now = time.time()
+        with self._db_lock:
+            self._connect().execute(
+                "INSERT INTO jobs (job_id, request, report_id, status, created_at, "
+                "owner, lease_expires_at, heartbeat_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    row["job_id"],
+                    json.dumps(row["request"]),
+                    row["report_id"],
+                    row["status"],
+                    row["created_at"],
+                    owner,
+                    now + lease_seconds,
+                    now,
+                ),
+            )
+
+    def _update(self, job_id: str, owner: str, fields: Dict[str, Any]) -> bool:
+        if "completed_stages" in fields:
+            fields["completed_stages"] = json.dumps(fields["completed_stages"])
+        if fields.get("status") not in (None, *UNFINISHED_STATUSES):
+            # Finished jobs hold no lease
+            fields["owner"] = None
+            fields["lease_expires_at"] = 0
+        columns = ", ".join(f"{column} = ?" for column in fields)
+        with self._db_lock:
+            cursor = self._connect().execute(
+                f"UPDATE jobs SET {columns} WHERE job_id = ? AND owner = ?",
+                (*fields.values(), job_id, owner),
+            )
+        return cursor.rowcount > 0
+
+    def _load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._db_lock:
+            row = self._connect().execute(
+                "SELECT * FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return self._row(row)
+
+    def _heartbeat(self, owner: str, lease_seconds: float) -> int:
+        now = time.time()
+        with self._db_lock:
+            cursor = self._connect().execute(
+                "UPDATE jobs SET heartbeat_at = ?, lease_expires_at = ? "
+                "WHERE owner = ? AND status IN (?, ?)",
+                (now, now + lease_seconds, owner, *UNFINISHED_STATUSES),
+            )
+        return cursor.rowcount
+
+    def _release(self, owner: str) -> int:
+        with self._db_lock:
+            cursor = self._connect().execute(
+                "UPDATE jobs SET owner = NULL, lease_expires_at = 0 "
+                "WHERE owner = ? AND status IN (?, ?)",
+                (owner, *UNFINISHED_STATUSES),
+            )
+        return cursor.rowcount
+
+    def _reclaim(self, owner: str, lease_seconds: float) -> List[Dict[str, Any]]:
+        now = time.time()
+        with self._db_lock:
+            conn = self._connect()
+            # Take the write lock up front so two instances cannot claim the same job
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                job_ids = [
+                    row["job_id"] for row in conn.execute(
+                        "SELECT job_id FROM jobs WHERE status IN (?, ?) AND lease_expires_at < ? "
+                        "AND (owner IS NULL OR owner != ?)",
+                        (*UNFINISHED_STATUSES, now, owner),
+                    )
+                ]
+                for job_id in job_ids:
+                    conn.execute(
+                        "UPDATE jobs SET attempts = attempts + (status = 'running'), "
+                        "status = 'queued', owner = ?, lease_expires_at = ?, heartbeat_at = ? "
+                        "WHERE job_id = ?",
+                        (owner, now + lease_seconds, now, job_id),
+                    )
+                rows = [
+                    self._row(conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone())
+                    for job_id in job_ids
+                ]
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return sorted(rows, key=lambda row: row["created_at"])
+
+    def _purge(self, finished_before: str) -> int:
+        with self._db_lock:
+            cursor = self._connect().execute(
+                "DELETE FROM jobs WHERE status NOT IN (?, ?) AND finished_at < ?",
+                (*UNFINISHED_STATUSES, finished_before),
+            )
+        return cursor.rowcount
@@ -0,0 +1,351 @@
+"""
+Offline batch execution of LLM calls.
+Collects chat completion requests into JSONL batch files, submits them
+through a pluggable backend, polls for completion and resolves the
+waiting callers with the results.
+"""
+import asyncio
+import contextvars
+import json
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Awaitable, Dict, Iterator, List, Optional, Tuple
+
+from app.config import Settings
+from app.utils.exceptions import LLMAPIError
+from app.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+CHAT_COMPLETIONS_URL = "/v1/chat/completions"
+
+# Batch states after which polling stops
+TERMINAL_STATES = {"completed", "failed", "expired", "cancelled"}
+
+
+class BatchBackend(ABC):
+    """A service that runs a JSONL file of chat completion requests."""
+
+    @abstractmethod
+    async def submit(self, input_path: Path) -> str:
+        """Submit a batch input file and return the batch ID."""
+
+    @abstractmethod
+    async def status(self, batch_id: str) -> str:
+        """Get the batch state (validating, in_progress, completed, failed, ...)."""
+
+    @abstractmethod
+    async def fetch_results(self, batch_id: str) -> List[Dict[str, Any]]:
+        """Get the output lines ({custom_id, response, error}) of a finished batch."""
+
+
+class OpenAIBatchBackend(BatchBackend):
+    """Runs batches through the OpenAI Batch API."""
+
+    def __init__(self, client: Any, completion_window: str = "24h"):
+        self.client = client
+        self.completion_window = completion_window
+
+    async def submit(self, input_path: Path) -> str:
+        with open(input_path, "rb") as f:
+            uploaded = await self.client.files.create(file=f, purpose="batch")
+        batch = await self.client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint=CHAT_COMPLETIONS_URL,
+            completion_window=self.completion_window,
+        )
+        return batch.id
+
+    async def status(self, batch_id: str) -> str:
+        batch = await self.client.batches.retrieve(batch_id)
+        return batch.status
+
+    async def fetch_results(self, batch_id: str) -> List[Dict[str, Any]]:
+        batch = await self.client.batches.retrieve(batch_id)
+        lines: List[Dict[str, Any]] = []
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                content = await self.client.files.content(file_id)
+                lines.extend(json.loads(line) for line in content.text.splitlines() if line.strip())
+        return lines
+
+
+class LocalBatchBackend(BatchBackend):
+    """
+    File-based stand-in for a batch service.
+
+    Each batch gets a directory holding input.jsonl, output.jsonl and a
+    status file. Requests are executed in the background with bounded
+    concurrency through LLMService.complete_request, so they take the same
+    backend pool, rate budget and concurrency limiter as online calls.
+    """
+
+    def __init__(self, directory: str, llm_service: Any, concurrency: int = 4):
+        self.directory = Path(directory)
+        self.llm_service = llm_service
+        self.concurrency = concurrency
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def _batch_dir(self, batch_id: str) -> Path:
+        return self.directory / batch_id
+
+    async def submit(self, input_path: Path) -> str:
+        batch_id = f"batch_local_{uuid.uuid4().hex[:12]}"
+        batch_dir = self._batch_dir(batch_id)
+        batch_dir.mkdir(parents=True, exist_ok=True)
+        (batch_dir / "input.jsonl").write_bytes(input_path.read_bytes())
+        self._write_status(batch_id, "in_progress")
+        self._tasks[batch_id] = asyncio.create_task(
+            self._process(batch_id), context=contextvars.Context()
+        )
+        return batch_id
+
+    async def status(self, batch_id: str) -> str:
+        return (self._batch_dir(batch_id) / "status").read_text().strip()
+
+    async def fetch_results(self, batch_id: str) -> List[Dict[str, Any]]:
+        output = self._batch_dir(batch_id) / "output.jsonl"
+        if not output.exists():
+            return []
+        return [json.loads(line) for line in output.read_text().splitlines() if line.strip()]
+
+    def _write_status(self, batch_id: str, state: str) -> None:
+        (self._batch_dir(batch_id) / "status").write_text(state)
+
+    async def _process(self, batch_id: str) -> None:
+        """Execute every request line and write the output file."""
+        batch_dir = self._batch_dir(batch_id)
+        requests = [
+            json.loads(line)
+            for line in (batch_dir / "input.jsonl").read_text().splitlines()
+            if line.strip()
+        ]
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(request: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    response = await self.llm_service.complete_request(request["body"])
+                    body = response.model_dump() if hasattr(response, "model_dump") else response
+                    return {
+                        "custom_id": request["custom_id"],
+                        "response": {"status_code": 200, "body": body},
+                        "error": None,
+                    }
+                except Exception as e:
+                    return {
+                        "custom_id": request["custom_id"],
+                        "response": None,
+                        "error": {"message": str(e), "type": type(e).__name__},
+                    }
+
+        try:
+            results = await asyncio.gather(*(run(r) for r in requests))
+            with open(batch_dir / "output.jsonl", "w", encoding="utf-8") as f:
+                for result in results:
+                    f.write(json.dumps(result) + "\n")
+            self._write_status(batch_id, "completed")
+        except Exception as e:
+            logger.error("Local batch failed", batch_id=batch_id, error=str(e))
+            self._write_status(batch_id, "failed")
+
+
+class LLMBatchCollector:
+    """
+    Gathers LLM requests from concurrent callers into batches.
+
+    Callers register as participants up front. Once every participant is
+    blocked waiting on a result, the pending requests are written to a
+    JSONL file and submitted as one batch; identical requests in a batch
+    are sent once.
+    """
+
+    def __init__(
+        self,
+        backend: BatchBackend,
+        directory: str,
+        poll_interval: float = 30.0,
+        max_requests: int = 50000,
+    ):
+        self.backend = backend
+        self.directory = Path(directory)
+        self.poll_interval = poll_interval
+        self.max_requests = max_requests
+        self._pending: Dict[str, Tuple[Dict[str, Any], asyncio.Future]] = {}
+        self._participants = 0
+        self._blocked = 0
+        self._flushes: List[asyncio.Task] = []
+        self._stats: Dict[str, int] = {"batches": 0, "requests": 0, "deduplicated": 0}
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Get batch counters."""
+        return dict(self._stats)
+
+    def add_participants(self, count: int) -> None:
+        """Register callers that will submit requests."""
+        self._participants += count
+
+    def leave(self) -> None:
+        """Unregister a caller that has finished."""
+        self._participants -= 1
+        self._maybe_flush()
+
+    async def submit(self, key: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Queue one chat completion request and wait for its response body.
+
+        Raises:
+            LLMAPIError: If the batch fails or the request has no result
+        """
+        entry = self._pending.get(key)
+        if entry is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[key] = (body, future)
+        else:
+            future = entry[1]
+            self._stats["deduplicated"] += 1
+
+        self._blocked += 1
+        try:
+            self._maybe_flush()
+            return await asyncio.shield(future)
+        finally:
+            self._blocked -= 1
+
+    def flush(self) -> None:
+        """Submit the pending requests now."""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        # A clean context keeps batch work out of callers' usage and deadlines
+        task = asyncio.create_task(self._run_batch(pending), context=contextvars.Context())
+        self._flushes.append(task)
+        task.add_done_callback(self._flushes.remove)
+
+    def _maybe_flush(self) -> None:
+        """Flush once every participant is waiting, or the batch is full."""
+        if not self._pending:
+            return
+        if len(self._pending) >= self.max_requests or self._blocked >= self._participants:
+            self.flush()
+
+    async def _run_batch(self, pending: Dict[str, Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        """Write, submit and poll one batch, then resolve its futures."""
+        custom_ids = {f"request-{i}": key for i, key in enumerate(pending)}
+        input_path = self.directory / f"batch_input_{uuid.uuid4().hex[:12]}.jsonl"
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(input_path, "w", encoding="utf-8") as f:
+                for custom_id, key in custom_ids.items():
+                    f.write(json.dumps({
+                        "custom_id": custom_id,
+                        "method": "POST",
+                        "url": CHAT_COMPLETIONS_URL,
+                        "body": pending[key][0],
+                    }) + "\n")
+
+            batch_id = await self.backend.submit(input_path)
+            self._stats["batches"] += 1
+            self._stats["requests"] += len(pending)
+            logger.info("LLM batch submitted", batch_id=batch_id, requests=len(pending))
+
+            state = await self.backend.status(batch_id)
+            while state not in TERMINAL_STATES:
+                await asyncio.sleep(self.poll_interval)
+                state = await self.backend.status(batch_id)
+            logger.info("LLM batch finished", batch_id=batch_id, state=state)
+
+            results = {r["custom_id"]: r for r in await self.backend.fetch_results(batch_id)}
+        except Exception as e:
+            logger.error("LLM batch failed", error=str(e))
+            results = {}
+            state = f"error: {e}"
+        finally:
+            # The backend has its own copy once submitted
+            input_path.unlink(missing_ok=True)
+
+        for custom_id, key in custom_ids.items():
+            future = pending[key][1]
+            if future.done():
+                continue
+            result = results.get(custom_id) or {}
+            response = result.get("response") or {}
+            if response.get("status_code") == 200:
+                future.set_result(response["body"])
+            else:
+                error = result.get("error") or response.get("body") or {"message": state}
+                future.set_exception(LLMAPIError(
+                    message=f"Batch request failed: {error}",
+                    provider="OpenAI",
+                    details={"state": "batch_request_failed", "batch_state": state},
+                ))
+
+
+_current_batch: ContextVar[Optional[LLMBatchCollector]] = ContextVar(
+    "collabgen_llm_batch", default=None
+)
+
+
+def current_batch() -> Optional[LLMBatchCollector]:
+    """Get the batch collector active in the current context, if any."""
+    return _current_batch.get()
+
+
+@contextmanager
+def batch_scope(collector: LLMBatchCollector) -> Iterator[LLMBatchCollector]:
+    """Route LLM calls made in the enclosed block through a batch collector."""
+    token = _current_batch.set(collector)
+    try:
+        yield collector
+    finally:
+        _current_batch.reset(token)
+
+
+async def gather_calls(*calls: Awaitable[Any]) -> List[Any]:
+    """
+    Run concurrent LLM calls made on behalf of one caller.
+    
+    Inside a batch scope the caller counts as one participant per call
+    still running, so the collector waits for all of them before it
+    flushes. The first failure cancels the remaining calls.
+    """
+    collector = current_batch()
+    remaining = len(calls)
+    if collector is not None and remaining > 1:
+        collector.add_participants(remaining - 1)
+    
+    async def run(call: Awaitable[Any]) -> Any:
+        nonlocal remaining
+        try:
+            return await call
+        finally:
+            remaining -= 1
+            # The last call hands the participant slot back to the caller
+            if collector is not None and remaining:
+                collector.leave()
+    
+    tasks = [asyncio.create_task(run(call)) for call in calls]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+
+def build_batch_backend(settings: Settings, llm_service: Any) -> BatchBackend:
+    """Build the batch backend selected by LLM_BATCH_BACKEND."""
+    if settings.LLM_BATCH_BACKEND == "openai":
+        return OpenAIBatchBackend(
+            llm_service.client,
+            completion_window=settings.LLM_BATCH_COMPLETION_WINDOW,
+        )
+    return LocalBatchBackend(
+        directory=settings.LLM_BATCH_DIRECTORY,
+        llm_service=llm_service,
+        concurrency=settings.LLM_BATCH_LOCAL_CONCURRENCY,
+    )
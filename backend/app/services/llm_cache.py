@@ -0,0 +1,206 @@
+"""
+Two-tier response cache for LLM completions.
+An in-memory LRU tier backed by a SQLite tier that survives restarts.
+"""
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from app.utils.logging import get_logger
+from app.utils.telemetry import LLM_CACHE_EVENTS
+
+logger = get_logger(__name__)
+
+
+class LLMResponseCache:
+    """
+    Cache for generated LLM content keyed on a hash of the request inputs.
+
+    Lookups check the memory tier first, then the disk tier. Disk hits are
+    promoted back into memory. Both tiers expire entries after the TTL.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        ttl_seconds: int = 86400,
+        max_memory_bytes: int = 64 * 1024 * 1024,
+        disk_enabled: bool = True,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_bytes = max_memory_bytes
+        self.disk_enabled = disk_enabled
+        self.db_path = Path(directory) / "llm_cache.sqlite3"
+        self._memory: "OrderedDict[str, Tuple[float, str, int]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._stats: Dict[str, int] = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+
+    @staticmethod
+    def make_key(**parts: Any) -> str:
+        """Build a stable cache key from the request inputs."""
+        payload = json.dumps(parts, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Get cache counters plus current memory tier size."""
+        return {
+            **self._stats,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+        }
+
+    def _count(self, tier: str, event: str, stat: str) -> None:
+        """Increment a local counter and its Prometheus equivalent."""
+        self._stats[stat] += 1
+        LLM_CACHE_EVENTS.labels(tier=tier, event=event).inc()
+
+    async def get(self, key: str) -> Optional[str]:
+        """
+        Look up cached content.
+
+        Returns:
+            The cached content, or None on a miss
+        """
+        now = time.time()
+
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, value, _ = entry
+            if expires_at > now:
+                self._memory.move_to_end(key)
+                self._count("memory", "hit", "memory_hits")
+                return value
+            self._memory_remove(key)
+            self._count("memory", "expired", "expirations")
+
+        if self.disk_enabled:
+            try:
+                row = await asyncio.to_thread(self._disk_get, key, now)
+            except Exception as e:
+                logger.warning("LLM cache disk read failed", error=str(e))
+                row = None
+            if row is not None:
+                value, expires_at = row
+                self._memory_put(key, value, expires_at)
+                self._count("disk", "hit", "disk_hits")
+                return value
+
+        self._count("all", "miss", "misses")
+        return None
+
+    async def set(self, key: str, value: str) -> None:
+        """Store content in both tiers."""
+        expires_at = time.time() + self.ttl_seconds
+        self._memory_put(key, value, expires_at)
+        self._stats["writes"] += 1
+
+        if self.disk_enabled:
+            try:
+                await asyncio.to_thread(self._disk_set, key, value, expires_at)
+            except Exception as e:
+                logger.warning("LLM cache disk write failed", error=str(e))
+
+    async def invalidate(self, key: str) -> None:
+        """Remove a single entry from both tiers."""
+        self._memory_remove(key)
+        if self.disk_enabled:
+            await asyncio.to_thread(self._disk_delete, key)
+
+    async def clear(self) -> None:
+        """Remove all entries from both tiers."""
+        self._memory.clear()
+        self._memory_bytes = 0
+        if self.disk_enabled:
+            await asyncio.to_thread(self._disk_clear)
+
+    # Memory tier
+
+    def _memory_put(self, key: str, value: str, expires_at: float) -> None:
+        """Insert into the LRU tier, evicting the oldest entries over the byte cap."""
+        size = len(value.encode("utf-8"))
+        if size > self.max_memory_bytes:
+            return
+
+        self._memory_remove(key)
+        self._memory[key] = (expires_at, value, size)
+        self._memory_bytes += size
+
+        while self._memory_bytes > self.max_memory_bytes:
+            oldest = next(iter(self._memory))
+            self._memory_remove(oldest)
+            self._count("memory", "eviction", "evictions")
+
+    def _memory_remove(self, key: str) -> None:
+        """Remove an entry from the LRU tier if present."""
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._memory_bytes -= entry[2]
+
+    # Disk tier (runs in worker threads)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the SQLite database on first use."""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _disk_get(self, key: str, now: float) -> Optional[Tuple[str, float]]:
+        with self._db_lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                conn.commit()
+                self._stats["expirations"] += 1
+                return None
+            return row[0], row[1]
+
+    def _disk_set(self, key: str, value: str, expires_at: float) -> None:
+        with self._db_lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at),
+            )
+            conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),))
+            conn.commit()
+
+    def _disk_delete(self, key: str) -> None:
+        with self._db_lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            conn.commit()
+
+    def _disk_clear(self) -> None:
+        with self._db_lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM llm_cache")
+            conn.commit()
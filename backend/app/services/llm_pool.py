@@ -0,0 +1,208 @@
+"""
+Pool of OpenAI-compatible LLM backends.
+Routes each call to the healthy backend with the fewest outstanding
+requests and drains backends that report rate limiting. Each backend
+owns its rate budget and concurrency limit, so added keys add capacity.
+"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import openai
+
+from app.services.circuit_breaker import CircuitBreaker, OPEN
+from app.services.concurrency_limiter import AdaptiveConcurrencyLimiter
+from app.services.rate_scheduler import RateScheduler
+from app.utils.exceptions import DeadlineExceededError, LLMAPIError
+from app.utils.logging import get_logger
+from app.utils.telemetry import LLM_BACKEND_DRAINS, LLM_BACKEND_OUTSTANDING
+
+logger = get_logger(__name__)
+
+# Upper bound on a provider-supplied Retry-After
+MAX_DRAIN_SECONDS = 300.0
+
+# LLMAPIError states raised by local backpressure rather than the provider
+LOCAL_REJECTION_STATES = {"concurrency_limited", "rate_budget_exhausted"}
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Read the Retry-After header from an API error, if present."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value is not None:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+class LLMBackend:
+    """
+    One OpenAI-compatible endpoint: a client, a model and its health state.
+
+    The rate scheduler holds this backend's RPM/TPM quota and the limiter
+    its AIMD concurrency limit; both default to unlimited.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        client: Any,
+        model: str,
+        breaker: CircuitBreaker,
+        scheduler: Optional[RateScheduler] = None,
+        limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+    ):
+        self.name = name
+        self.client = client
+        self.model = model
+        self.breaker = breaker
+        self.scheduler = scheduler or RateScheduler(name=name)
+        self.limiter = limiter or AdaptiveConcurrencyLimiter(name=name)
+        self.outstanding = 0
+        self.drained_until = 0.0
+        self.calls = 0
+        self.failures = 0
+        self.drains = 0
+        self._last_selected = 0
+
+    @property
+    def is_drained(self) -> bool:
+        """Whether the backend is resting after a rate-limit response."""
+        return time.monotonic() < self.drained_until
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Get routing counters and health state."""
+        return {
+            "name": self.name,
+            "model": self.model,
+            "outstanding": self.outstanding,
+            "calls": self.calls,
+            "failures": self.failures,
+            "drains": self.drains,
+            "drained_for_seconds": round(max(0.0, self.drained_until - time.monotonic()), 2),
+            "circuit": self.breaker.state,
+            "limiter": self.limiter.stats,
+            "scheduler": self.scheduler.stats,
+        }
+
+
+class LLMBackendPool:
+    """
+    Least-outstanding-requests router over a set of backends.
+
+    Backends with an open circuit or an active drain are skipped; ties are
+    broken by least recent selection so idle traffic spreads evenly.
+    """
+
+    def __init__(self, backends: List[LLMBackend], drain_seconds: float = 30.0):
+        if not backends:
+            raise ValueError("LLMBackendPool needs at least one backend")
+        self.backends = backends
+        self.drain_seconds = drain_seconds
+        self._selections = 0
+
+    @property
+    def primary(self) -> LLMBackend:
+        """The first configured backend."""
+        return self.backends[0]
+
+    @property
+    def stats(self) -> List[Dict[str, Any]]:
+        """Get per-backend statistics."""
+        return [backend.stats for backend in self.backends]
+
+    def select(self) -> LLMBackend:
+        """
+        Pick a backend for one call.
+
+        Raises:
+            LLMAPIError: If every backend is drained or has an open circuit
+        """
+        candidates = sorted(
+            (
+                b for b in self.backends
+                if not b.is_drained and b.breaker.state != OPEN
+            ),
+            key=lambda b: (b.outstanding, b._last_selected),
+        )
+        for backend in candidates:
+            # Takes a probe permit when the backend is half-open
+            if backend.breaker.allow_request():
+                self._selections += 1
+                backend._last_selected = self._selections
+                return backend
+
+        now = time.monotonic()
+        drains = [b.drained_until - now for b in self.backends if b.is_drained]
+        raise LLMAPIError(
+            message="No LLM backend available (all drained or circuit open)",
+            provider="OpenAI",
+            details={
+                "state": "no_backend_available",
+                "retry_after": round(min(drains), 3) if drains else None,
+                "backends": self.stats,
+            },
+        )
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[LLMBackend]:
+        """
+        Hold a backend for the duration of one call.
+
+        The call outcome feeds the backend's circuit breaker; a rate-limit
+        error drains the backend for Retry-After (or drain_seconds).
+        """
+        backend = self.select()
+        backend.outstanding += 1
+        backend.calls += 1
+        LLM_BACKEND_OUTSTANDING.labels(backend=backend.name).set(backend.outstanding)
+        try:
+            yield backend
+        except BaseException as e:
+            self._record_error(backend, e)
+            raise
+        else:
+            backend.breaker.record_success()
+        finally:
+            backend.outstanding -= 1
+            LLM_BACKEND_OUTSTANDING.labels(backend=backend.name).set(backend.outstanding)
+
+    def drain(self, backend: LLMBackend, seconds: Optional[float] = None) -> None:
+        """Stop routing to a backend for a while."""
+        seconds = min(MAX_DRAIN_SECONDS, seconds if seconds is not None else self.drain_seconds)
+        backend.drained_until = max(backend.drained_until, time.monotonic() + seconds)
+        backend.drains += 1
+        LLM_BACKEND_DRAINS.labels(backend=backend.name).inc()
+        logger.warning("LLM backend drained", backend=backend.name, seconds=round(seconds, 2))
+
+    def _record_error(self, backend: LLMBackend, error: BaseException) -> None:
+        """Classify a failed call against the backend's health."""
+        if isinstance(
+            error,
+            (asyncio.CancelledError, GeneratorExit, openai.BadRequestError, DeadlineExceededError),
+        ) or (
+            isinstance(error, LLMAPIError) and error.details.get("state") in LOCAL_REJECTION_STATES
+        ):
+            backend.breaker.release()
+            return
+        backend.failures += 1
+        if isinstance(error, openai.RateLimitError):
+            # Quota pressure, not an outage: drain instead of tripping the breaker
+            backend.breaker.release()
+            self.drain(backend, retry_after_seconds(error))
+            return
+        backend.breaker.record_failure()
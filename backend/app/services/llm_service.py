@@ -1,78 +1,511 @@
 """
 LLM Service for OpenAI GPT-4 API integration.
-Implements retry logic and error handling.
+Implements retry logic, error handling, and response caching.
 """
 import asyncio
-from typing import Any, Dict, List, Optional
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import httpx
+import openai
 from openai import AsyncOpenAI
-from tenacity import (
-    retry,
-    stop_after_attempt,
-    wait_exponential,
-    retry_if_exception_type,
-)
+from openai.types import CompletionUsage
 
-from app.config import get_settings
-from app.utils.exceptions import LLMAPIError, TimeoutError
+from app.config import Settings, get_settings
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.concurrency_limiter import AdaptiveConcurrencyLimiter
+from app.services.deadline import capped_timeout, check_deadline
+from app.services.health_monitor import build_health_signal
+from app.services.hedging import HedgingPolicy
+from app.services.llm_batch import LLMBatchCollector, current_batch
+from app.services.llm_cache import LLMResponseCache
+from app.services.llm_pool import LOCAL_REJECTION_STATES, LLMBackend, LLMBackendPool
+from app.services.llm_transport import RecordingTransport, ReplayTransport, resolve_key_function
+from app.services.rate_scheduler import RateScheduler, Reservation
+from app.services.retry_policy import RetryBudget, RetryPolicy
+from app.services.semantic_cache import SemanticCache
+from app.services.single_flight import SingleFlight
+from app.services.tokenizer import context_window, count_message_tokens, plan_max_tokens
+from app.services.usage_tracker import current_scope, record_usage
+from app.utils.exceptions import (
+    DeadlineExceededError,
+    LLMAPIError,
+    TimeoutError,
+    ValidationError,
+)
 from app.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Output budget reserved (and checked against the context window) when a
+# call does not set max_tokens; the provider's own limit then applies
+DEFAULT_MAX_OUTPUT_TOKENS = 4096
+
+
+def http2_available(settings: Settings) -> bool:
+    """
+    Check whether HTTP/2 is requested and usable.
+    
+    HTTP/2 needs the optional `h2` package; without it connections fall
+    back to HTTP/1.1 keep-alive.
+    """
+    if not settings.LLM_HTTP2_ENABLED:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("HTTP/2 requested but h2 is not installed, using HTTP/1.1")
+        return False
+    return True
+
+
+def build_connection_transport(settings: Settings, http2: bool = False) -> httpx.AsyncHTTPTransport:
+    """Build the pooled network transport that holds the provider connections."""
+    return httpx.AsyncHTTPTransport(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+def build_http_client(
+    settings: Settings,
+    connection_transport: Optional[httpx.AsyncHTTPTransport] = None,
+) -> httpx.AsyncClient:
+    """
+    Build the shared HTTP client used by the OpenAI SDK.
+    
+    LLM_TRANSPORT_MODE can wrap the connection transport to record
+    exchanges to a cassette or replay them offline.
+    """
+    transport: httpx.AsyncBaseTransport = connection_transport or build_connection_transport(
+        settings, http2_available(settings)
+    )
+    mode = settings.LLM_TRANSPORT_MODE
+    if mode != "live":
+        key_function = resolve_key_function(settings.LLM_CASSETTE_KEY)
+        if mode == "record":
+            transport = RecordingTransport(settings.LLM_CASSETTE_PATH, transport, key_function)
+        else:
+            transport = ReplayTransport(
+                settings.LLM_CASSETTE_PATH,
+                key_function,
+                latency_scale=settings.LLM_REPLAY_LATENCY_SCALE,
+            )
+        logger.info("LLM transport wrapped", mode=mode, cassette=settings.LLM_CASSETTE_PATH)
+    
+    return httpx.AsyncClient(
+        transport=transport,
+        timeout=httpx.Timeout(
+            settings.TIMEOUT_LLM_REQUEST,
+            connect=settings.LLM_HTTP_CONNECT_TIMEOUT,
+        ),
+        follow_redirects=True,
+    )
+
+
+def build_backend_pool(settings: Settings, http_client: httpx.AsyncClient) -> LLMBackendPool:
+    """
+    Build the backend pool from settings.
+    
+    Every backend shares the HTTP client and gets its own circuit breaker,
+    RPM/TPM budget and concurrency limiter. A backend entry may set "rpm",
+    "tpm" and "max_concurrency"; otherwise the LLM_RATE_LIMIT_* and
+    LLM_CONCURRENCY_* settings apply to each backend. SDK-level retries
+    are disabled; RetryPolicy owns retries.
+    
+    Every backend must serve the same model: the response cache and
+    single-flight keys are built before a backend is leased, so a pool
+    mixing models would hand one model's answer to a caller routed to
+    another.
+    
+    Raises:
+        ValueError: If the backends name different models
+    """
+    models = {spec.get("model") or settings.OPENAI_MODEL for spec in settings.llm_backends_list}
+    if len(models) > 1:
+        raise ValueError(
+            f"LLM_BACKENDS must all serve the same model, got {', '.join(sorted(models))}"
+        )
+    backends = []
+    for index, spec in enumerate(settings.llm_backends_list):
+        name = spec.get("name") or f"backend-{index}"
+        backends.append(LLMBackend(
+            name=name,
+            client=AsyncOpenAI(
+                api_key=spec["api_key"],
+                base_url=spec.get("base_url") or None,
+                http_client=http_client,
+                max_retries=0,
+            ),
+            model=spec.get("model") or settings.OPENAI_MODEL,
+            breaker=CircuitBreaker(
+                name=f"openai:{name}",
+                failure_threshold=settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+                error_rate=settings.CIRCUIT_BREAKER_ERROR_RATE,
+                window_seconds=settings.CIRCUIT_BREAKER_WINDOW_SECONDS,
+                recovery_timeout=settings.CIRCUIT_BREAKER_RECOVERY_TIMEOUT,
+                half_open_max_calls=settings.CIRCUIT_BREAKER_HALF_OPEN_MAX_CALLS,
+            ),
+            scheduler=RateScheduler(
+                requests_per_minute=spec.get("rpm", settings.LLM_RATE_LIMIT_RPM),
+                tokens_per_minute=spec.get("tpm", settings.LLM_RATE_LIMIT_TPM),
+                max_wait_seconds=settings.LLM_RATE_LIMIT_MAX_WAIT,
+                name=name,
+            ),
+            limiter=AdaptiveConcurrencyLimiter(
+                initial_limit=settings.LLM_CONCURRENCY_INITIAL,
+                min_limit=settings.LLM_CONCURRENCY_MIN,
+                max_limit=spec.get("max_concurrency", settings.LLM_CONCURRENCY_MAX),
+                latency_tolerance=settings.LLM_CONCURRENCY_LATENCY_TOLERANCE,
+                max_wait_seconds=settings.LLM_CONCURRENCY_MAX_WAIT,
+                name=name,
+            ),
+        ))
+    return LLMBackendPool(backends, drain_seconds=settings.LLM_BACKEND_DRAIN_SECONDS)
+
 
 class LLMService:
     """Service for interacting with OpenAI GPT-4 LLM."""
     
     def __init__(self):
         self.settings = get_settings()
-        self.client = AsyncOpenAI(api_key=self.settings.OPENAI_API_KEY)
-        self.model = self.settings.OPENAI_MODEL
+        self.http2_enabled = http2_available(self.settings)
+        # Kept so pool statistics survive record/replay wrapping
+        self.connection_transport = build_connection_transport(self.settings, self.http2_enabled)
+        self.http_client = build_http_client(self.settings, self.connection_transport)
+        self.pool = build_backend_pool(self.settings, self.http_client)
+        self.model = self.pool.primary.model
+        self.context_window = self.settings.LLM_CONTEXT_WINDOW or min(
+            context_window(backend.model) for backend in self.pool.backends
+        )
         self._total_tokens_used = 0
-        self._failure_count = 0
-        self._max_failures = self.settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD
+        self.cache: Optional[LLMResponseCache] = None
+        if self.settings.LLM_CACHE_ENABLED:
+            self.cache = LLMResponseCache(
+                directory=self.settings.LLM_CACHE_DIRECTORY,
+                ttl_seconds=self.settings.LLM_CACHE_TTL_SECONDS,
+                max_memory_bytes=self.settings.LLM_CACHE_MAX_MEMORY_MB * 1024 * 1024,
+                disk_enabled=self.settings.LLM_CACHE_DISK_ENABLED,
+            )
+        self.semantic_cache: Optional[SemanticCache] = None
+        if self.settings.LLM_SEMANTIC_CACHE_ENABLED:
+            self.semantic_cache = SemanticCache(
+                max_entries=self.settings.LLM_SEMANTIC_CACHE_MAX_ENTRIES,
+                ttl_seconds=self.settings.LLM_CACHE_TTL_SECONDS,
+            )
+        self._single_flight = SingleFlight()
+        self.retry_policy = RetryPolicy(
+            max_retries=self.settings.MAX_RETRIES,
+            initial_delay=self.settings.RETRY_INITIAL_DELAY,
+            max_delay=self.settings.RETRY_MAX_DELAY,
+            backoff_factor=self.settings.RETRY_BACKOFF_FACTOR,
+            budget=RetryBudget(
+                ratio=self.settings.RETRY_BUDGET_RATIO,
+                min_retries=self.settings.RETRY_BUDGET_MIN_RETRIES,
+                window_seconds=self.settings.RETRY_BUDGET_WINDOW_SECONDS,
+            ),
+        )
+        self.hedging: Optional[HedgingPolicy] = None
+        if self.settings.LLM_HEDGING_ENABLED:
+            self.hedging = HedgingPolicy(
+                percentile=self.settings.LLM_HEDGE_PERCENTILE,
+                budget_percent=self.settings.LLM_HEDGE_BUDGET_PERCENT,
+                min_samples=self.settings.LLM_HEDGE_MIN_SAMPLES,
+            )
+        self.health = build_health_signal(self.settings, "llm", self._probe)
+    
+    @property
+    def client(self) -> AsyncOpenAI:
+        """Client of the primary backend."""
+        return self.pool.primary.client
+    
+    @client.setter
+    def client(self, client: AsyncOpenAI) -> None:
+        self.pool.primary.client = client
     
     @property
     def tokens_used(self) -> int:
-        """Get total tokens used in this session."""
+        """
+        Get total tokens used by this process.
+        
+        Shared by every caller; use usage_tracker.track_usage for per-request usage.
+        """
         return self._total_tokens_used
     
     def reset_token_count(self) -> None:
         """Reset the token counter."""
         self._total_tokens_used = 0
     
+    @property
+    def cache_stats(self) -> Dict[str, int]:
+        """Get response cache counters (empty when caching is disabled)."""
+        return self.cache.stats if self.cache is not None else {}
+    
+    @property
+    def scheduler_stats(self) -> Dict[str, Dict[str, float]]:
+        """Get RPM/TPM scheduler counters and bucket balances per backend."""
+        return {backend.name: backend.scheduler.stats for backend in self.pool.backends}
+    
+    @property
+    def limiter_stats(self) -> Dict[str, Dict[str, float]]:
+        """Get adaptive concurrency limiter gauges per backend."""
+        return {backend.name: backend.limiter.stats for backend in self.pool.backends}
+    
+    @property
+    def single_flight_stats(self) -> Dict[str, int]:
+        """Get single-flight coalescing counters."""
+        return self._single_flight.stats
+    
     @property
     def is_circuit_open(self) -> bool:
-        """Check if circuit breaker is open (too many failures)."""
-        return self._failure_count >= self._max_failures
+        """Check if every backend's circuit breaker is open (rejecting calls)."""
+        return all(backend.breaker.is_open for backend in self.pool.backends)
+    
+    @property
+    def circuit_stats(self) -> Dict[str, Dict[str, object]]:
+        """Get circuit breaker state and transition counters per backend."""
+        return {backend.name: backend.breaker.stats for backend in self.pool.backends}
     
     def _record_success(self) -> None:
         """Record a successful API call."""
-        self._failure_count = 0
+        self.health.record(True)
     
-    def _record_failure(self) -> None:
-        """Record a failed API call."""
-        self._failure_count += 1
+    def _record_failure(self, error: Optional[BaseException] = None) -> None:
+        """
+        Record a failed API call, ignoring errors that say nothing about provider health.
+        
+        Circuit breaking is per backend and happens in LLMBackendPool.lease;
+        this only feeds the passive health signal.
+        """
+        if error is not None and not self._is_provider_failure(error):
+            return
+        self.health.record(False)
+    
+    @staticmethod
+    def _is_provider_failure(error: BaseException) -> bool:
+        """Check whether an error says the provider is failing (not just busy or rejected locally)."""
+        if isinstance(
+            error,
+            (
+                asyncio.CancelledError,
+                openai.BadRequestError,
+                openai.RateLimitError,
+                ValidationError,
+                DeadlineExceededError,
+            ),
+        ):
+            return False
+        if isinstance(error, LLMAPIError):
+            return error.details.get("state") not in LOCAL_REJECTION_STATES | {"no_backend_available"}
+        return True
+    
+    def _build_messages(
+        self,
+        prompt: str,
+        system_instruction: Optional[str] = None,
+    ) -> List[Dict[str, str]]:
+        """Build the OpenAI message list for a single prompt."""
+        messages = []
+        if system_instruction:
+            messages.append({"role": "system", "content": system_instruction})
+        messages.append({"role": "user", "content": prompt})
+        return messages
+    
+    def _estimate_tokens(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: Optional[int] = None,
+    ) -> int:
+        """Estimate the total token cost of a call for rate budgeting."""
+        return count_message_tokens(messages, self.model) + (max_tokens or DEFAULT_MAX_OUTPUT_TOKENS)
+    
+    def _plan_max_tokens(self, prompt_tokens: int, requested: Optional[int]) -> Optional[int]:
+        """
+        Size max_tokens to the room the prompt leaves in the context window.
+        
+        Returns:
+            max_tokens to send, or None to leave it unset: the caller set no
+            limit and the window has room for DEFAULT_MAX_OUTPUT_TOKENS
+            
+        Raises:
+            ValidationError: If the prompt does not fit the context window
+        """
+        max_tokens = plan_max_tokens(
+            prompt_tokens,
+            requested or DEFAULT_MAX_OUTPUT_TOKENS,
+            self.context_window,
+            min_output_tokens=self.settings.LLM_MIN_OUTPUT_TOKENS,
+        )
+        if requested is None:
+            return max_tokens if max_tokens < DEFAULT_MAX_OUTPUT_TOKENS else None
+        if max_tokens < requested:
+            logger.info(
+                "Reduced max_tokens to fit the context window",
+                prompt_tokens=prompt_tokens,
+                requested=requested,
+                max_tokens=max_tokens,
+            )
+        return max_tokens
+    
+    async def _wait_for(self, awaitable: Any, timeout: float, operation: str) -> Any:
+        """
+        Await with a timeout already capped by the request deadline.
+        
+        A timeout that was shortened by the deadline raises
+        DeadlineExceededError, so it is not mistaken for a slow provider.
+        """
+        try:
+            return await asyncio.wait_for(awaitable, timeout=timeout)
+        except asyncio.TimeoutError:
+            if timeout < self.settings.TIMEOUT_LLM_REQUEST:
+                raise DeadlineExceededError(operation=operation, timeout_seconds=timeout)
+            raise
+    
+    async def _create_completion(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: Optional[int] = None,
+        latency_key: Optional[str] = None,
+        count_usage: bool = True,
+        **params: Any,
+    ) -> Any:
+        """
+        Dispatch a chat completion within a backend's rate budget and concurrency limit.
+        
+        The prompt is checked against the context window and max_tokens sized
+        to fit before anything is sent. The call goes to the least-loaded
+        healthy backend in the pool and waits for that backend's RPM/TPM
+        budget and concurrency slot. Its timeout is capped by the active
+        request deadline, and the reservation is settled against the
+        reported usage. With `latency_key`, the provider request time
+        (excluding those waits) is recorded for hedging. Without
+        `count_usage`, the usage is left for the caller to record.
+        """
+        check_deadline("llm_call")
+        prompt_tokens = count_message_tokens(messages, self.model)
+        max_tokens = self._plan_max_tokens(prompt_tokens, max_tokens)
+        if max_tokens is not None:
+            params["max_tokens"] = max_tokens
+        usage_tokens: Optional[int] = None
+        async with self.pool.lease() as backend:
+            reservation = await backend.scheduler.reserve(
+                prompt_tokens + (max_tokens or DEFAULT_MAX_OUTPUT_TOKENS)
+            )
+            try:
+                started = time.monotonic()
+                async with backend.limiter.slot() as slot:
+                    sent = time.monotonic()
+                    response = await self._wait_for(
+                        backend.client.chat.completions.create(
+                            model=backend.model,
+                            messages=messages,
+                            **params,
+                        ),
+                        capped_timeout(self.settings.TIMEOUT_LLM_REQUEST),
+                        "llm_call",
+                    )
+                    if latency_key is not None and self.hedging is not None:
+                        self.hedging.record(latency_key, time.monotonic() - sent)
+                    if response and response.usage:
+                        slot.completion_tokens = response.usage.completion_tokens
+                if response and response.usage:
+                    usage_tokens = response.usage.total_tokens
+                    if count_usage:
+                        self._record_usage(response.usage, time.monotonic() - started)
+                return response
+            finally:
+                backend.scheduler.reconcile(reservation, usage_tokens)
+    
+    async def complete_request(self, body: Dict[str, Any]) -> Any:
+        """
+        Send a chat completion request body, as written to batch input files.
+        
+        Goes through the same admission path as every other call (context
+        window check, backend pool, rate budget and concurrency limit); the
+        leased backend decides the model. Usage is not recorded here: the
+        batch caller records it from the result.
+        """
+        params = {name: value for name, value in body.items() if name != "model"}
+        return await self._create_completion(count_usage=False, **params)
+    
+    def _record_usage(self, usage: Any, elapsed_seconds: float) -> None:
+        """Add reported usage to the session total and the active usage context."""
+        self._total_tokens_used += usage.total_tokens
+        details = getattr(usage, "prompt_tokens_details", None)
+        record_usage(
+            prompt_tokens=usage.prompt_tokens or 0,
+            completion_tokens=usage.completion_tokens or 0,
+            llm_time_ms=elapsed_seconds * 1000,
+            cached_tokens=getattr(details, "cached_tokens", None) or 0,
+        )
+    
+    def _request_key(
+        self,
+        prompt: str,
+        system_instruction: Optional[str],
+        temperature: float,
+        max_output_tokens: Optional[int],
+    ) -> str:
+        """Get the normalized identity of a completion request (the pool serves one model)."""
+        return LLMResponseCache.make_key(
+            model=self.model,
+            system_instruction=(system_instruction or "").strip(),
+            prompt=prompt.strip(),
+            temperature=temperature,
+            max_output_tokens=max_output_tokens,
+        )
+    
+    def _cache_key(
+        self,
+        prompt: str,
+        system_instruction: Optional[str],
+        temperature: float,
+        max_output_tokens: Optional[int],
+        bypass_cache: bool = False,
+    ) -> Optional[str]:
+        """Get the response cache key, or None when caching does not apply."""
+        if self.cache is None or bypass_cache:
+            return None
+        return self._request_key(prompt, system_instruction, temperature, max_output_tokens)
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=1, max=30),
-        retry=retry_if_exception_type((ConnectionError, asyncio.TimeoutError)),
-        reraise=True,
-    )
     async def generate_content(
         self,
         prompt: str,
         system_instruction: Optional[str] = None,
         temperature: float = 0.7,
-        max_output_tokens: int = 4096,
+        max_output_tokens: Optional[int] = None,
+        bypass_cache: bool = False,
+        refresh_cache: bool = False,
+        similarity_text: Optional[str] = None,
+        similarity_scope: Optional[str] = None,
+        similarity_threshold: Optional[float] = None,
     ) -> str:
         """
         Generate content using OpenAI GPT-4 API with retry logic.
         
+        Transient failures (429, 5xx, timeouts, connection errors) are
+        retried by RetryPolicy within the process-wide retry budget.
+        
+        Identical requests are served from the response cache when enabled,
+        and concurrent identical requests share a single API call. When
+        `similarity_text` is given and the semantic cache is enabled, a
+        cached response for a near-duplicate text in the same scope is
+        returned as well.
+        
         Args:
             prompt: The user prompt
             system_instruction: Optional system instruction
             temperature: Creativity parameter (0.0-2.0)
-            max_output_tokens: Maximum tokens in response
+            max_output_tokens: Maximum tokens in response (default: no limit
+                beyond the room the prompt leaves in the context window)
+            bypass_cache: Skip the cache entirely (no read, no write)
+            refresh_cache: Skip the cache read but store the fresh result
+            similarity_text: Text compared by the semantic cache
+            similarity_scope: Inputs that must match exactly for a semantic hit
+            similarity_threshold: Minimum similarity (0-1) for a semantic hit
             
         Returns:
             Generated text content
@@ -81,21 +514,84 @@ class LLMService:
             LLMAPIError: If API call fails after retries
             TimeoutError: If request times out
         """
+        cache_key = self._cache_key(
+            prompt, system_instruction, temperature, max_output_tokens, bypass_cache
+        )
+        if cache_key is not None:
+            if not refresh_cache:
+                cached = await self.cache.get(cache_key)
+                if cached is not None:
+                    logger.info(
+                        "LLM cache hit",
+                        model=self.model,
+                        response_length=len(cached),
+                    )
+                    return cached
+        
+        semantic_entry: Optional[Tuple[str, str]] = None
+        if self.semantic_cache is not None and similarity_text and not bypass_cache:
+            namespace = LLMResponseCache.make_key(
+                model=self.model,
+                system_instruction=(system_instruction or "").strip(),
+                temperature=temperature,
+                max_output_tokens=max_output_tokens,
+                scope=similarity_scope or "",
+            )
+            semantic_entry = (namespace, similarity_text)
+            threshold = (
+                similarity_threshold
+                if similarity_threshold is not None
+                else self.settings.LLM_SEMANTIC_CACHE_THRESHOLD
+            )
+            if not refresh_cache and threshold <= 1:
+                similar = self.semantic_cache.lookup(namespace, similarity_text, threshold)
+                if similar is not None:
+                    logger.info(
+                        "LLM semantic cache hit",
+                        model=self.model,
+                        response_length=len(similar),
+                    )
+                    return similar
+        
+        request_key = self._request_key(
+            prompt, system_instruction, temperature, max_output_tokens
+        )
+        batch = current_batch()
+        if batch is not None:
+            return await self._generate_batched(
+                batch,
+                request_key,
+                prompt,
+                system_instruction,
+                temperature,
+                max_output_tokens,
+                cache_key,
+                semantic_entry,
+            )
+        return await self._single_flight.run(
+            request_key,
+            lambda: self._generate(
+                prompt,
+                system_instruction,
+                temperature,
+                max_output_tokens,
+                cache_key,
+                semantic_entry,
+            ),
+        )
+    
+    async def _generate(
+        self,
+        prompt: str,
+        system_instruction: Optional[str],
+        temperature: float,
+        max_output_tokens: Optional[int],
+        cache_key: Optional[str] = None,
+        semantic_entry: Optional[Tuple[str, str]] = None,
+    ) -> str:
+        """Call the chat completions API and store the result in the caches."""
         try:
-            # Check circuit breaker state
-            if self.is_circuit_open:
-                logger.warning("Circuit breaker is open, returning fallback")
-                raise LLMAPIError(
-                    message="LLM service temporarily unavailable (circuit breaker open)",
-                    provider="OpenAI",
-                    details={"state": "circuit_breaker_open"}
-                )
-            
-            # Build messages
-            messages = []
-            if system_instruction:
-                messages.append({"role": "system", "content": system_instruction})
-            messages.append({"role": "user", "content": prompt})
+            messages = self._build_messages(prompt, system_instruction)
             
             # Make the API call with timeout
             logger.info(
@@ -105,15 +601,25 @@ class LLMService:
                 temperature=temperature,
             )
             
-            response = await asyncio.wait_for(
-                self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
+            # Hedge delays are learned per agent (pipeline stage) and operation
+            hedge_key = f"{current_scope() or 'default'}:generate_content"
+            
+            def attempt():
+                return self._create_completion(
+                    messages,
                     temperature=temperature,
                     max_tokens=max_output_tokens,
-                ),
-                timeout=self.settings.TIMEOUT_LLM_REQUEST,
-            )
+                    latency_key=hedge_key,
+                )
+            
+            if self.hedging is not None:
+                cost = self._estimate_tokens(messages, max_output_tokens)
+                response = await self.retry_policy.run(
+                    lambda: self.hedging.run(attempt, cost=cost, key=hedge_key),
+                    operation="generate_content",
+                )
+            else:
+                response = await self.retry_policy.run(attempt, operation="generate_content")
             
             # Check for valid response
             if not response or not response.choices:
@@ -130,10 +636,6 @@ class LLMService:
                     provider="OpenAI",
                 )
             
-            # Track token usage
-            if response.usage:
-                self._total_tokens_used += response.usage.total_tokens
-            
             logger.info(
                 "OpenAI API call successful",
                 model=self.model,
@@ -146,6 +648,11 @@ class LLMService:
             # Record success
             self._record_success()
             
+            if cache_key is not None:
+                await self.cache.set(cache_key, content)
+            if semantic_entry is not None:
+                self.semantic_cache.add(*semantic_entry, content)
+            
             return content
             
         except asyncio.TimeoutError:
@@ -156,13 +663,13 @@ class LLMService:
                 timeout_seconds=self.settings.TIMEOUT_LLM_REQUEST,
             )
         except Exception as e:
-            self._record_failure()
+            self._record_failure(e)
             logger.error(
                 "OpenAI API error",
                 error=str(e),
                 error_type=type(e).__name__,
             )
-            if isinstance(e, (LLMAPIError, TimeoutError)):
+            if isinstance(e, (LLMAPIError, TimeoutError, ValidationError)):
                 raise
             raise LLMAPIError(
                 message=f"OpenAI API error: {str(e)}",
@@ -170,6 +677,184 @@ class LLMService:
                 details={"original_error": str(e)},
             )
     
+    async def _generate_batched(
+        self,
+        batch: LLMBatchCollector,
+        request_key: str,
+        prompt: str,
+        system_instruction: Optional[str],
+        temperature: float,
+        max_output_tokens: Optional[int],
+        cache_key: Optional[str] = None,
+        semantic_entry: Optional[Tuple[str, str]] = None,
+    ) -> str:
+        """Queue the call in the active offline batch and wait for its result."""
+        check_deadline("llm_batch_call")
+        messages = self._build_messages(prompt, system_instruction)
+        max_tokens = self._plan_max_tokens(
+            count_message_tokens(messages, self.model), max_output_tokens
+        )
+        request = {"model": self.model, "messages": messages, "temperature": temperature}
+        if max_tokens is not None:
+            request["max_tokens"] = max_tokens
+        started = time.monotonic()
+        body = await batch.submit(request_key, request)
+        
+        choices = body.get("choices") or []
+        content = choices[0]["message"].get("content") if choices else None
+        if not content:
+            raise LLMAPIError(
+                message="Empty content in batch response",
+                provider="OpenAI",
+            )
+        if body.get("usage"):
+            self._record_usage(
+                CompletionUsage.model_validate(body["usage"]),
+                time.monotonic() - started,
+            )
+        
+        if cache_key is not None:
+            await self.cache.set(cache_key, content)
+        if semantic_entry is not None:
+            self.semantic_cache.add(*semantic_entry, content)
+        return content
+    
+    async def generate_stream(
+        self,
+        prompt: str,
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.7,
+        max_output_tokens: Optional[int] = None,
+        bypass_cache: bool = False,
+    ) -> AsyncIterator[str]:
+        """
+        Stream generated content token by token.
+        
+        Yields text deltas as they arrive from the API. A cached response is
+        yielded as a single chunk; a completed stream is stored in the cache.
+        
+        Args:
+            prompt: The user prompt
+            system_instruction: Optional system instruction
+            temperature: Creativity parameter (0.0-2.0)
+            max_output_tokens: Maximum tokens in response (default: no limit
+                beyond the room the prompt leaves in the context window)
+            bypass_cache: Skip the cache entirely (no read, no write)
+            
+        Yields:
+            Chunks of generated text
+            
+        Raises:
+            LLMAPIError: If the API call fails
+            TimeoutError: If no chunk arrives within the request timeout
+        """
+        cache_key = self._cache_key(
+            prompt, system_instruction, temperature, max_output_tokens, bypass_cache
+        )
+        if cache_key is not None:
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                logger.info("LLM cache hit", model=self.model, response_length=len(cached))
+                yield cached
+                return
+        
+        messages = self._build_messages(prompt, system_instruction)
+        prompt_tokens = count_message_tokens(messages, self.model)
+        max_output_tokens = self._plan_max_tokens(prompt_tokens, max_output_tokens)
+        limits = {"max_tokens": max_output_tokens} if max_output_tokens is not None else {}
+        check_deadline("llm_stream")
+        
+        logger.info(
+            "Calling OpenAI API (streaming)",
+            model=self.model,
+            prompt_length=len(prompt),
+            temperature=temperature,
+        )
+        
+        parts: List[str] = []
+        timeout = self.settings.TIMEOUT_LLM_REQUEST
+        usage_tokens: Optional[int] = None
+        reservation: Optional[Reservation] = None
+        backend: Optional[LLMBackend] = None
+        try:
+            async with self.pool.lease() as backend:
+                reservation = await backend.scheduler.reserve(
+                    prompt_tokens + (max_output_tokens or DEFAULT_MAX_OUTPUT_TOKENS)
+                )
+                started = time.monotonic()
+                async with backend.limiter.slot() as slot:
+                    stream = await self._wait_for(
+                        backend.client.chat.completions.create(
+                            model=backend.model,
+                            messages=messages,
+                            temperature=temperature,
+                            stream=True,
+                            stream_options={"include_usage": True},
+                            **limits,
+                        ),
+                        capped_timeout(timeout),
+                        "llm_stream",
+                    )
+                    iterator = stream.__aiter__()
+                    while True:
+                        try:
+                            chunk = await self._wait_for(
+                                iterator.__anext__(), capped_timeout(timeout), "llm_stream"
+                            )
+                        except StopAsyncIteration:
+                            break
+                        
+                        if chunk.usage:
+                            usage_tokens = chunk.usage.total_tokens
+                            slot.completion_tokens = chunk.usage.completion_tokens
+                            self._record_usage(chunk.usage, time.monotonic() - started)
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta.content
+                        if delta:
+                            parts.append(delta)
+                            yield delta
+        except asyncio.TimeoutError:
+            self._record_failure()
+            raise TimeoutError(
+                message="LLM API stream timed out",
+                operation="generate_stream",
+                timeout_seconds=timeout,
+            )
+        except (LLMAPIError, TimeoutError) as e:
+            self._record_failure(e)
+            raise
+        except Exception as e:
+            self._record_failure(e)
+            logger.error("OpenAI API error", error=str(e), error_type=type(e).__name__)
+            raise LLMAPIError(
+                message=f"OpenAI API error: {str(e)}",
+                provider="OpenAI",
+                details={"original_error": str(e)},
+            )
+        finally:
+            if reservation is not None:
+                backend.scheduler.reconcile(reservation, usage_tokens)
+        
+        content = "".join(parts)
+        if not content:
+            self._record_failure()
+            raise LLMAPIError(
+                message="Empty content in OpenAI response",
+                provider="OpenAI",
+            )
+        
+        self._record_success()
+        logger.info(
+            "OpenAI API stream completed",
+            model=self.model,
+            response_length=len(content),
+            total_tokens=self._total_tokens_used,
+        )
+        
+        if cache_key is not None:
+            await self.cache.set(cache_key, content)
+    
     async def generate_with_messages(
         self,
         messages: List[Dict[str, str]],
@@ -202,18 +887,11 @@ class LLMService:
             openai_messages.append({"role": role, "content": msg["content"]})
         
         try:
-            response = await asyncio.wait_for(
-                self.client.chat.completions.create(
-                    model=self.model,
-                    messages=openai_messages,
-                    temperature=temperature,
-                ),
-                timeout=self.settings.TIMEOUT_LLM_REQUEST,
+            response = await self.retry_policy.run(
+                lambda: self._create_completion(openai_messages, temperature=temperature),
+                operation="generate_with_messages",
             )
             
-            if response.usage:
-                self._total_tokens_used += response.usage.total_tokens
-            
             return response.choices[0].message.content or ""
             
         except asyncio.TimeoutError:
@@ -222,32 +900,120 @@ class LLMService:
                 operation="generate_with_messages",
                 timeout_seconds=self.settings.TIMEOUT_LLM_REQUEST,
             )
+        except ValidationError:
+            raise
         except Exception as e:
             raise LLMAPIError(
                 message=f"OpenAI API error: {str(e)}",
                 provider="OpenAI",
             )
     
+    @property
+    def pool_stats(self) -> Dict[str, Any]:
+        """Get connection pool statistics for the shared HTTP client."""
+        # httpx does not expose its connection pool publicly
+        pool = getattr(self.connection_transport, "_pool", None)
+        connections = list(getattr(pool, "connections", []))
+        idle = sum(1 for c in connections if c.is_idle())
+        return {
+            "http2_enabled": self.http2_enabled,
+            "connections": len(connections),
+            "idle": idle,
+            "active": len(connections) - idle,
+            "max_connections": self.settings.LLM_HTTP_MAX_CONNECTIONS,
+            "max_keepalive": self.settings.LLM_HTTP_MAX_KEEPALIVE,
+        }
+    
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Get every LLM client-side counter and gauge in one place."""
+        return {
+            "tokens_used": self.tokens_used,
+            "cache": self.cache_stats,
+            "semantic_cache": self.semantic_cache.stats if self.semantic_cache is not None else {},
+            "single_flight": self.single_flight_stats,
+            "limiter": self.limiter_stats,
+            "scheduler": self.scheduler_stats,
+            "circuit": self.circuit_stats,
+            "retries": self.retry_policy.stats,
+            "backends": self.pool.stats,
+            "hedging": self.hedging.stats if self.hedging is not None else {},
+            "pool": self.pool_stats,
+            "health": self.health.stats,
+        }
+    
+    async def warm_up(self) -> int:
+        """
+        Pre-establish connections to the API without spending tokens.
+        
+        Issues concurrent model-list requests to every backend so DNS, TCP
+        and TLS setup happen before the first pipeline.
+        
+        Returns:
+            Number of warm-up requests that succeeded
+        """
+        count = self.settings.LLM_HTTP_WARMUP_CONNECTIONS
+        if count <= 0:
+            return 0
+        
+        async def ping(backend: LLMBackend) -> bool:
+            try:
+                await backend.client.models.list()
+                return True
+            except Exception as e:
+                logger.warning("LLM connection warm-up failed", backend=backend.name, error=str(e))
+                return False
+        
+        start = time.monotonic()
+        try:
+            results = await asyncio.wait_for(
+                asyncio.gather(*(
+                    ping(backend)
+                    for backend in self.pool.backends
+                    for _ in range(count)
+                )),
+                timeout=self.settings.LLM_HTTP_WARMUP_TIMEOUT,
+            )
+        except asyncio.TimeoutError:
+            logger.warning("LLM connection warm-up timed out")
+            return 0
+        
+        succeeded = sum(results)
+        logger.info(
+            "LLM connections warmed up",
+            succeeded=succeeded,
+            duration_ms=round((time.monotonic() - start) * 1000, 2),
+            **self.pool_stats,
+        )
+        return succeeded
+    
+    async def close(self) -> None:
+        """Close the shared HTTP client."""
+        await self.http_client.aclose()
+    
     async def health_check(self) -> bool:
         """
         Check if the LLM API is accessible.
         
+        Derived from the outcomes of recent real calls; the zero-token
+        probe runs only when there has been no traffic.
+        
         Returns:
             True if healthy, False otherwise
         """
-        try:
-            response = await asyncio.wait_for(
-                self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[{"role": "user", "content": "Hello"}],
-                    max_tokens=5,
-                ),
-                timeout=10,
-            )
-            return bool(response and response.choices)
-        except Exception as e:
-            logger.warning("LLM health check failed", error=str(e))
-            return False
+        return await self.health.check()
+    
+    async def _probe(self) -> bool:
+        """Check that at least one backend answers a model-list request."""
+        async def ping(backend: LLMBackend) -> bool:
+            try:
+                await backend.client.models.list()
+                return True
+            except Exception as e:
+                logger.warning("LLM health probe failed", backend=backend.name, error=str(e))
+                return False
+        
+        return any(await asyncio.gather(*(ping(backend) for backend in self.pool.backends)))
 
 
 # Singleton instance
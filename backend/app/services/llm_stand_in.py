@@ -0,0 +1,333 @@
+"""
+OpenAI-compatible stand-in LLM server for load and latency tests.
+Serves /v1/chat/completions (plain and streamed, with usage) and
+/v1/models with configurable time-to-first-token, tokens per second,
+output sizes and 429/5xx rates. Nothing leaves the machine.
+
+Usage:
+    python -m app.services.llm_stand_in --profile gpt-4o --port 8089
+
+Then point the backend at it:
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1
+"""
+import argparse
+import asyncio
+import json
+import random
+import socket
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, replace
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+
+from app.services.tokenizer import count_message_tokens
+
+# Vocabulary of the generated text; covers the words agent validators look for
+_WORDS = (
+    "the company market technology opportunity recommendation product strategy "
+    "customer growth partnership platform revenue launch pricing channel segment "
+    "innovation roadmap analysis competitive advantage collaboration data approved"
+).split()
+
+# Minimum gap between streamed chunks; tokens due sooner are sent together
+_STREAM_TICK_SECONDS = 0.005
+
+
+@dataclass(frozen=True)
+class StandInProfile:
+    """Latency, throughput, output size and fault behavior of a simulated model."""
+
+    name: str
+    ttft_ms: float
+    ttft_jitter: float
+    tokens_per_second: float
+    output_tokens: int
+    output_tokens_jitter: float
+    rate_limit_rate: float = 0.0
+    server_error_rate: float = 0.0
+    retry_after_seconds: float = 1.0
+
+
+PROFILES: Dict[str, StandInProfile] = {
+    # Near-instant, for functional tests
+    "fast": StandInProfile("fast", ttft_ms=2, ttft_jitter=0.0, tokens_per_second=50000,
+                           output_tokens=200, output_tokens_jitter=0.0),
+    "gpt-4o": StandInProfile("gpt-4o", ttft_ms=450, ttft_jitter=0.35, tokens_per_second=80,
+                             output_tokens=1500, output_tokens_jitter=0.3),
+    "gpt-4o-mini": StandInProfile("gpt-4o-mini", ttft_ms=300, ttft_jitter=0.3, tokens_per_second=140,
+                                  output_tokens=1200, output_tokens_jitter=0.3),
+    "gpt-4-turbo": StandInProfile("gpt-4-turbo", ttft_ms=750, ttft_jitter=0.4, tokens_per_second=35,
+                                  output_tokens=1500, output_tokens_jitter=0.3),
+    # gpt-4o-mini under provider pressure
+    "flaky": StandInProfile("flaky", ttft_ms=300, ttft_jitter=0.6, tokens_per_second=140,
+                            output_tokens=1200, output_tokens_jitter=0.3,
+                            rate_limit_rate=0.05, server_error_rate=0.02),
+}
+
+
+class StandInModel:
+    """Samples latencies, output sizes and faults for one profile."""
+
+    def __init__(self, profile: StandInProfile, seed: Optional[int] = None):
+        self.profile = profile
+        self.random = random.Random(seed)
+        self.stats: Dict[str, int] = {
+            "requests": 0,
+            "streamed": 0,
+            "rate_limited": 0,
+            "server_errors": 0,
+            "completion_tokens": 0,
+        }
+
+    def ttft_seconds(self) -> float:
+        """Time to first token, log-normally jittered around the profile value."""
+        jitter = self.random.lognormvariate(0, self.profile.ttft_jitter) if self.profile.ttft_jitter else 1.0
+        return self.profile.ttft_ms / 1000 * jitter
+
+    def output_tokens(self, max_tokens: Optional[int]) -> int:
+        """Number of tokens to generate, capped by the request's max_tokens."""
+        spread = self.profile.output_tokens * self.profile.output_tokens_jitter
+        tokens = max(1, int(self.random.gauss(self.profile.output_tokens, spread)))
+        return min(tokens, max_tokens) if max_tokens else tokens
+
+    def fault(self) -> Optional[Response]:
+        """Roll for a rate-limit or server error response."""
+        roll = self.random.random()
+        if roll < self.profile.rate_limit_rate:
+            self.stats["rate_limited"] += 1
+            return _error(
+                429,
+                "Rate limit reached for requests",
+                "rate_limit_exceeded",
+                headers={"retry-after": str(self.profile.retry_after_seconds)},
+            )
+        if roll < self.profile.rate_limit_rate + self.profile.server_error_rate:
+            self.stats["server_errors"] += 1
+            status = self.random.choice((500, 502, 503))
+            return _error(status, "The server had an error while processing your request", "server_error")
+        return None
+
+    def text(self, tokens: int) -> List[str]:
+        """Markdown-ish output as one string per token."""
+        pieces = []
+        for i in range(tokens):
+            word = self.random.choice(_WORDS) + " "
+            if i % 60 == 0:
+                heading = f"## Section {i // 60 + 1}\n"
+                word = (heading if i == 0 else "\n\n" + heading) + word
+            pieces.append(word)
+        return pieces
+
+
+def _error(status: int, message: str, code: str, headers: Optional[Dict[str, str]] = None) -> JSONResponse:
+    error_type = "rate_limit_error" if status == 429 else "server_error"
+    return JSONResponse(
+        {"error": {"message": message, "type": error_type, "param": None, "code": code}},
+        status_code=status,
+        headers=headers,
+    )
+
+
+def _usage(prompt_tokens: int, completion_tokens: int) -> Dict[str, Any]:
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+        "prompt_tokens_details": {"cached_tokens": 0},
+    }
+
+
+def create_app(profile: StandInProfile, seed: Optional[int] = None) -> FastAPI:
+    """Build the stand-in server application for a profile."""
+    app = FastAPI(title="CollabGen LLM stand-in", docs_url=None, redoc_url=None)
+    model = StandInModel(profile, seed)
+    app.state.model = model
+
+    @app.get("/v1/models")
+    async def list_models() -> dict:
+        return {
+            "object": "list",
+            "data": [{"id": name, "object": "model", "created": 0, "owned_by": "stand-in"} for name in PROFILES],
+        }
+
+    @app.get("/_stand_in/stats")
+    async def stats() -> dict:
+        return {"profile": asdict(model.profile), **model.stats}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request) -> Response:
+        body = await request.json()
+        model.stats["requests"] += 1
+        failure = model.fault()
+        if failure is not None:
+            await asyncio.sleep(model.ttft_seconds() / 4)
+            return failure
+
+        model_name = body.get("model", profile.name)
+        prompt_tokens = count_message_tokens(body.get("messages", []), model_name)
+        max_tokens = body.get("max_tokens") or body.get("max_completion_tokens")
+        pieces = model.text(model.output_tokens(max_tokens))
+        finish_reason = "length" if max_tokens and len(pieces) >= max_tokens else "stop"
+        model.stats["completion_tokens"] += len(pieces)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        ttft = model.ttft_seconds()
+
+        if body.get("stream"):
+            model.stats["streamed"] += 1
+            include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+            return StreamingResponse(
+                _stream(completion_id, created, model_name, pieces, finish_reason, ttft,
+                        profile.tokens_per_second, _usage(prompt_tokens, len(pieces)) if include_usage else None),
+                media_type="text/event-stream",
+            )
+
+        await asyncio.sleep(ttft + len(pieces) / profile.tokens_per_second)
+        return JSONResponse({
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model_name,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(pieces)},
+                "finish_reason": finish_reason,
+            }],
+            "usage": _usage(prompt_tokens, len(pieces)),
+        })
+
+    return app
+
+
+async def _stream(
+    completion_id: str,
+    created: int,
+    model_name: str,
+    pieces: List[str],
+    finish_reason: str,
+    ttft: float,
+    tokens_per_second: float,
+    usage: Optional[Dict[str, Any]],
+) -> AsyncIterator[str]:
+    """Emit SSE chunks paced at the profile's token rate."""
+    def event(choices: List[Dict[str, Any]], **extra: Any) -> str:
+        payload = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model_name,
+            "choices": choices,
+            **extra,
+        }
+        return f"data: {json.dumps(payload)}\n\n"
+
+    started = time.monotonic()
+    await asyncio.sleep(ttft)
+    yield event([{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}])
+
+    sent = 0
+    while sent < len(pieces):
+        # Send every token due by now, then sleep until the next one
+        elapsed = time.monotonic() - started - ttft
+        due = min(len(pieces), max(sent + 1, int(elapsed * tokens_per_second)))
+        yield event([{"index": 0, "delta": {"content": "".join(pieces[sent:due])}, "finish_reason": None}])
+        sent = due
+        wait = ttft + sent / tokens_per_second - (time.monotonic() - started)
+        if sent < len(pieces) and wait > 0:
+            await asyncio.sleep(max(wait, _STREAM_TICK_SECONDS))
+
+    yield event([{"index": 0, "delta": {}, "finish_reason": finish_reason}])
+    if usage is not None:
+        yield event([], usage=usage)
+    yield "data: [DONE]\n\n"
+
+
+class StandInServer:
+    """
+    Runs the stand-in on a local port in a background thread.
+
+    Used as a context manager by the pytest fixture and load tests.
+    """
+
+    def __init__(self, profile: StandInProfile, host: str = "127.0.0.1", port: int = 0, seed: Optional[int] = None):
+        import uvicorn
+
+        if port == 0:
+            with socket.socket() as sock:
+                sock.bind((host, 0))
+                port = sock.getsockname()[1]
+        self.app = create_app(profile, seed)
+        self.host = host
+        self.port = port
+        self._server = uvicorn.Server(uvicorn.Config(self.app, host=host, port=port, log_level="warning"))
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """OpenAI base URL of the running server."""
+        return f"http://{self.host}:{self.port}/v1"
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Request, fault and token counters."""
+        return dict(self.app.state.model.stats)
+
+    def start(self, timeout: float = 10.0) -> "StandInServer":
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self._server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError("LLM stand-in server failed to start")
+            time.sleep(0.01)
+        return self
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+
+    def __enter__(self) -> "StandInServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the OpenAI-compatible LLM stand-in server")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="gpt-4o-mini")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible latencies and faults")
+    parser.add_argument("--ttft-ms", type=float, help="Override time to first token")
+    parser.add_argument("--tokens-per-second", type=float, help="Override generation speed")
+    parser.add_argument("--output-tokens", type=int, help="Override mean output size")
+    parser.add_argument("--rate-limit-rate", type=float, help="Override fraction of 429 responses")
+    parser.add_argument("--server-error-rate", type=float, help="Override fraction of 5xx responses")
+    args = parser.parse_args()
+
+    overrides = {
+        field: value
+        for field, value in (
+            ("ttft_ms", args.ttft_ms),
+            ("tokens_per_second", args.tokens_per_second),
+            ("output_tokens", args.output_tokens),
+            ("rate_limit_rate", args.rate_limit_rate),
+            ("server_error_rate", args.server_error_rate),
+        )
+        if value is not None
+    }
+    profile = replace(PROFILES[args.profile], **overrides)
+
+    import uvicorn
+
+    uvicorn.run(create_app(profile, args.seed), host=args.host, port=args.port, log_level="info")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""
+Record/replay HTTP transport for LLM calls.
+Record mode forwards requests to the provider and appends each exchange,
+with its header and body-chunk timings, to a JSONL cassette. Replay mode
+serves those exchanges offline at their original or scaled latency.
+"""
+import asyncio
+import hashlib
+import importlib
+import json
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# (method, path, JSON body) -> cassette key
+CassetteKeyFunction = Callable[[str, str, Dict[str, Any]], str]
+
+# Response headers that describe the recorded encoding, not the content
+_DROPPED_HEADERS = {"content-length", "content-encoding", "transfer-encoding", "connection", "set-cookie"}
+
+
+def _digest(value: Any) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def exact_key(method: str, path: str, body: Dict[str, Any]) -> str:
+    """Key on the full request: every body field must match."""
+    return _digest({"method": method, "path": path, "body": body})
+
+
+def prompt_key(method: str, path: str, body: Dict[str, Any]) -> str:
+    """Key on the messages and stream flag only, ignoring model and sampling settings."""
+    return _digest({
+        "method": method,
+        "path": path,
+        "messages": body.get("messages"),
+        "stream": bool(body.get("stream")),
+    })
+
+
+KEY_FUNCTIONS: Dict[str, CassetteKeyFunction] = {
+    "exact": exact_key,
+    "prompt": prompt_key,
+}
+
+
+def resolve_key_function(name: str) -> CassetteKeyFunction:
+    """
+    Get a key function by registered name or "package.module:function" path.
+
+    Raises:
+        ValueError: If the name is neither registered nor a module path
+    """
+    if name in KEY_FUNCTIONS:
+        return KEY_FUNCTIONS[name]
+    module_name, _, attribute = name.partition(":")
+    if not attribute:
+        raise ValueError(f"Unknown cassette key function: {name}")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def _request_parts(request: httpx.Request) -> Tuple[str, str, Dict[str, Any]]:
+    """Get the method, path and parsed JSON body of a request."""
+    body: Dict[str, Any] = {}
+    if request.content:
+        try:
+            body = json.loads(request.content)
+        except ValueError:
+            body = {"raw": request.content.decode("utf-8", "surrogateescape")}
+    return request.method, request.url.path, body
+
+
+class _RecordingStream(httpx.AsyncByteStream):
+    """Passes a response body through while timing each chunk."""
+
+    def __init__(
+        self,
+        inner: httpx.AsyncByteStream,
+        started: float,
+        on_complete: Callable[[List[List[Any]]], None],
+    ):
+        self._inner = inner
+        self._started = started
+        self._on_complete = on_complete
+        self._chunks: List[List[Any]] = []
+        self._done = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._inner:
+            offset_ms = (time.monotonic() - self._started) * 1000
+            self._chunks.append([round(offset_ms, 3), chunk.decode("utf-8", "surrogateescape")])
+            yield chunk
+        self._finish()
+
+    async def aclose(self) -> None:
+        # Stream consumers (the SDK included) may stop reading at the end
+        # marker and close without exhausting the body
+        self._finish()
+        await self._inner.aclose()
+
+    def _finish(self) -> None:
+        if not self._done:
+            self._done = True
+            self._on_complete(self._chunks)
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """
+    Forwards requests and appends every completed exchange to a cassette.
+
+    Responses are requested uncompressed so cassettes stay readable. An
+    exchange is written when its body is exhausted or closed, with the
+    chunks read up to that point.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        inner: httpx.AsyncBaseTransport,
+        key_function: CassetteKeyFunction = exact_key,
+    ):
+        self.path = Path(path)
+        self.inner = inner
+        self.key_function = key_function
+        self.recorded = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        request.headers["accept-encoding"] = "identity"
+        method, url_path, body = _request_parts(request)
+        started = time.monotonic()
+        response = await self.inner.handle_async_request(request)
+        headers_ms = (time.monotonic() - started) * 1000
+
+        def save(chunks: List[List[Any]]) -> None:
+            self._append({
+                "key": self.key_function(method, url_path, body),
+                "method": method,
+                "path": url_path,
+                "request": body,
+                "status": response.status_code,
+                "headers": {
+                    k: v for k, v in response.headers.items() if k.lower() not in _DROPPED_HEADERS
+                },
+                "headers_ms": round(headers_ms, 3),
+                "chunks": chunks,
+            })
+
+        try:
+            # Some transports (e.g. httpx.MockTransport) return bodies already read
+            content = response.content
+        except httpx.ResponseNotRead:
+            response.stream = _RecordingStream(response.stream, started, save)
+        else:
+            save([[round(headers_ms, 3), content.decode("utf-8", "surrogateescape")]])
+        return response
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        self.recorded += 1
+
+
+class _ReplayStream(httpx.AsyncByteStream):
+    """Yields recorded chunks at their recorded (scaled) offsets."""
+
+    def __init__(self, chunks: List[List[Any]], started: float, latency_scale: float):
+        self._chunks = chunks
+        self._started = started
+        self._latency_scale = latency_scale
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for offset_ms, text in self._chunks:
+            delay = offset_ms / 1000 * self._latency_scale - (time.monotonic() - self._started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            yield text.encode("utf-8", "surrogateescape")
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """
+    Serves requests from a cassette without network access.
+
+    Identical requests recorded several times are replayed in recorded
+    order, repeating the last one. A request with no entry gets a 404
+    so the SDK raises a non-retryable error.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        key_function: CassetteKeyFunction = exact_key,
+        latency_scale: float = 1.0,
+    ):
+        self.path = Path(path)
+        self.key_function = key_function
+        self.latency_scale = latency_scale
+        self._entries: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._served: Dict[str, int] = defaultdict(int)
+        self._stats: Dict[str, int] = {"hits": 0, "misses": 0}
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries[entry["key"]].append(entry)
+        else:
+            logger.warning("LLM cassette not found, every request will miss", path=str(self.path))
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Get hit/miss counters and the number of recorded keys."""
+        return {**self._stats, "keys": len(self._entries)}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.monotonic()
+        method, url_path, body = _request_parts(request)
+        key = self.key_function(method, url_path, body)
+        entry = self._next_entry(key)
+        if entry is None:
+            self._stats["misses"] += 1
+            logger.warning("LLM cassette miss", method=method, path=url_path, key=key)
+            return httpx.Response(
+                404,
+                json={"error": {
+                    "message": f"No cassette entry for {method} {url_path} (key {key})",
+                    "type": "cassette_miss",
+                }},
+                request=request,
+            )
+
+        self._stats["hits"] += 1
+        delay = entry["headers_ms"] / 1000 * self.latency_scale
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return httpx.Response(
+            entry["status"],
+            headers=entry["headers"],
+            stream=_ReplayStream(entry["chunks"], started, self.latency_scale),
+            request=request,
+        )
+
+    def _next_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        entries = self._entries.get(key)
+        if not entries:
+            return None
+        index = min(self._served[key], len(entries) - 1)
+        self._served[key] += 1
+        return entries[index]
@@ -6,24 +6,35 @@ import asyncio
 import time
 import uuid
 from datetime import datetime
-from typing import Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
-from app.agents import ResearchAgent, ProductAgent, MarketingAgent, CriticAgent
-from app.config import get_settings
+from app.agents import BaseAgent, ResearchAgent, ProductAgent, MarketingAgent, CriticAgent
+from app.config import Settings, get_settings
 from app.models.requests import PipelineRequest
 from app.models.responses import (
     PipelineResponse,
     PipelineMetadata,
     PipelineSections,
     SectionStatus,
+    UsageMetrics,
 )
+from app.services.deadline import capped_timeout, deadline_scope, time_left
 from app.services.llm_service import get_llm_service
 from app.services.report_service import get_report_service
+from app.services.usage_tracker import UsageAccumulator, track_usage
 from app.utils.exceptions import AgentExecutionError, TimeoutError as CustomTimeoutError
 from app.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Receives (event, data) pairs such as ("stage_started", {"stage": "research"})
+PipelineEventCallback = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+# Receives the section statuses of the stages run so far
+CheckpointCallback = Callable[[Dict[str, SectionStatus]], Awaitable[None]]
+
+STAGES = ("research", "product", "marketing")
+
 
 class PipelineOrchestrator:
     """
@@ -31,10 +42,16 @@ class PipelineOrchestrator:
     
     Pipeline Flow: Research → Product → Marketing
     Each agent's output feeds into the next agent.
+    
+    With PIPELINE_QUALITY_GATE_ENABLED, the critic evaluates each section
+    while the next stage already runs on it (see _run_gated_stages).
+    
+    Completed sections are checkpointed as they finish, so a failed or
+    interrupted run can be resumed from its last completed stage.
     """
     
-    def __init__(self):
-        self.settings = get_settings()
+    def __init__(self, settings: Optional[Settings] = None):
+        self.settings = settings or get_settings()
         self.research_agent = ResearchAgent()
         self.product_agent = ProductAgent()
         self.marketing_agent = MarketingAgent()
@@ -46,28 +63,129 @@ class PipelineOrchestrator:
         self,
         request: PipelineRequest,
         save_report: bool = True,
+        on_event: Optional[PipelineEventCallback] = None,
+        report_id: Optional[str] = None,
+        on_checkpoint: Optional[CheckpointCallback] = None,
+        reused: Optional[Dict[str, SectionStatus]] = None,
     ) -> PipelineResponse:
         """
         Execute the full agent pipeline.
         
+        The whole run is bounded by TIMEOUT_PIPELINE: the deadline travels
+        through contextvars to every stage and LLM call.
+        
         Args:
             request: Pipeline request with company info
             save_report: Whether to save the report to storage
+            on_event: Optional callback receiving stage transitions and, when
+                set, streamed tokens as (event, data) pairs
+            report_id: ID for the report (default: a new UUID)
+            on_checkpoint: Optional callback receiving the sections after each
+                checkpoint is saved
+            reused: Completed sections produced elsewhere for a prefix of
+                STAGES; those stages are not run
+            
+        Returns:
+            PipelineResponse with combined report
+        """
+        return await self._execute(
+            request=request,
+            report_id=report_id or str(uuid.uuid4()),
+            reused=reused or {},
+            save_report=save_report,
+            on_event=on_event,
+            on_checkpoint=on_checkpoint,
+        )
+    
+    async def resume_pipeline(
+        self,
+        report_id: str,
+        on_event: Optional[PipelineEventCallback] = None,
+        on_checkpoint: Optional[CheckpointCallback] = None,
+    ) -> PipelineResponse:
+        """
+        Re-run the stages of a stored report that did not complete.
+        
+        Completed sections from the checkpoint (or saved report) are reused
+        up to the first failed or skipped stage; that stage and everything
+        downstream run again. The report is saved under the same ID, with
+        metadata covering only the resumed run. A saved report whose
+        sections all completed is returned unchanged.
+        
+        Args:
+            report_id: ID of the report to resume
+            on_event: Optional callback, as for run_pipeline
+            on_checkpoint: Optional callback, as for run_pipeline
             
         Returns:
             PipelineResponse with combined report
+            
+        Raises:
+            ReportNotFoundError: If the report has no checkpoint or saved report
         """
+        request_data, sections = await self.report_service.load_checkpoint(report_id)
+        request = PipelineRequest(**request_data)
+        
+        reused: Dict[str, SectionStatus] = {}
+        for stage in STAGES:
+            status = sections.get(stage)
+            if status is None or status.status != "completed":
+                break
+            reused[stage] = status
+        
+        if len(reused) == len(STAGES) and not self.report_service.has_checkpoint(report_id):
+            logger.info("Report already complete, nothing to resume", report_id=report_id)
+            report = await self.report_service.get_report(report_id)
+            return PipelineResponse(
+                report_id=report.report_id,
+                status=report.status,
+                content=report.content,
+                sections=report.sections,
+                metadata=PipelineMetadata(
+                    created_at=report.created_at,
+                    execution_time_ms=report.execution_time_ms,
+                    tokens_used=report.tokens_used,
+                    usage=report.usage,
+                    stage_usage=report.stage_usage,
+                ),
+            )
+        
+        logger.info(
+            "Resuming pipeline",
+            report_id=report_id,
+            reused_stages=list(reused),
+        )
+        return await self._execute(
+            request=request,
+            report_id=report_id,
+            reused=reused,
+            save_report=True,
+            on_event=on_event,
+            on_checkpoint=on_checkpoint,
+        )
+    
+    async def _execute(
+        self,
+        request: PipelineRequest,
+        report_id: str,
+        reused: Dict[str, SectionStatus],
+        save_report: bool,
+        on_event: Optional[PipelineEventCallback],
+        on_checkpoint: Optional[CheckpointCallback] = None,
+    ) -> PipelineResponse:
+        """Run the stages not in `reused`, then combine and save the report."""
         start_time = time.time()
-        report_id = str(uuid.uuid4())
+        request_data = {
+            "company_name": request.company_name,
+            "partner_company": request.partner_company,
+            "domain": request.domain,
+        }
         
         # Initialize section statuses
         research_status = SectionStatus(status="failed", content="", error=None)
         product_status = SectionStatus(status="skipped", content="", error=None)
         marketing_status = SectionStatus(status="skipped", content="", error=None)
         
-        # Reset token counter
-        self.llm_service.reset_token_count()
-        
         logger.info(
             "Pipeline execution started",
             report_id=report_id,
@@ -75,125 +193,46 @@ class PipelineOrchestrator:
             partner_company=request.partner_company,
             domain=request.domain,
         )
+        await self._emit(on_event, "pipeline_started", report_id=report_id, reused_stages=list(reused))
+        
+        async def save_checkpoint(sections: Dict[str, SectionStatus]) -> None:
+            try:
+                await self.report_service.save_checkpoint(report_id, request_data, sections)
+            except Exception as e:
+                logger.error("Failed to save checkpoint", report_id=report_id, error=str(e))
+                return
+            if on_checkpoint is not None:
+                await on_checkpoint(sections)
         
         # Track results
         research_content = ""
         product_content = ""
         marketing_content = ""
         overall_status = "failed"
+        usage = UsageAccumulator()
         
         try:
-            # Step 1: Research Agent
-            logger.info("Starting Research Agent", report_id=report_id)
-            try:
-                research_content = await asyncio.wait_for(
-                    self.research_agent.execute(
-                        company_name=request.company_name,
-                        partner_company=request.partner_company,
-                        domain=request.domain,
-                    ),
-                    timeout=self.settings.TIMEOUT_RESEARCH_AGENT,
-                )
-                research_status = SectionStatus(
-                    status="completed",
-                    content=research_content,
-                    error=None,
-                )
-                logger.info(
-                    "Research Agent completed",
-                    report_id=report_id,
-                    content_length=len(research_content),
-                )
-            except asyncio.TimeoutError:
-                research_status = SectionStatus(
-                    status="failed",
-                    content="",
-                    error="Research agent timed out",
+            with deadline_scope(self.settings.TIMEOUT_PIPELINE, "pipeline"), track_usage() as usage:
+                # Each stage runs only if the previous one succeeded
+                run_stages = (
+                    self._run_gated_stages
+                    if self.settings.PIPELINE_QUALITY_GATE_ENABLED
+                    else self._run_stages
                 )
-                logger.error("Research Agent timed out", report_id=report_id)
-            except AgentExecutionError as e:
-                research_status = SectionStatus(
-                    status="failed",
-                    content="",
-                    error=str(e),
+                results = await run_stages(
+                    request,
+                    report_id,
+                    on_event,
+                    reused=reused,
+                    on_checkpoint=save_checkpoint if save_report else None,
                 )
-                logger.error("Research Agent failed", report_id=report_id, error=str(e))
-            
-            # Step 2: Product Agent (only if research succeeded)
-            if research_status.status == "completed":
-                logger.info("Starting Product Agent", report_id=report_id)
-                try:
-                    product_content = await asyncio.wait_for(
-                        self.product_agent.execute(
-                            research_report=research_content,
-                            company_name=request.company_name,
-                            domain=request.domain,
-                        ),
-                        timeout=self.settings.TIMEOUT_PRODUCT_AGENT,
-                    )
-                    product_status = SectionStatus(
-                        status="completed",
-                        content=product_content,
-                        error=None,
-                    )
-                    logger.info(
-                        "Product Agent completed",
-                        report_id=report_id,
-                        content_length=len(product_content),
-                    )
-                except asyncio.TimeoutError:
-                    product_status = SectionStatus(
-                        status="failed",
-                        content="",
-                        error="Product agent timed out",
-                    )
-                    logger.error("Product Agent timed out", report_id=report_id)
-                except AgentExecutionError as e:
-                    product_status = SectionStatus(
-                        status="failed",
-                        content="",
-                        error=str(e),
-                    )
-                    logger.error("Product Agent failed", report_id=report_id, error=str(e))
-            
-            # Step 3: Marketing Agent (only if product succeeded)
-            if product_status.status == "completed":
-                logger.info("Starting Marketing Agent", report_id=report_id)
-                try:
-                    marketing_content = await asyncio.wait_for(
-                        self.marketing_agent.execute(
-                            product_report=product_content,
-                            research_report=research_content,
-                            company_name=request.company_name,
-                            domain=request.domain,
-                        ),
-                        timeout=self.settings.TIMEOUT_MARKETING_AGENT,
-                    )
-                    marketing_status = SectionStatus(
-                        status="completed",
-                        content=marketing_content,
-                        error=None,
-                    )
-                    logger.info(
-                        "Marketing Agent completed",
-                        report_id=report_id,
-                        content_length=len(marketing_content),
-                    )
-                except asyncio.TimeoutError:
-                    marketing_status = SectionStatus(
-                        status="failed",
-                        content="",
-                        error="Marketing agent timed out",
-                    )
-                    logger.error("Marketing Agent timed out", report_id=report_id)
-                except AgentExecutionError as e:
-                    marketing_status = SectionStatus(
-                        status="failed",
-                        content="",
-                        error=str(e),
-                    )
-                    logger.error("Marketing Agent failed", report_id=report_id, error=str(e))
-            
+                research_status = results.get("research", research_status)
+                product_status = results.get("product", product_status)
+                marketing_status = results.get("marketing", marketing_status)
+                research_content = research_status.content
+                product_content = product_status.content
+                marketing_content = marketing_status.content
+                
             # Determine overall status
             statuses = [
                 research_status.status,
@@ -246,7 +285,12 @@ class PipelineOrchestrator:
             metadata=PipelineMetadata(
                 created_at=datetime.utcnow(),
                 execution_time_ms=execution_time_ms,
-                tokens_used=self.llm_service.tokens_used,
+                tokens_used=usage.total_tokens,
+                usage=UsageMetrics(**usage.to_dict()),
+                stage_usage={
+                    stage: UsageMetrics(**stage_usage.to_dict())
+                    for stage, stage_usage in usage.children.items()
+                },
             ),
         )
         
@@ -255,11 +299,7 @@ class PipelineOrchestrator:
             try:
                 await self.report_service.save_report(
                     report=response,
-                    request_data={
-                        "company_name": request.company_name,
-                        "partner_company": request.partner_company,
-                        "domain": request.domain,
-                    },
+                    request_data=request_data,
                 )
             except Exception as e:
                 logger.error("Failed to save report", report_id=report_id, error=str(e))
@@ -270,11 +310,308 @@ class PipelineOrchestrator:
             report_id=report_id,
             status=overall_status,
             execution_time_ms=execution_time_ms,
-            tokens_used=self.llm_service.tokens_used,
+            tokens_used=usage.total_tokens,
+            llm_calls=usage.llm_calls,
         )
         
         return response
     
+    def _stage_agent(self, stage: str) -> Tuple[BaseAgent, float]:
+        """Get the agent and timeout of a stage."""
+        return {
+            "research": (self.research_agent, self.settings.TIMEOUT_RESEARCH_AGENT),
+            "product": (self.product_agent, self.settings.TIMEOUT_PRODUCT_AGENT),
+            "marketing": (self.marketing_agent, self.settings.TIMEOUT_MARKETING_AGENT),
+        }[stage]
+    
+    @staticmethod
+    def _stage_inputs(stage: str, request: PipelineRequest, contents: Dict[str, str]) -> Dict[str, Any]:
+        """Build a stage's agent inputs from the request and upstream sections."""
+        if stage == "research":
+            return {
+                "company_name": request.company_name,
+                "partner_company": request.partner_company,
+                "domain": request.domain,
+            }
+        if stage == "product":
+            return {
+                "research_report": contents["research"],
+                "company_name": request.company_name,
+                "domain": request.domain,
+            }
+        return {
+            "product_report": contents["product"],
+            "research_report": contents["research"],
+            "company_name": request.company_name,
+            "domain": request.domain,
+        }
+    
+    async def _run_stages(
+        self,
+        request: PipelineRequest,
+        report_id: str,
+        on_event: Optional[PipelineEventCallback],
+        reused: Optional[Dict[str, SectionStatus]] = None,
+        on_checkpoint: Optional[CheckpointCallback] = None,
+    ) -> Dict[str, SectionStatus]:
+        """
+        Run the stages in order, stopping at the first that does not complete.
+        
+        Stages in `reused` (a completed prefix of STAGES) are not run again.
+        """
+        results: Dict[str, SectionStatus] = dict(reused or {})
+        contents: Dict[str, str] = {stage: status.content for stage, status in results.items()}
+        for stage in STAGES[len(results):]:
+            agent, timeout = self._stage_agent(stage)
+            status = await self._run_stage(
+                stage=stage,
+                agent=agent,
+                timeout=timeout,
+                report_id=report_id,
+                on_event=on_event,
+                **self._stage_inputs(stage, request, contents),
+            )
+            results[stage] = status
+            if status.status != "completed":
+                break
+            contents[stage] = status.content
+            if on_checkpoint is not None:
+                await on_checkpoint(results)
+        return results
+    
+    async def _run_gated_stages(
+        self,
+        request: PipelineRequest,
+        report_id: str,
+        on_event: Optional[PipelineEventCallback],
+        reused: Optional[Dict[str, SectionStatus]] = None,
+        on_checkpoint: Optional[CheckpointCallback] = None,
+    ) -> Dict[str, SectionStatus]:
+        """
+        Run the stages with a speculative critic quality gate.
+        
+        When a stage completes, its critique starts alongside the next
+        stage, which works on the unreviewed output. An approved critique
+        lets the next stage continue; a rejected one cancels it and re-runs
+        the rejected stage with the critic's feedback, at most
+        PIPELINE_QUALITY_GATE_MAX_REVISIONS times per stage. After that the
+        section is kept as is. A critic that fails or times out approves, and
+        a revision that does not complete keeps the previous section.
+        Sections in `reused` are neither run nor reviewed again.
+        """
+        results: Dict[str, SectionStatus] = dict(reused or {})
+        contents: Dict[str, str] = {stage: status.content for stage, status in results.items()}
+        feedback: Dict[str, str] = {}
+        revisions: Dict[str, int] = {stage: 0 for stage in STAGES}
+        critique: Optional[asyncio.Task] = None
+        stage_task: Optional[asyncio.Task] = None
+        index = len(results)
+        
+        try:
+            while True:
+                stage_task = None
+                if index < len(STAGES):
+                    stage = STAGES[index]
+                    agent, timeout = self._stage_agent(stage)
+                    inputs = self._stage_inputs(stage, request, contents)
+                    if stage in feedback:
+                        inputs["revision_feedback"] = feedback[stage]
+                    stage_task = asyncio.create_task(self._run_stage(
+                        stage=stage,
+                        agent=agent,
+                        timeout=timeout,
+                        report_id=report_id,
+                        on_event=on_event,
+                        **inputs,
+                    ))
+                
+                if critique is not None:
+                    # The previous stage's critique races the speculative stage
+                    reviewed = STAGES[index - 1]
+                    approved, evaluation, score = await critique
+                    critique = None
+                    results[reviewed].quality_score = score
+                    if not approved and revisions[reviewed] < self.settings.PIPELINE_QUALITY_GATE_MAX_REVISIONS:
+                        if stage_task is not None:
+                            stage_task.cancel()
+                            await asyncio.gather(stage_task, return_exceptions=True)
+                        revisions[reviewed] += 1
+                        feedback[reviewed] = evaluation
+                        logger.info(
+                            "Critic rejected section, re-running",
+                            report_id=report_id,
+                            stage=reviewed,
+                            quality_score=score,
+                            revision=revisions[reviewed],
+                        )
+                        await self._emit(
+                            on_event,
+                            "stage_revision",
+                            stage=reviewed,
+                            quality_score=score,
+                            revision=revisions[reviewed],
+                        )
+                        index -= 1
+                        continue
+                
+                if stage_task is None:
+                    break
+                status = await stage_task
+                previous = results.get(stage)
+                if status.status != "completed" and previous is not None and previous.status == "completed":
+                    # A failed revision must not lose the section the critic already scored
+                    logger.warning(
+                        "Revision did not complete, keeping previous section",
+                        report_id=report_id,
+                        stage=stage,
+                        error=status.error,
+                    )
+                    previous.revisions = revisions[stage]
+                    index += 1
+                    continue
+                status.revisions = revisions[stage]
+                results[stage] = status
+                if status.status != "completed":
+                    break
+                contents[stage] = status.content
+                if on_checkpoint is not None:
+                    await on_checkpoint(results)
+                critique = asyncio.create_task(self._critique(stage, status.content, report_id, on_event))
+                index += 1
+        finally:
+            # Only reached with tasks pending if the pipeline itself is cancelled
+            for task in (stage_task, critique):
+                if task is not None and not task.done():
+                    task.cancel()
+        return results
+    
+    async def _critique(
+        self,
+        stage: str,
+        content: str,
+        report_id: str,
+        on_event: Optional[PipelineEventCallback],
+    ) -> Tuple[bool, str, Optional[int]]:
+        """
+        Have the critic evaluate a section.
+        
+        Returns:
+            (approved, evaluation, score); failures approve with no score
+        """
+        try:
+            with track_usage(f"critic_{stage}"):
+                evaluation = await asyncio.wait_for(
+                    self.critic_agent.execute(content=content, content_type=stage),
+                    timeout=capped_timeout(self.settings.TIMEOUT_CRITIC_AGENT),
+                )
+        except (asyncio.TimeoutError, AgentExecutionError) as e:
+            logger.warning("Critic failed, keeping section", report_id=report_id, stage=stage, error=str(e))
+            return True, "", None
+        
+        approved = self.critic_agent.is_approved(evaluation)
+        score = self.critic_agent.extract_score(evaluation)
+        await self._emit(on_event, "critic_completed", stage=stage, approved=approved, quality_score=score)
+        return approved, evaluation, score
+    
+    async def _emit(
+        self,
+        on_event: Optional[PipelineEventCallback],
+        event: str,
+        **data: Any,
+    ) -> None:
+        """Send a pipeline event to the callback, if any."""
+        if on_event is not None:
+            await on_event(event, data)
+    
+    async def _execute_agent(
+        self,
+        stage: str,
+        agent: BaseAgent,
+        on_event: Optional[PipelineEventCallback],
+        **inputs: Any,
+    ) -> str:
+        """Run an agent, streaming its tokens to the callback when one is set."""
+        if on_event is None:
+            return await agent.execute(**inputs)
+        
+        parts = []
+        async for chunk in agent.execute_stream(**inputs):
+            parts.append(chunk)
+            await on_event("token", {"stage": stage, "content": chunk})
+        return "".join(parts)
+    
+    async def _run_stage(
+        self,
+        stage: str,
+        agent: BaseAgent,
+        timeout: float,
+        report_id: str,
+        on_event: Optional[PipelineEventCallback] = None,
+        **inputs: Any,
+    ) -> SectionStatus:
+        """
+        Run a single pipeline stage with its timeout.
+        
+        The timeout is capped by the pipeline deadline, and the stage is
+        skipped outright when too little of the budget remains.
+        
+        Returns:
+            SectionStatus describing the stage outcome
+        """
+        remaining = time_left()
+        if remaining is not None and remaining < self.settings.TIMEOUT_STAGE_MIN_REMAINING:
+            logger.warning(
+                f"Skipping {agent.name}: pipeline deadline too close",
+                report_id=report_id,
+                remaining_seconds=round(remaining, 2),
+            )
+            status = SectionStatus(
+                status="skipped",
+                content="",
+                error=f"{stage.capitalize()} stage skipped: pipeline deadline reached",
+            )
+            await self._emit(on_event, "stage_skipped", stage=stage, error=status.error)
+            return status
+        
+        timeout = capped_timeout(timeout)
+        logger.info(f"Starting {agent.name}", report_id=report_id)
+        await self._emit(on_event, "stage_started", stage=stage, agent_name=agent.name)
+        
+        try:
+            with track_usage(stage), deadline_scope(timeout, stage):
+                content = await asyncio.wait_for(
+                    self._execute_agent(stage, agent, on_event, **inputs),
+                    timeout=timeout,
+                )
+            status = SectionStatus(status="completed", content=content, error=None)
+            logger.info(
+                f"{agent.name} completed",
+                report_id=report_id,
+                content_length=len(content),
+            )
+        except asyncio.TimeoutError:
+            status = SectionStatus(
+                status="failed",
+                content="",
+                error=f"{stage.capitalize()} agent timed out",
+            )
+            logger.error(f"{agent.name} timed out", report_id=report_id)
+        except AgentExecutionError as e:
+            status = SectionStatus(status="failed", content="", error=str(e))
+            logger.error(f"{agent.name} failed", report_id=report_id, error=str(e))
+        
+        if status.status == "completed":
+            await self._emit(
+                on_event,
+                "stage_completed",
+                stage=stage,
+                content_length=len(status.content),
+            )
+        else:
+            await self._emit(on_event, "stage_failed", stage=stage, error=status.error)
+        
+        return status
+    
     def _combine_reports(
         self,
         company_name: str,
@@ -0,0 +1,175 @@
+"""
+Client-side RPM/TPM scheduler for provider rate limits.
+Reserves estimated request and token cost from token buckets before
+dispatch and reconciles against actual usage afterwards.
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from app.utils.exceptions import LLMAPIError
+from app.utils.logging import get_logger
+from app.utils.telemetry import LLM_RATE_BUCKET_AVAILABLE, LLM_RATE_WAIT_SECONDS
+
+logger = get_logger(__name__)
+
+
+class TokenBucket:
+    """A token bucket refilled continuously at a per-minute rate."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.available = float(per_minute)
+        self._updated = time.monotonic()
+
+    def refill(self) -> None:
+        """Add tokens accrued since the last refill."""
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def time_until(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if already available)."""
+        deficit = amount - self.available
+        return deficit / self.rate if deficit > 0 else 0.0
+
+    def take(self, amount: float) -> None:
+        """Remove tokens; the balance may go negative when settling debt."""
+        self.available -= amount
+
+    def give(self, amount: float) -> None:
+        """Return tokens, capped at capacity."""
+        self.available = min(self.capacity, self.available + amount)
+
+
+@dataclass
+class Reservation:
+    """Quota reserved for a single call."""
+
+    estimated_tokens: int
+    settled: bool = False
+
+
+class RateScheduler:
+    """
+    Schedules calls within requests-per-minute and tokens-per-minute budgets.
+
+    A limit of 0 disables that bucket. Reservations are granted in FIFO
+    order; a caller waits at most max_wait_seconds before failing.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        max_wait_seconds: float = 60.0,
+        name: str = "default",
+    ):
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.max_wait_seconds = max_wait_seconds
+        self._lock = asyncio.Lock()
+        self._stats: Dict[str, float] = {
+            "reservations": 0,
+            "delayed": 0,
+            "wait_seconds": 0.0,
+            "estimated_tokens": 0,
+            "actual_tokens": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any budget is configured."""
+        return self.requests is not None or self.tokens is not None
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        """Get scheduler counters and current bucket balances."""
+        for bucket in (self.requests, self.tokens):
+            if bucket is not None:
+                bucket.refill()
+        return {
+            **self._stats,
+            "requests_available": self.requests.available if self.requests else -1,
+            "tokens_available": self.tokens.available if self.tokens else -1,
+        }
+
+    async def reserve(self, estimated_tokens: int) -> Reservation:
+        """
+        Wait until the budgets allow one request of `estimated_tokens`.
+
+        Raises:
+            LLMAPIError: If the budget cannot be met within max_wait_seconds
+        """
+        if self.tokens is not None:
+            # A single call larger than the whole budget could never fit
+            estimated_tokens = min(estimated_tokens, int(self.tokens.capacity))
+        reservation = Reservation(estimated_tokens=estimated_tokens)
+        if not self.enabled:
+            return reservation
+
+        start = time.monotonic()
+        async with self._lock:
+            while True:
+                wait = 0.0
+                for bucket, amount in ((self.requests, 1), (self.tokens, estimated_tokens)):
+                    if bucket is not None:
+                        bucket.refill()
+                        wait = max(wait, bucket.time_until(amount))
+                if wait <= 0:
+                    break
+                if time.monotonic() - start + wait > self.max_wait_seconds:
+                    raise LLMAPIError(
+                        message="LLM rate budget exhausted; request would exceed the wait limit",
+                        provider="OpenAI",
+                        details={"state": "rate_budget_exhausted", "wait_seconds": round(wait, 2)},
+                    )
+                await asyncio.sleep(wait)
+
+            if self.requests is not None:
+                self.requests.take(1)
+            if self.tokens is not None:
+                self.tokens.take(estimated_tokens)
+
+        waited = time.monotonic() - start
+        self._stats["reservations"] += 1
+        self._stats["estimated_tokens"] += estimated_tokens
+        if waited > 0.001:
+            self._stats["delayed"] += 1
+            self._stats["wait_seconds"] += waited
+            LLM_RATE_WAIT_SECONDS.labels(backend=self.name).inc(waited)
+        self._publish()
+        return reservation
+
+    def reconcile(self, reservation: Reservation, actual_tokens: Optional[int]) -> None:
+        """
+        Settle a reservation against the tokens actually used.
+
+        Passing None (no usage reported, e.g. a failed call) refunds the
+        token reservation; the request slot is not refunded.
+        """
+        if reservation.settled:
+            return
+        reservation.settled = True
+
+        if actual_tokens is not None:
+            self._stats["actual_tokens"] += actual_tokens
+        if self.tokens is None:
+            return
+
+        delta = reservation.estimated_tokens - (actual_tokens or 0)
+        if delta >= 0:
+            self.tokens.give(delta)
+        else:
+            self.tokens.take(-delta)
+        self._publish()
+
+    def _publish(self) -> None:
+        """Update Prometheus gauges."""
+        if self.requests is not None:
+            LLM_RATE_BUCKET_AVAILABLE.labels(backend=self.name, bucket="requests").set(self.requests.available)
+        if self.tokens is not None:
+            LLM_RATE_BUCKET_AVAILABLE.labels(backend=self.name, bucket="tokens").set(self.tokens.available)
@@ -5,10 +5,11 @@ Handles file operations with proper security measures.
 import asyncio
 import json
 import os
+import shutil
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import aiofiles
 import aiofiles.os
 
@@ -19,7 +20,9 @@ from app.models.responses import (
     ReportSummary,
     SectionStatus,
     PipelineSections,
+    UsageMetrics,
 )
+from app.services.health_monitor import build_health_signal
 from app.utils.exceptions import ReportNotFoundError, StorageError
 from app.utils.logging import get_logger
 
@@ -33,6 +36,7 @@ class ReportService:
         self.settings = get_settings()
         self.reports_dir = Path(self.settings.REPORTS_DIRECTORY)
         self._ensure_reports_directory()
+        self.health = build_health_signal(self.settings, "storage", self._probe)
     
     def _ensure_reports_directory(self) -> None:
         """Ensure the reports directory exists."""
@@ -62,6 +66,18 @@ class ReportService:
             )
         return self.reports_dir / f"{report_id}.md"
     
+    def _get_checkpoint_path(self, report_id: str) -> Path:
+        """Get the stage checkpoint file path for a report."""
+        try:
+            uuid.UUID(report_id)
+        except ValueError:
+            raise StorageError(
+                message=f"Invalid report ID format: {report_id}",
+                operation="get_path",
+            )
+        # Not *.json, so list_reports never picks up a checkpoint
+        return self.reports_dir / f"{report_id}.checkpoint"
+    
     async def save_report(self, report: PipelineResponse, request_data: Dict) -> str:
         """
         Save a report to storage.
@@ -89,21 +105,32 @@ class ReportService:
                         "status": report.sections.research.status,
                         "content": report.sections.research.content,
                         "error": report.sections.research.error,
+                        "quality_score": report.sections.research.quality_score,
+                        "revisions": report.sections.research.revisions,
                     },
                     "product": {
                         "status": report.sections.product.status,
                         "content": report.sections.product.content,
                         "error": report.sections.product.error,
+                        "quality_score": report.sections.product.quality_score,
+                        "revisions": report.sections.product.revisions,
                     },
                     "marketing": {
                         "status": report.sections.marketing.status,
                         "content": report.sections.marketing.content,
                         "error": report.sections.marketing.error,
+                        "quality_score": report.sections.marketing.quality_score,
+                        "revisions": report.sections.marketing.revisions,
                     },
                 },
                 "created_at": report.metadata.created_at.isoformat(),
                 "execution_time_ms": report.metadata.execution_time_ms,
                 "tokens_used": report.metadata.tokens_used,
+                "usage": report.metadata.usage.model_dump(),
+                "stage_usage": {
+                    stage: usage.model_dump()
+                    for stage, usage in report.metadata.stage_usage.items()
+                },
             }
             
             # Save JSON metadata
@@ -116,21 +143,116 @@ class ReportService:
             async with aiofiles.open(md_path, "w", encoding="utf-8") as f:
                 await f.write(report.content)
             
+            # The saved report now holds every section
+            checkpoint_path = self._get_checkpoint_path(report_id)
+            if checkpoint_path.exists():
+                await aiofiles.os.remove(checkpoint_path)
+            
             logger.info(
                 "Report saved",
                 report_id=report_id,
                 company_name=request_data.get("company_name"),
             )
             
+            self.health.record(True)
             return report_id
             
         except Exception as e:
+            self.health.record(False)
             logger.error("Failed to save report", error=str(e))
             raise StorageError(
                 message=f"Failed to save report: {str(e)}",
                 operation="save",
             )
     
+    async def save_checkpoint(
+        self,
+        report_id: str,
+        request_data: Dict,
+        sections: Dict[str, SectionStatus],
+    ) -> None:
+        """
+        Persist the sections of a running pipeline.
+        
+        Called as each stage completes, so a run that dies before its
+        report is saved can still be resumed. The file is replaced
+        atomically and removed once the report is saved.
+        
+        Args:
+            report_id: The report UUID
+            request_data: Original request data (company_name, partner_company, domain)
+            sections: Stage name to section status, for the stages run so far
+        """
+        checkpoint_path = self._get_checkpoint_path(report_id)
+        temp_path = checkpoint_path.with_suffix(".checkpoint.tmp")
+        checkpoint = {
+            "report_id": report_id,
+            "company_name": request_data.get("company_name", ""),
+            "partner_company": request_data.get("partner_company", ""),
+            "domain": request_data.get("domain", ""),
+            "sections": {stage: status.model_dump() for stage, status in sections.items()},
+            "updated_at": datetime.utcnow().isoformat(),
+        }
+        try:
+            async with aiofiles.open(temp_path, "w", encoding="utf-8") as f:
+                await f.write(json.dumps(checkpoint, indent=2))
+            await aiofiles.os.replace(temp_path, checkpoint_path)
+            self.health.record(True)
+        except OSError as e:
+            self.health.record(False)
+            logger.error("Failed to save checkpoint", report_id=report_id, error=str(e))
+            raise StorageError(
+                message=f"Failed to save checkpoint: {str(e)}",
+                operation="checkpoint",
+            )
+    
+    def has_checkpoint(self, report_id: str) -> bool:
+        """Check whether a report has a pending checkpoint (a run that never saved it)."""
+        return self._get_checkpoint_path(report_id).exists()
+    
+    async def load_checkpoint(self, report_id: str) -> Tuple[Dict[str, str], Dict[str, SectionStatus]]:
+        """
+        Get the request data and stored sections of a report to resume.
+        
+        A pending checkpoint (from a run that never saved its report)
+        takes precedence over the saved report.
+        
+        Returns:
+            Tuple of (request data, stage name to section status)
+            
+        Raises:
+            ReportNotFoundError: If neither a checkpoint nor a report exists
+        """
+        checkpoint_path = self._get_checkpoint_path(report_id)
+        json_path = self._get_report_path(report_id)
+        path = checkpoint_path if checkpoint_path.exists() else json_path
+        
+        if not path.exists():
+            raise ReportNotFoundError(report_id)
+        
+        try:
+            async with aiofiles.open(path, "r", encoding="utf-8") as f:
+                data = json.loads(await f.read())
+            self.health.record(True)
+        except OSError as e:
+            self.health.record(False)
+            logger.error("Failed to read checkpoint", report_id=report_id, error=str(e))
+            raise StorageError(
+                message=f"Failed to read checkpoint: {str(e)}",
+                operation="read",
+            )
+        
+        request_data = {
+            "company_name": data["company_name"],
+            "partner_company": data["partner_company"],
+            "domain": data["domain"],
+        }
+        sections = {
+            stage: SectionStatus(**section)
+            for stage, section in data["sections"].items()
+        }
+        return request_data, sections
+    
     async def get_report(self, report_id: str) -> ReportDetail:
         """
         Retrieve a report by ID.
@@ -152,6 +274,7 @@ class ReportService:
         try:
             async with aiofiles.open(json_path, "r", encoding="utf-8") as f:
                 data = json.loads(await f.read())
+            self.health.record(True)
             
             return ReportDetail(
                 report_id=data["report_id"],
@@ -168,10 +291,22 @@ class ReportService:
                 created_at=datetime.fromisoformat(data["created_at"]),
                 execution_time_ms=data["execution_time_ms"],
                 tokens_used=data.get("tokens_used", 0),
+                usage=UsageMetrics(**data.get("usage", {})),
+                stage_usage={
+                    stage: UsageMetrics(**usage)
+                    for stage, usage in data.get("stage_usage", {}).items()
+                },
             )
             
         except ReportNotFoundError:
             raise
+        except OSError as e:
+            self.health.record(False)
+            logger.error("Failed to read report", report_id=report_id, error=str(e))
+            raise StorageError(
+                message=f"Failed to read report: {str(e)}",
+                operation="read",
+            )
         except Exception as e:
             logger.error("Failed to read report", report_id=report_id, error=str(e))
             raise StorageError(
@@ -236,6 +371,8 @@ class ReportService:
             elif sort == "company_name":
                 reports.sort(key=lambda r: r.company_name.lower(), reverse=reverse)
             
+            self.health.record(True)
+            
             # Paginate
             total = len(reports)
             start = (page - 1) * limit
@@ -244,6 +381,7 @@ class ReportService:
             return reports[start:end], total
             
         except Exception as e:
+            self.health.record(False)
             logger.error("Failed to list reports", error=str(e))
             raise StorageError(
                 message=f"Failed to list reports: {str(e)}",
@@ -264,15 +402,16 @@ class ReportService:
             raise ReportNotFoundError(report_id)
         
         try:
-            # Delete both files
-            if json_path.exists():
-                await aiofiles.os.remove(json_path)
-            if md_path.exists():
-                await aiofiles.os.remove(md_path)
+            # Delete the report files and any stale checkpoint
+            for path in (json_path, md_path, self._get_checkpoint_path(report_id)):
+                if path.exists():
+                    await aiofiles.os.remove(path)
             
             logger.info("Report deleted", report_id=report_id)
+            self.health.record(True)
             
         except Exception as e:
+            self.health.record(False)
             logger.error("Failed to delete report", report_id=report_id, error=str(e))
             raise StorageError(
                 message=f"Failed to delete report: {str(e)}",
@@ -280,15 +419,19 @@ class ReportService:
             )
     
     async def health_check(self) -> bool:
-        """Check if storage is accessible."""
-        try:
-            test_file = self.reports_dir / ".health_check"
-            async with aiofiles.open(test_file, "w") as f:
-                await f.write("ok")
-            await aiofiles.os.remove(test_file)
-            return True
-        except Exception:
+        """
+        Check if storage is accessible.
+        
+        Derived from recent report reads and writes; when idle, the
+        directory is checked for write access without writing a file.
+        """
+        return await self.health.check()
+    
+    async def _probe(self) -> bool:
+        """Check the reports directory exists, is writable and has free space."""
+        if not self.reports_dir.is_dir() or not os.access(self.reports_dir, os.W_OK | os.X_OK):
             return False
+        return shutil.disk_usage(self.reports_dir).free > 0
 
 
 # Singleton instance
@@ -0,0 +1,216 @@
+"""
+Error-classified retries for LLM calls.
+Retries transient provider failures with jittered exponential backoff,
+honors Retry-After, and caps retry volume with a process-wide budget.
+"""
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+import httpx
+import openai
+
+from app.services.deadline import time_left
+from app.services.llm_pool import retry_after_seconds
+from app.utils.exceptions import LLMAPIError
+from app.utils.logging import get_logger
+from app.utils.telemetry import LLM_RETRIES
+
+logger = get_logger(__name__)
+
+# Error classes
+RATE_LIMITED = "rate_limited"
+SERVER_ERROR = "server_error"
+TIMEOUT = "timeout"
+CONNECTION = "connection"
+NON_RETRYABLE = "non_retryable"
+
+RETRYABLE_CLASSES = {RATE_LIMITED, SERVER_ERROR, TIMEOUT, CONNECTION}
+
+
+def classify_error(error: BaseException) -> str:
+    """Sort an LLM call failure into a retry class."""
+    if isinstance(error, openai.RateLimitError):
+        return RATE_LIMITED
+    if isinstance(error, (openai.APITimeoutError, asyncio.TimeoutError)):
+        return TIMEOUT
+    if isinstance(error, (openai.APIConnectionError, ConnectionError, httpx.TransportError)):
+        return CONNECTION
+    if isinstance(error, openai.APIStatusError):
+        if error.status_code >= 500:
+            return SERVER_ERROR
+        if error.status_code == 408:
+            return TIMEOUT
+        return NON_RETRYABLE
+    if (
+        isinstance(error, LLMAPIError)
+        and error.details.get("state") == "no_backend_available"
+        and error.details.get("retry_after") is not None
+    ):
+        # Every backend is out but at least one is only drained; wait for it
+        return RATE_LIMITED
+    return NON_RETRYABLE
+
+
+def error_retry_after(error: BaseException) -> Optional[float]:
+    """Get the server- or pool-requested wait before retrying, if any."""
+    if isinstance(error, LLMAPIError):
+        return error.details.get("retry_after")
+    return retry_after_seconds(error)
+
+
+class RetryBudget:
+    """
+    Caps retries to a fraction of recent requests.
+
+    Within the sliding window, retries are allowed while
+    retries < min_retries + ratio * requests, so a healthy service can
+    always retry a little but an outage cannot multiply load.
+    """
+
+    def __init__(self, ratio: float = 0.1, min_retries: int = 10, window_seconds: float = 10.0):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window_seconds = window_seconds
+        self._requests: Deque[float] = deque()
+        self._retries: Deque[float] = deque()
+
+    def record_request(self) -> None:
+        """Count a first attempt."""
+        self._requests.append(time.monotonic())
+
+    def try_spend(self) -> bool:
+        """Take one retry from the budget; False if it is exhausted."""
+        self._trim()
+        if len(self._retries) >= self.min_retries + self.ratio * len(self._requests):
+            return False
+        self._retries.append(time.monotonic())
+        return True
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Get request and retry counts in the current window."""
+        self._trim()
+        return {"window_requests": len(self._requests), "window_retries": len(self._retries)}
+
+    def _trim(self) -> None:
+        cutoff = time.monotonic() - self.window_seconds
+        for samples in (self._requests, self._retries):
+            while samples and samples[0] < cutoff:
+                samples.popleft()
+
+
+class RetryPolicy:
+    """
+    Retries an async call on retryable error classes.
+
+    Backoff is "full jitter": a uniform delay up to
+    initial_delay * backoff_factor ** attempt, capped at max_delay. A
+    Retry-After hint replaces the backoff (plus a little jitter); a hint
+    longer than max_delay ends the retries.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        initial_delay: float = 1.0,
+        max_delay: float = 30.0,
+        backoff_factor: float = 2.0,
+        budget: Optional[RetryBudget] = None,
+    ):
+        self.max_retries = max_retries
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.backoff_factor = backoff_factor
+        self.budget = budget or RetryBudget()
+        self._stats: Dict[str, int] = {
+            "retries": 0,
+            "recovered": 0,
+            "budget_exhausted": 0,
+            "gave_up": 0,
+        }
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Get retry counters and the budget window."""
+        return {**self._stats, **self.budget.stats}
+
+    def delay(self, attempt: int, error: BaseException) -> Optional[float]:
+        """Seconds to wait before retry number `attempt` (0-based), or None to give up."""
+        retry_after = error_retry_after(error)
+        if retry_after is not None:
+            if retry_after > self.max_delay:
+                return None
+            return retry_after + random.uniform(0, self.initial_delay)
+        ceiling = min(self.max_delay, self.initial_delay * self.backoff_factor ** attempt)
+        return random.uniform(0, ceiling)
+
+    async def run(self, call: Callable[[], Awaitable[Any]], operation: str = "llm_call") -> Any:
+        """
+        Run `call`, retrying transient failures.
+
+        Args:
+            call: Zero-argument coroutine function making one attempt
+            operation: Name used in logs
+
+        Returns:
+            The first successful result
+
+        Raises:
+            The last error once it is non-retryable or retries run out
+        """
+        self.budget.record_request()
+        attempt = 0
+        while True:
+            try:
+                result = await call()
+            except Exception as e:
+                error_class = classify_error(e)
+                if error_class not in RETRYABLE_CLASSES:
+                    raise
+                wait = self._next_wait(attempt, e, error_class, operation)
+                if wait is None:
+                    raise
+                await asyncio.sleep(wait)
+                attempt += 1
+                continue
+            if attempt:
+                self._stats["recovered"] += 1
+            return result
+
+    def _next_wait(
+        self,
+        attempt: int,
+        error: BaseException,
+        error_class: str,
+        operation: str,
+    ) -> Optional[float]:
+        """Decide whether to retry, returning the wait or None."""
+        wait = self.delay(attempt, error) if attempt < self.max_retries else None
+        left = time_left()
+        if wait is not None and left is not None and wait >= left:
+            # The retry could not start before the request deadline
+            wait = None
+        if wait is None:
+            self._stats["gave_up"] += 1
+            LLM_RETRIES.labels(error_class=error_class, decision="gave_up").inc()
+            return None
+        if not self.budget.try_spend():
+            self._stats["budget_exhausted"] += 1
+            LLM_RETRIES.labels(error_class=error_class, decision="budget_exhausted").inc()
+            logger.warning("LLM retry budget exhausted", operation=operation, error_class=error_class)
+            return None
+
+        self._stats["retries"] += 1
+        LLM_RETRIES.labels(error_class=error_class, decision="retried").inc()
+        logger.warning(
+            "Retrying LLM call",
+            operation=operation,
+            attempt=attempt + 1,
+            error_class=error_class,
+            error=str(error),
+            delay_seconds=round(wait, 2),
+        )
+        return wait
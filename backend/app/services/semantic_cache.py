@@ -0,0 +1,196 @@
+"""
+Near-duplicate response cache for LLM completions.
+Matches requests by MinHash similarity of hashed character n-grams,
+computed locally with NumPy, with LSH banding for sublinear lookup.
+"""
+import re
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.utils.logging import get_logger
+from app.utils.telemetry import LLM_CACHE_EVENTS
+
+logger = get_logger(__name__)
+
+# Mersenne prime for the universal hash family (a * x + b) mod p
+_PRIME = np.uint64((1 << 61) - 1)
+
+# Company suffixes that never change the meaning of a name
+_LEGAL_SUFFIXES = {"inc", "corp", "corporation", "co", "ltd", "llc", "plc", "gmbh", "ag", "sa"}
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def normalize_words(text: str) -> List[str]:
+    """Lowercase, strip punctuation and legal suffixes, and split into words."""
+    return [w for w in _WORD.findall(text.lower()) if w not in _LEGAL_SUFFIXES]
+
+
+def shingles(text: str, n: int = 3) -> Set[str]:
+    """
+    Character n-grams of each word plus the words themselves.
+
+    Shingles are per word, so reordering words (e.g. swapped partner
+    names) does not change the set.
+    """
+    result: Set[str] = set()
+    for word in normalize_words(text):
+        padded = f" {word} "
+        result.add(word)
+        result.update(padded[i:i + n] for i in range(max(1, len(padded) - n + 1)))
+    return result
+
+
+@dataclass
+class _Entry:
+    """A cached completion occupying one row of the signature matrix."""
+
+    namespace: str
+    content: str
+    created_at: float
+    band_keys: List[Tuple[str, int, bytes]]
+
+
+class SemanticCache:
+    """
+    In-memory near-duplicate cache.
+
+    Each entry is stored as a MinHash signature row in a fixed-size matrix
+    (oldest rows are overwritten first). LSH buckets over signature bands
+    narrow a lookup to a few candidates, whose similarity to the query is
+    then computed in one vectorized comparison. Entries only match within
+    the same namespace.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 128,
+        bands: int = 32,
+        ngram: int = 3,
+        max_entries: int = 5000,
+        ttl_seconds: int = 86400,
+        seed: int = 7,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.ngram = ngram
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 1 << 32, size=(num_perm, 1), dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, size=(num_perm, 1), dtype=np.uint64)
+        self._signatures = np.zeros((max_entries, num_perm), dtype=np.uint64)
+        self._entries: List[Optional[_Entry]] = [None] * max_entries
+        self._buckets: Dict[Tuple[str, int, bytes], Set[int]] = {}
+        self._next_slot = 0
+        self._stats: Dict[str, int] = {"hits": 0, "misses": 0, "writes": 0, "candidates": 0}
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Get hit/miss counters and the number of stored entries."""
+        return {
+            **self._stats,
+            "entries": sum(1 for e in self._entries if e is not None),
+        }
+
+    def signature(self, text: str) -> np.ndarray:
+        """Compute the MinHash signature of a text."""
+        grams = shingles(text, self.ngram)
+        if not grams:
+            return np.full(self.num_perm, _PRIME, dtype=np.uint64)
+        hashes = np.fromiter(
+            (zlib.crc32(g.encode("utf-8")) for g in grams),
+            dtype=np.uint64,
+            count=len(grams),
+        )
+        # a, x < 2**32, so a * x + b cannot overflow uint64
+        return ((self._a * hashes + self._b) % _PRIME).min(axis=1)
+
+    def _band_keys(self, namespace: str, signature: np.ndarray) -> List[Tuple[str, int, bytes]]:
+        bands = signature.reshape(self.bands, self.rows)
+        return [(namespace, i, bands[i].tobytes()) for i in range(self.bands)]
+
+    def lookup(self, namespace: str, text: str, threshold: float) -> Optional[str]:
+        """
+        Find cached content for a near-duplicate of `text`.
+
+        Args:
+            namespace: Partition that must match exactly
+            text: Text compared by similarity
+            threshold: Minimum estimated Jaccard similarity (0-1)
+
+        Returns:
+            The most similar entry's content, or None
+        """
+        signature = self.signature(text)
+        candidates: Set[int] = set()
+        for key in self._band_keys(namespace, signature):
+            candidates.update(self._buckets.get(key, ()))
+
+        content = None
+        if candidates:
+            self._stats["candidates"] += len(candidates)
+            slots = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+            similarity = (self._signatures[slots] == signature).mean(axis=1)
+            now = time.time()
+            for index in np.argsort(-similarity):
+                if similarity[index] < threshold:
+                    break
+                entry = self._entries[slots[index]]
+                if entry is not None and now - entry.created_at <= self.ttl_seconds:
+                    content = entry.content
+                    logger.info(
+                        "Semantic cache match",
+                        similarity=round(float(similarity[index]), 3),
+                        candidates=len(candidates),
+                    )
+                    break
+
+        if content is None:
+            self._stats["misses"] += 1
+            LLM_CACHE_EVENTS.labels(tier="semantic", event="miss").inc()
+        else:
+            self._stats["hits"] += 1
+            LLM_CACHE_EVENTS.labels(tier="semantic", event="hit").inc()
+        return content
+
+    def add(self, namespace: str, text: str, content: str) -> None:
+        """Store content, overwriting the oldest entry when full."""
+        slot = self._next_slot
+        self._next_slot = (slot + 1) % self.max_entries
+        self._evict(slot)
+
+        signature = self.signature(text)
+        band_keys = self._band_keys(namespace, signature)
+        self._signatures[slot] = signature
+        self._entries[slot] = _Entry(namespace, content, time.time(), band_keys)
+        for key in band_keys:
+            self._buckets.setdefault(key, set()).add(slot)
+        self._stats["writes"] += 1
+        LLM_CACHE_EVENTS.labels(tier="semantic", event="write").inc()
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        self._entries = [None] * self.max_entries
+        self._buckets.clear()
+        self._next_slot = 0
+
+    def _evict(self, slot: int) -> None:
+        """Free a slot and remove it from its LSH buckets."""
+        entry = self._entries[slot]
+        if entry is None:
+            return
+        for key in entry.band_keys:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(slot)
+                if not bucket:
+                    del self._buckets[key]
+        self._entries[slot] = None
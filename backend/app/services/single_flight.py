@@ -0,0 +1,77 @@
+"""
+Single-flight coalescing of identical in-flight calls.
+Concurrent callers with the same key share one underlying task.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+from app.utils.telemetry import LLM_SINGLE_FLIGHT_EVENTS
+
+
+class _Flight:
+    """An in-flight call and the number of callers awaiting it."""
+
+    def __init__(self, task: "asyncio.Task[Any]"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls by key.
+
+    The first caller for a key starts the work; later callers await the same
+    task. The task is cancelled only once every waiter has gone away.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self._stats: Dict[str, int] = {
+            "leaders": 0,
+            "coalesced": 0,
+            "cancelled": 0,
+        }
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Get coalescing counters plus the current number of flights."""
+        return {**self._stats, "in_flight": len(self._flights)}
+
+    async def run(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run func, or join an identical call already in flight.
+
+        Args:
+            key: Identity of the call; equal keys are coalesced
+            func: Zero-argument coroutine function doing the work
+
+        Returns:
+            The shared result of the call
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(func()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+            self._stats["leaders"] += 1
+            LLM_SINGLE_FLIGHT_EVENTS.labels(event="leader").inc()
+        else:
+            self._stats["coalesced"] += 1
+            LLM_SINGLE_FLIGHT_EVENTS.labels(event="coalesced").inc()
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Every caller was cancelled; nobody needs the result
+                flight.task.cancel()
+                self._forget(key, flight)
+                self._stats["cancelled"] += 1
+                LLM_SINGLE_FLIGHT_EVENTS.labels(event="cancelled").inc()
+
+    def _forget(self, key: str, flight: _Flight) -> None:
+        """Drop a flight from the table if it is still the current one."""
+        if self._flights.get(key) is flight:
+            del self._flights[key]
@@ -0,0 +1,131 @@
+"""
+Local token counting and output budgeting.
+Counts prompt tokens before dispatch so oversized prompts are rejected
+locally and max_tokens is sized to the space left in the context window.
+"""
+import math
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from app.utils.exceptions import ValidationError
+from app.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Chat format overhead (per message, and once for the assistant reply priming)
+TOKENS_PER_MESSAGE = 3
+REPLY_PRIMING_TOKENS = 3
+
+# Used when tiktoken is not installed; deliberately below the usual ~4 so
+# the context check errs on the safe side
+FALLBACK_CHARS_PER_TOKEN = 3
+
+# Context windows by model-name prefix; longest matching prefix wins
+MODEL_CONTEXT_WINDOWS: Dict[str, int] = {
+    "gpt-4o": 128000,
+    "gpt-4.1": 1047576,
+    "gpt-4-turbo": 128000,
+    "gpt-4-1106": 128000,
+    "gpt-4-0125": 128000,
+    "gpt-4-32k": 32768,
+    "gpt-4": 8192,
+    "gpt-3.5-turbo": 16385,
+}
+DEFAULT_CONTEXT_WINDOW = 8192
+
+
+def context_window(model: str) -> int:
+    """Get the context window of a model, by longest known prefix."""
+    matches = [prefix for prefix in MODEL_CONTEXT_WINDOWS if model.startswith(prefix)]
+    if not matches:
+        return DEFAULT_CONTEXT_WINDOW
+    return MODEL_CONTEXT_WINDOWS[max(matches, key=len)]
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str) -> Optional[Any]:
+    """
+    Get the tiktoken encoding for a model (loaded once per model).
+
+    Returns None when tiktoken is not installed or cannot load the
+    encoding (its BPE files are downloaded on first use); counts then fall
+    back to a conservative character heuristic for the life of the process.
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        logger.warning("tiktoken is not installed, estimating token counts")
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning("tiktoken encoding unavailable, estimating token counts", model=model, error=str(e))
+        return None
+
+
+def count_tokens(text: str, model: str) -> int:
+    """Count the tokens in a piece of text."""
+    if not text:
+        return 0
+    encoding = get_encoding(model)
+    if encoding is None:
+        return math.ceil(len(text) / FALLBACK_CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+@lru_cache(maxsize=256)
+def count_static_tokens(text: str, model: str) -> int:
+    """Count tokens in text that repeats across calls, such as system prompts."""
+    return count_tokens(text, model)
+
+
+def count_message_tokens(messages: List[Dict[str, str]], model: str) -> int:
+    """Count the prompt tokens of a chat message list, system prompts memoized."""
+    total = REPLY_PRIMING_TOKENS
+    for message in messages:
+        content = message.get("content") or ""
+        counter = count_static_tokens if message.get("role") == "system" else count_tokens
+        total += TOKENS_PER_MESSAGE + counter(content, model)
+    return total
+
+
+def plan_max_tokens(
+    prompt_tokens: int,
+    requested: int,
+    window: int,
+    min_output_tokens: int = 256,
+) -> int:
+    """
+    Size max_tokens to the space the prompt leaves in the context window.
+
+    Args:
+        prompt_tokens: Counted prompt tokens
+        requested: max_tokens the caller asked for
+        window: Model context window
+        min_output_tokens: Smallest useful completion
+
+    Returns:
+        max_tokens to send, never more than requested
+
+    Raises:
+        ValidationError: If the prompt leaves less than min_output_tokens
+    """
+    available = window - prompt_tokens
+    if available < min(requested, min_output_tokens):
+        raise ValidationError(
+            message=(
+                f"Prompt is too long for the model context window "
+                f"({prompt_tokens} prompt tokens, {window} token window)"
+            ),
+            field="prompt",
+            details={
+                "state": "context_window_exceeded",
+                "prompt_tokens": prompt_tokens,
+                "context_window": window,
+                "min_output_tokens": min_output_tokens,
+            },
+        )
+    return min(requested, available)
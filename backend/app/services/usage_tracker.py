@@ -0,0 +1,118 @@
+"""
+Context-local LLM usage accounting.
+Lets concurrent pipelines in one process track their own token usage.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+
+class UsageAccumulator:
+    """
+    Accumulates token usage, call count and LLM wall time.
+
+    Accumulators nest: usage recorded in a child is also added to every
+    ancestor, and named children are kept for per-stage breakdowns.
+    """
+
+    def __init__(self, name: str = "", parent: Optional["UsageAccumulator"] = None):
+        self.name = name
+        self.parent = parent
+        self.children: Dict[str, "UsageAccumulator"] = {}
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_tokens = 0
+        self.llm_calls = 0
+        self.llm_time_ms = 0.0
+
+    @property
+    def total_tokens(self) -> int:
+        """Prompt plus completion tokens."""
+        return self.prompt_tokens + self.completion_tokens
+
+    def add(
+        self,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        llm_time_ms: float = 0.0,
+        cached_tokens: int = 0,
+    ) -> None:
+        """
+        Record one LLM call here and in every ancestor.
+
+        cached_tokens is the part of prompt_tokens served from the
+        provider's prompt cache.
+        """
+        node: Optional[UsageAccumulator] = self
+        while node is not None:
+            node.prompt_tokens += prompt_tokens
+            node.completion_tokens += completion_tokens
+            node.cached_tokens += cached_tokens
+            node.llm_calls += 1
+            node.llm_time_ms += llm_time_ms
+            node = node.parent
+
+    def to_dict(self) -> Dict[str, float]:
+        """Serialize the totals (children excluded)."""
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+            "cached_tokens": self.cached_tokens,
+            "llm_calls": self.llm_calls,
+            "llm_time_ms": round(self.llm_time_ms, 2),
+        }
+
+
+_current_usage: ContextVar[Optional[UsageAccumulator]] = ContextVar(
+    "collabgen_llm_usage", default=None
+)
+
+
+def current_usage() -> Optional[UsageAccumulator]:
+    """Get the accumulator active in the current context, if any."""
+    return _current_usage.get()
+
+
+def current_scope() -> str:
+    """Get the name of the innermost named usage block (e.g. the pipeline stage), or ""."""
+    accumulator = _current_usage.get()
+    while accumulator is not None and not accumulator.name:
+        accumulator = accumulator.parent
+    return accumulator.name if accumulator is not None else ""
+
+
+@contextmanager
+def track_usage(name: str = "") -> Iterator[UsageAccumulator]:
+    """
+    Track LLM usage for the enclosed block.
+
+    Nested blocks create child accumulators; a named child is registered on
+    its parent so callers can report usage per stage.
+    """
+    parent = _current_usage.get()
+    accumulator = UsageAccumulator(name=name, parent=parent)
+    if parent is not None and name:
+        parent.children[name] = accumulator
+    token = _current_usage.set(accumulator)
+    try:
+        yield accumulator
+    finally:
+        _current_usage.reset(token)
+
+
+def record_usage(
+    prompt_tokens: int = 0,
+    completion_tokens: int = 0,
+    llm_time_ms: float = 0.0,
+    cached_tokens: int = 0,
+) -> None:
+    """Add one LLM call to the active accumulator (no-op outside tracking)."""
+    accumulator = _current_usage.get()
+    if accumulator is not None:
+        accumulator.add(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            llm_time_ms=llm_time_ms,
+            cached_tokens=cached_tokens,
+        )
@@ -8,6 +8,7 @@ from app.utils.exceptions import (
     StorageError,
     RateLimitError,
     TimeoutError,
+    DeadlineExceededError,
     AuthenticationError,
     AuthorizationError,
 )
@@ -22,6 +23,7 @@ __all__ = [
     "StorageError",
     "RateLimitError",
     "TimeoutError",
+    "DeadlineExceededError",
     "AuthenticationError",
     "AuthorizationError",
     "setup_logging",
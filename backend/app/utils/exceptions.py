@@ -80,6 +80,43 @@ class StorageError(CollabGenException):
         self.operation = operation
 
 
+class JobNotFoundError(CollabGenException):
+    """Raised when a pipeline job cannot be found."""
+    
+    def __init__(self, job_id: str):
+        super().__init__(
+            message=f"Job with ID '{job_id}' not found",
+            details={"job_id": job_id},
+            status_code=404
+        )
+        self.job_id = job_id
+
+
+class BatchNotFoundError(CollabGenException):
+    """Raised when a batch pipeline run cannot be found."""
+    
+    def __init__(self, batch_id: str):
+        super().__init__(
+            message=f"Batch with ID '{batch_id}' not found",
+            details={"batch_id": batch_id},
+            status_code=404
+        )
+        self.batch_id = batch_id
+
+
+class QueueFullError(CollabGenException):
+    """Raised when the pipeline job queue is at its maximum depth."""
+    
+    def __init__(self, depth: int, max_depth: int):
+        super().__init__(
+            message="Pipeline job queue is full, retry later",
+            details={"queue_depth": depth, "max_depth": max_depth},
+            status_code=503
+        )
+        self.depth = depth
+        self.max_depth = max_depth
+
+
 class RateLimitError(CollabGenException):
     """Raised when rate limit is exceeded."""
     
@@ -105,6 +142,18 @@ class TimeoutError(CollabGenException):
         self.timeout_seconds = timeout_seconds
 
 
+class DeadlineExceededError(TimeoutError):
+    """Raised when a request's end-to-end deadline leaves no time for an operation."""
+    
+    def __init__(self, operation: str, timeout_seconds: float):
+        super().__init__(
+            message=f"Deadline exceeded before {operation} could complete",
+            operation=operation,
+            timeout_seconds=timeout_seconds,
+        )
+        self.details["state"] = "deadline_exceeded"
+
+
 class AuthenticationError(CollabGenException):
     """Raised when authentication fails."""
     
@@ -0,0 +1,124 @@
+"""
+Prometheus metrics shared across the backend.
+Exposed through the /metrics endpoint.
+"""
+from prometheus_client import Counter, Gauge
+
+# LLM response cache
+LLM_CACHE_EVENTS = Counter(
+    "collabgen_llm_cache_events_total",
+    "LLM response cache events by tier and outcome",
+    ["tier", "event"],
+)
+
+# Single-flight coalescing of identical LLM calls
+LLM_SINGLE_FLIGHT_EVENTS = Counter(
+    "collabgen_llm_single_flight_events_total",
+    "Single-flight LLM call events (leader, coalesced, cancelled)",
+    ["event"],
+)
+
+# Adaptive concurrency limiter around LLM calls
+LLM_CONCURRENCY_LIMIT = Gauge(
+    "collabgen_llm_concurrency_limit",
+    "Current adaptive concurrency limit for LLM calls",
+    ["backend"],
+)
+LLM_CONCURRENCY_IN_FLIGHT = Gauge(
+    "collabgen_llm_concurrency_in_flight",
+    "LLM calls currently holding a concurrency slot",
+    ["backend"],
+)
+LLM_CONCURRENCY_QUEUE_DEPTH = Gauge(
+    "collabgen_llm_concurrency_queue_depth",
+    "LLM calls waiting for a concurrency slot",
+    ["backend"],
+)
+
+# Client-side RPM/TPM scheduling
+LLM_RATE_BUCKET_AVAILABLE = Gauge(
+    "collabgen_llm_rate_bucket_available",
+    "Remaining capacity in the RPM/TPM token buckets",
+    ["backend", "bucket"],
+)
+LLM_RATE_WAIT_SECONDS = Counter(
+    "collabgen_llm_rate_wait_seconds_total",
+    "Time LLM calls spent waiting for RPM/TPM budget",
+    ["backend"],
+)
+
+# Circuit breakers
+CIRCUIT_BREAKER_STATE = Gauge(
+    "collabgen_circuit_breaker_state",
+    "Circuit breaker state (0=closed, 1=half_open, 2=open)",
+    ["breaker"],
+)
+CIRCUIT_BREAKER_TRANSITIONS = Counter(
+    "collabgen_circuit_breaker_transitions_total",
+    "Circuit breaker state transitions",
+    ["breaker", "from_state", "to_state"],
+)
+
+# Hedged LLM requests
+LLM_HEDGE_EVENTS = Counter(
+    "collabgen_llm_hedge_events_total",
+    "Hedged LLM request events (hedged, hedge_won, budget_denied)",
+    ["event"],
+)
+
+# LLM backend pool
+LLM_BACKEND_OUTSTANDING = Gauge(
+    "collabgen_llm_backend_outstanding",
+    "Outstanding LLM calls per backend",
+    ["backend"],
+)
+LLM_BACKEND_DRAINS = Counter(
+    "collabgen_llm_backend_drains_total",
+    "Times an LLM backend was drained after a rate-limit response",
+    ["backend"],
+)
+
+# LLM retries
+LLM_RETRIES = Counter(
+    "collabgen_llm_retries_total",
+    "LLM retry decisions by error class (retried, budget_exhausted, gave_up)",
+    ["error_class", "decision"],
+)
+
+# Prompt tokens per agent
+LLM_AGENT_PROMPT_TOKENS = Counter(
+    "collabgen_llm_agent_prompt_tokens_total",
+    "Prompt tokens sent by each agent (kind: prompt or cached)",
+    ["agent", "kind"],
+)
+
+# Component health (1=healthy, 0=unhealthy)
+COMPONENT_HEALTHY = Gauge(
+    "collabgen_component_healthy",
+    "Last health check result per dependency (1=healthy, 0=unhealthy)",
+    ["component"],
+)
+
+# Pipeline job queue
+JOB_QUEUE_DEPTH = Gauge(
+    "collabgen_job_queue_depth",
+    "Pipeline jobs waiting for a worker",
+)
+JOB_RUNNING = Gauge(
+    "collabgen_job_running",
+    "Pipeline jobs currently held by a worker",
+)
+JOBS_FINISHED = Counter(
+    "collabgen_jobs_finished_total",
+    "Pipeline jobs by final status (completed, failed, cancelled)",
+    ["status"],
+)
+BATCH_RESEARCH_SECTIONS = Counter(
+    "collabgen_batch_research_sections_total",
+    "Research sections of batch pipeline items, by whether they were generated or shared",
+    ["source"],
+)
+JOBS_RECLAIMED = Counter(
+    "collabgen_jobs_reclaimed_total",
+    "Pipeline jobs taken over from an expired lease",
+)
@@ -1,9 +1,70 @@
 """
 API endpoint tests.
 """
+import asyncio
+import json
+
 import pytest
 from httpx import AsyncClient
 
+from app.api.routes import jobs as jobs_routes
+from app.api.routes import pipeline as pipeline_routes
+from app.models.requests import PipelineRequest
+from app.models.responses import PipelineMetadata, PipelineResponse, PipelineSections, SectionStatus
+from app.services.batch_planner import BatchPipelineService
+from app.services.job_queue import JobQueue
+from app.services.pipeline_service import get_pipeline_orchestrator
+from app.utils.exceptions import TimeoutError
+
+PIPELINE_BODY = {"company_name": "Apple", "partner_company": "Microsoft", "domain": "AI"}
+
+
+class StubOrchestrator:
+    """Orchestrator that emits a fixed event sequence, then fails, blocks or returns."""
+    
+    def __init__(self, outcome: str = "complete"):
+        self.outcome = outcome
+        self.cancelled = False
+    
+    async def run_pipeline(self, request, on_event=None, **kwargs):
+        on_event = on_event or self._ignore
+        await on_event("pipeline_started", {"report_id": "r-1"})
+        await on_event("stage_started", {"stage": "research"})
+        await on_event("token", {"stage": "research", "content": "Hello"})
+        if self.outcome == "fail":
+            raise RuntimeError("boom")
+        if self.outcome == "block":
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                self.cancelled = True
+                raise
+        section = SectionStatus(status="completed", content="Hello")
+        return PipelineResponse(
+            report_id="r-1",
+            status="completed",
+            content="Hello",
+            sections=PipelineSections(research=section, product=section, marketing=section),
+            metadata=PipelineMetadata(execution_time_ms=1.0),
+        )
+    
+    @staticmethod
+    async def _ignore(event, data):
+        pass
+
+
+def parse_sse(body: str):
+    """Split an SSE body into (event, data) pairs, checking the framing."""
+    events = []
+    for message in body.split("\n\n"):
+        if not message:
+            continue
+        event_line, data_line = message.split("\n")
+        assert event_line.startswith("event: ")
+        assert data_line.startswith("data: ")
+        events.append((event_line[len("event: "):], json.loads(data_line[len("data: "):])))
+    return events
+
 
 @pytest.mark.asyncio
 class TestHealthEndpoints:
@@ -33,6 +94,15 @@ class TestHealthEndpoints:
         assert "version" in data
         assert "uptime" in data
         assert "checks" in data
+    
+    async def test_llm_stats(self, test_client: AsyncClient):
+        """Test LLM client statistics endpoint."""
+        response = await test_client.get("/health/llm")
+        assert response.status_code == 200
+        data = response.json()
+        for key in ("cache", "limiter", "scheduler", "circuit", "pool"):
+            assert key in data
+        assert data["pool"]["max_connections"] > 0
 
 
 @pytest.mark.asyncio
@@ -102,6 +172,48 @@ class TestReportsEndpoints:
             "/api/v1/reports/00000000-0000-0000-0000-000000000000"
         )
         assert response.status_code == 404
+    
+    async def test_resume_nonexistent_report(self, authenticated_client: AsyncClient):
+        """Test resuming a report that doesn't exist."""
+        response = await authenticated_client.post(
+            "/api/v1/reports/00000000-0000-0000-0000-000000000000/resume"
+        )
+        assert response.status_code == 404
+    
+    async def test_resume_invalid_report_id(self, authenticated_client: AsyncClient):
+        """Test resuming a report with invalid ID format."""
+        response = await authenticated_client.post("/api/v1/reports/invalid-id/resume")
+        assert response.status_code in [400, 500]
+    
+    async def test_resume_partial_report(
+        self,
+        authenticated_client: AsyncClient,
+        fake_agent,
+        monkeypatch,
+        tmp_path,
+    ):
+        """Test resuming a partial report re-runs only the failed stage."""
+        pipeline = get_pipeline_orchestrator()
+        monkeypatch.setattr(pipeline.report_service, "reports_dir", tmp_path)
+        for stage in ("research", "product", "marketing"):
+            monkeypatch.setattr(pipeline, f"{stage}_agent", fake_agent(stage))
+        pipeline.marketing_agent.fail = True
+        partial = await pipeline.run_pipeline(
+            PipelineRequest(company_name="Apple", partner_company="Microsoft", domain="AI")
+        )
+        assert partial.status == "partial"
+        
+        pipeline.marketing_agent.fail = False
+        response = await authenticated_client.post(f"/api/v1/reports/{partial.report_id}/resume")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["report_id"] == partial.report_id
+        assert data["status"] == "completed"
+        assert data["sections"]["marketing"]["content"] == "marketing v2"
+        assert len(pipeline.research_agent.calls) == 1
+        
+        response = await authenticated_client.get(f"/api/v1/reports/{partial.report_id}")
+        assert response.json()["status"] == "completed"
 
 
 @pytest.mark.asyncio
@@ -131,6 +243,207 @@ class TestPipelineEndpoints:
             },
         )
         assert response.status_code == 422
+    
+    async def test_pipeline_stream_events(self, authenticated_client: AsyncClient, monkeypatch):
+        """Test the stream relays pipeline events and ends with the response."""
+        monkeypatch.setattr(pipeline_routes, "get_pipeline_orchestrator", lambda: StubOrchestrator())
+        response = await authenticated_client.post("/api/v1/run-pipeline/stream", json=PIPELINE_BODY)
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = parse_sse(response.text)
+        assert [name for name, _ in events] == [
+            "pipeline_started", "stage_started", "token", "completed",
+        ]
+        assert events[2][1] == {"stage": "research", "content": "Hello"}
+        assert events[-1][1]["report_id"] == "r-1"
+        assert events[-1][1]["status"] == "completed"
+    
+    async def test_pipeline_stream_error_event(self, authenticated_client: AsyncClient, monkeypatch):
+        """Test a failing pipeline ends the stream with an error event."""
+        monkeypatch.setattr(pipeline_routes, "get_pipeline_orchestrator", lambda: StubOrchestrator("fail"))
+        response = await authenticated_client.post("/api/v1/run-pipeline/stream", json=PIPELINE_BODY)
+        
+        events = parse_sse(response.text)
+        assert [name for name, _ in events][-2:] == ["token", "error"]
+        assert events[-1][1] == {"message": "Pipeline execution failed"}
+    
+    async def test_pipeline_stream_disconnect_cancels_pipeline(self, monkeypatch):
+        """Test the pipeline is cancelled when the client stops reading."""
+        stub = StubOrchestrator("block")
+        monkeypatch.setattr(pipeline_routes, "get_pipeline_orchestrator", lambda: stub)
+        response = await pipeline_routes.run_pipeline_stream(PipelineRequest(**PIPELINE_BODY), api_key="test")
+        
+        stream = response.body_iterator
+        first = await stream.__anext__()
+        assert first.startswith("event: pipeline_started\n")
+        await stream.aclose()
+        await asyncio.sleep(0)
+        
+        assert stub.cancelled
+    
+    async def test_batch_pipeline_progress(
+        self,
+        authenticated_client: AsyncClient,
+        fake_agent,
+        settings,
+        monkeypatch,
+        tmp_path,
+    ):
+        """Test a batch returns 202 with its plan and reports per-item progress."""
+        monkeypatch.setattr(settings, "RESEARCH_FAN_OUT_ENABLED", False)
+        pipeline = get_pipeline_orchestrator()
+        monkeypatch.setattr(pipeline.report_service, "reports_dir", tmp_path)
+        for stage in ("research", "product", "marketing"):
+            monkeypatch.setattr(pipeline, f"{stage}_agent", fake_agent(stage))
+        service = BatchPipelineService(orchestrator=pipeline)
+        monkeypatch.setattr(pipeline_routes, "get_batch_pipeline_service", lambda: service)
+        
+        response = await authenticated_client.post(
+            "/api/v1/batch-pipeline",
+            json={"items": [PIPELINE_BODY, {**PIPELINE_BODY, "partner_company": "Google"}, PIPELINE_BODY]},
+        )
+        assert response.status_code == 202
+        data = response.json()
+        assert data["plan"]["unique_pipelines"] == 2
+        assert data["items"][2]["duplicate_of"] == 0
+        
+        for _ in range(100):
+            response = await authenticated_client.get(f"/api/v1/batch-pipeline/{data['batch_id']}")
+            if response.json()["status"] == "completed":
+                break
+            await asyncio.sleep(0.01)
+        items = response.json()["items"]
+        assert [item["status"] for item in items] == ["completed"] * 3
+        assert items[0]["report_id"] == items[2]["report_id"] != items[1]["report_id"]
+    
+    async def test_batch_pipeline_too_many_items(
+        self,
+        authenticated_client: AsyncClient,
+        settings,
+        monkeypatch,
+    ):
+        """Test batches over BATCH_PIPELINE_MAX_ITEMS are rejected."""
+        monkeypatch.setattr(settings, "BATCH_PIPELINE_MAX_ITEMS", 2)
+        response = await authenticated_client.post(
+            "/api/v1/batch-pipeline",
+            json={"items": [PIPELINE_BODY] * 3},
+        )
+        assert response.status_code == 422
+    
+    async def test_batch_pipeline_unknown(self, authenticated_client: AsyncClient):
+        """Test unknown batch IDs return 404."""
+        response = await authenticated_client.get("/api/v1/batch-pipeline/missing")
+        assert response.status_code == 404
+    
+    async def test_pipeline_stream_validation_error(self, authenticated_client: AsyncClient):
+        """Test streaming pipeline with invalid input."""
+        response = await authenticated_client.post(
+            "/api/v1/run-pipeline/stream",
+            json={
+                "company_name": "Apple",
+                "partner_company": "Microsoft",
+                "domain": "InvalidDomain",
+            },
+        )
+        assert response.status_code == 422
+
+
+@pytest.fixture
+async def job_queue(monkeypatch):
+    """Fresh job queue behind the /jobs and /run-pipeline routes, running a StubOrchestrator."""
+    queue = JobQueue(orchestrator=StubOrchestrator(), workers=1, max_depth=1)
+    monkeypatch.setattr(jobs_routes, "get_job_queue", lambda: queue)
+    monkeypatch.setattr(pipeline_routes, "get_job_queue", lambda: queue)
+    yield queue
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+class TestJobEndpoints:
+    """Tests for pipeline job endpoints."""
+    
+    async def test_submit_and_long_poll(self, authenticated_client: AsyncClient, job_queue):
+        """Test a submitted job returns 202 and long-polling returns its result."""
+        response = await authenticated_client.post("/api/v1/jobs", json=PIPELINE_BODY)
+        assert response.status_code == 202
+        job = response.json()
+        assert job["status"] == "queued"
+        assert response.headers["location"] == f"/api/v1/jobs/{job['job_id']}"
+        
+        response = await authenticated_client.get(f"/api/v1/jobs/{job['job_id']}?wait=5")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "completed"
+        assert data["result"]["report_id"] == "r-1"
+    
+    async def test_full_queue_returns_503(self, authenticated_client: AsyncClient, job_queue):
+        """Test submissions beyond the queue bound are rejected."""
+        job_queue.orchestrator.outcome = "block"
+        await authenticated_client.post("/api/v1/jobs", json=PIPELINE_BODY)
+        await asyncio.sleep(0.01)
+        await authenticated_client.post("/api/v1/jobs", json=PIPELINE_BODY)
+        
+        response = await authenticated_client.post("/api/v1/jobs", json=PIPELINE_BODY)
+        assert response.status_code == 503
+        assert response.json()["details"]["max_depth"] == 1
+        
+        response = await authenticated_client.get("/api/v1/jobs/queue")
+        assert response.json()["queue_depth"] == 1
+        assert response.json()["running"] == 1
+    
+    async def test_cancel_job(self, authenticated_client: AsyncClient, job_queue):
+        """Test cancelling a running job stops its pipeline."""
+        job_queue.orchestrator.outcome = "block"
+        job = (await authenticated_client.post("/api/v1/jobs", json=PIPELINE_BODY)).json()
+        await asyncio.sleep(0.01)
+        
+        response = await authenticated_client.delete(f"/api/v1/jobs/{job['job_id']}")
+        assert response.status_code == 200
+        assert response.json()["status"] == "cancelled"
+        assert job_queue.orchestrator.cancelled
+    
+    async def test_unknown_job(self, authenticated_client: AsyncClient, job_queue):
+        """Test unknown job IDs return 404."""
+        response = await authenticated_client.get("/api/v1/jobs/missing")
+        assert response.status_code == 404
+        response = await authenticated_client.delete("/api/v1/jobs/missing")
+        assert response.status_code == 404
+    
+    async def test_submit_validation_error(self, authenticated_client: AsyncClient, job_queue):
+        """Test invalid submissions are rejected before queueing."""
+        response = await authenticated_client.post(
+            "/api/v1/jobs",
+            json={**PIPELINE_BODY, "domain": "InvalidDomain"},
+        )
+        assert response.status_code == 422
+        assert job_queue.depth == 0
+    
+    async def test_run_pipeline_goes_through_queue(self, authenticated_client: AsyncClient, job_queue):
+        """Test the synchronous endpoint runs as a queued job and returns its result."""
+        response = await authenticated_client.post("/api/v1/run-pipeline", json=PIPELINE_BODY)
+        assert response.status_code == 200
+        assert response.json()["report_id"] == "r-1"
+        assert job_queue.stats.jobs == {"completed": 1}
+    
+    async def test_run_pipeline_bounded_by_queue(self, authenticated_client: AsyncClient, job_queue):
+        """Test the synchronous endpoint is rejected once the queue is full."""
+        job_queue.orchestrator.outcome = "block"
+        await authenticated_client.post("/api/v1/jobs", json=PIPELINE_BODY)
+        await asyncio.sleep(0.01)
+        await authenticated_client.post("/api/v1/jobs", json=PIPELINE_BODY)
+        
+        response = await authenticated_client.post("/api/v1/run-pipeline", json=PIPELINE_BODY)
+        assert response.status_code == 503
+    
+    async def test_run_pipeline_error_propagates(self, authenticated_client: AsyncClient, job_queue):
+        """Test an exception raised by the queued pipeline keeps its status code."""
+        async def timed_out(request, **kwargs):
+            raise TimeoutError(message="Pipeline timed out", operation="pipeline", timeout_seconds=1)
+        
+        job_queue.orchestrator.run_pipeline = timed_out
+        response = await authenticated_client.post("/api/v1/run-pipeline", json=PIPELINE_BODY)
+        assert response.status_code == 504
 
 
 @pytest.mark.asyncio
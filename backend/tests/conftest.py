@@ -20,6 +20,42 @@ os.environ["VALID_API_KEYS"] = "test-key-123"
 
 from app.main import app
 from app.config import get_settings
+from app.services.llm_stand_in import PROFILES, StandInServer
+from app.utils.exceptions import AgentExecutionError
+
+
+class FakeStageAgent:
+    """
+    Pipeline stage agent with no LLM behind it.
+    
+    Records the inputs of every run and how many were cancelled; each
+    run takes `delay` seconds and returns "<name> v<run number>". Set
+    `fail` to raise AgentExecutionError or `block` to never finish.
+    """
+    
+    def __init__(self, name: str, delay: float = 0.0):
+        self.name = name
+        self.delay = delay
+        self.calls = []
+        self.cancelled = 0
+        self.fail = False
+        self.block = False
+    
+    async def execute(self, **inputs) -> str:
+        self.calls.append(inputs)
+        if self.fail:
+            raise AgentExecutionError(f"{self.name} failed", agent_name=self.name)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.block:
+                await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return f"{self.name} v{len(self.calls)}"
+    
+    async def execute_stream(self, **inputs):
+        yield await self.execute(**inputs)
 
 
 @pytest.fixture(scope="session")
@@ -36,6 +72,12 @@ def settings():
     return get_settings()
 
 
+@pytest.fixture
+def fake_agent():
+    """Factory for fake pipeline stage agents (see FakeStageAgent)."""
+    return FakeStageAgent
+
+
 @pytest.fixture
 async def test_client() -> AsyncGenerator[AsyncClient, None]:
     """Create test client for API testing."""
@@ -54,6 +96,19 @@ async def authenticated_client() -> AsyncGenerator[AsyncClient, None]:
         yield client
 
 
+@pytest.fixture
+def llm_stand_in(request) -> Generator[StandInServer, None, None]:
+    """
+    Local OpenAI-compatible LLM server.
+    
+    Uses the "fast" profile; parametrize indirectly with a profile name
+    for realistic latency, e.g. @pytest.mark.parametrize("llm_stand_in", ["gpt-4o"], indirect=True).
+    """
+    profile = PROFILES[getattr(request, "param", "fast")]
+    with StandInServer(profile, seed=0) as server:
+        yield server
+
+
 @pytest.fixture
 def sample_pipeline_request():
     """Sample pipeline request data."""
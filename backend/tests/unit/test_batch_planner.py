@@ -0,0 +1,149 @@
+"""
+Unit tests for batch pipeline planning and shared research.
+"""
+import asyncio
+
+import pytest
+
+from app.agents.research_agent import ResearchAgent
+from app.models.requests import PipelineRequest
+from app.services.batch_planner import BatchPipelineService, plan_batch
+from app.services.pipeline_service import PipelineOrchestrator
+from app.services.report_service import ReportService
+from app.utils.exceptions import BatchNotFoundError, LLMAPIError
+
+# One company against three partners in two domains, plus a repeated item
+ITEMS = [
+    PipelineRequest(company_name="Apple", partner_company=partner, domain=domain)
+    for domain in ("AI", "XR")
+    for partner in ("Microsoft", "Google", "Sony")
+] + [PipelineRequest(company_name="Apple", partner_company="Microsoft", domain="AI")]
+
+
+class SectionLLM:
+    """Answers research section prompts, recording each one."""
+
+    def __init__(self, fail_domain: str = None):
+        self.fail_domain = fail_domain
+        self.prompts = []
+
+    async def generate_content(self, prompt: str, **kwargs) -> str:
+        self.prompts.append(prompt)
+        await asyncio.sleep(0.01)
+        if self.fail_domain and "# Industry Trends Request" in prompt and f"**Industry Domain**: {self.fail_domain}" in prompt:
+            raise LLMAPIError(message="boom", provider="OpenAI")
+        return prompt.split("\n")[0]
+
+
+@pytest.fixture
+def llm() -> SectionLLM:
+    return SectionLLM()
+
+
+@pytest.fixture
+def orchestrator(settings, fake_agent, llm, tmp_path) -> PipelineOrchestrator:
+    report_service = ReportService()
+    report_service.reports_dir = tmp_path
+    orchestrator = PipelineOrchestrator(settings=settings)
+    orchestrator.report_service = report_service
+    orchestrator.research_agent = ResearchAgent()
+    orchestrator.research_agent.llm_service = llm
+    orchestrator.product_agent = fake_agent("product")
+    orchestrator.marketing_agent = fake_agent("marketing")
+    return orchestrator
+
+
+@pytest.fixture
+async def service(orchestrator):
+    service = BatchPipelineService(orchestrator=orchestrator, concurrency=3)
+    yield service
+    await service.stop()
+
+
+async def wait_for_batch(service: BatchPipelineService, batch_id: str):
+    """Wait until a batch has finished."""
+    async def poll():
+        while (status := service.get(batch_id)).status != "completed":
+            await asyncio.sleep(0.01)
+        return status
+
+    return await asyncio.wait_for(poll(), timeout=5)
+
+
+@pytest.mark.asyncio
+class TestBatchPlanner:
+    """Tests for plan_batch and BatchPipelineService."""
+
+    async def test_plan_shares_profiles_and_trends(self):
+        """Test common sections and identical items are planned once."""
+        plan = plan_batch(ITEMS, ResearchAgent())
+        stats = plan.stats
+
+        assert stats.items == 7
+        assert stats.unique_pipelines == 6
+        # Apple per domain (2), partner per domain (6), trends (2), relationship and synthesis per pair (6 + 6)
+        assert stats.research_sections == 22
+        assert stats.research_sections_requested == 35
+        assert plan.item_pipelines[-1] == plan.item_pipelines[0]
+
+    async def test_plan_without_fan_out_shares_nothing(self):
+        """Test a single-call research plan only merges identical items."""
+        stats = plan_batch(ITEMS, ResearchAgent(), fan_out=False).stats
+
+        assert stats.unique_pipelines == 6
+        assert stats.research_sections == 0
+
+    async def test_batch_generates_each_section_once(self, service, orchestrator, llm):
+        """Test a batch makes one LLM call per distinct section and completes every item."""
+        started = await service.submit(ITEMS)
+        assert started.status == "running"
+        assert [item.status for item in started.items] == ["pending"] * 7
+
+        status = await wait_for_batch(service, started.batch_id)
+
+        assert len(llm.prompts) == 22
+        assert len(orchestrator.product_agent.calls) == 6
+        assert status.completed_items == 7
+        for item in status.items:
+            assert item.status == "completed"
+            assert item.completed_stages == ["research", "product", "marketing"]
+        assert status.items[6].duplicate_of == 0
+        assert status.items[6].report_id == status.items[0].report_id
+
+        report = await orchestrator.report_service.get_report(status.items[1].report_id)
+        assert "### Apple Profile" in report.content
+        assert "### Google Profile" in report.content
+        assert "### AI Industry Trends" in report.content
+
+    async def test_failed_section_fails_dependent_items(self, service, orchestrator, llm):
+        """Test a failed shared section fails only the items that use it."""
+        llm.fail_domain = "XR"
+        started = await service.submit(ITEMS)
+
+        status = await wait_for_batch(service, started.batch_id)
+
+        by_domain = {item.domain: set() for item in status.items}
+        for item in status.items:
+            by_domain[item.domain].add(item.status)
+        assert by_domain == {"AI": {"completed"}, "XR": {"failed"}}
+        assert "Research failed" in status.items[3].error
+        assert len(orchestrator.product_agent.calls) == 3
+
+    async def test_progress_reported_per_item(self, service, orchestrator):
+        """Test running items report the stages they have completed."""
+        orchestrator.marketing_agent.block = True
+        started = await service.submit(ITEMS[:1])
+
+        async def poll():
+            while service.get(started.batch_id).items[0].completed_stages != ["research", "product"]:
+                await asyncio.sleep(0.01)
+
+        await asyncio.wait_for(poll(), timeout=5)
+        status = service.get(started.batch_id)
+        assert status.status == "running"
+        assert status.items[0].status == "running"
+
+    async def test_unknown_batch(self, service):
+        """Test unknown batch IDs raise not found."""
+        with pytest.raises(BatchNotFoundError):
+            service.get("missing")
@@ -0,0 +1,135 @@
+"""
+Unit tests for stage checkpointing and pipeline resume.
+"""
+import asyncio
+import json
+import uuid
+
+import pytest
+
+from app.models.requests import PipelineRequest
+from app.services.pipeline_service import PipelineOrchestrator
+from app.services.report_service import ReportService
+from app.utils.exceptions import ReportNotFoundError
+
+REQUEST = PipelineRequest(company_name="Apple", partner_company="Microsoft", domain="AI")
+
+
+async def wait_for_calls(agent, count: int) -> None:
+    """Wait until an agent has started `count` runs."""
+    async def poll():
+        while len(agent.calls) < count:
+            await asyncio.sleep(0.01)
+    
+    await asyncio.wait_for(poll(), timeout=5)
+
+
+@pytest.fixture
+def report_service(tmp_path) -> ReportService:
+    service = ReportService()
+    service.reports_dir = tmp_path
+    return service
+
+
+@pytest.fixture
+def orchestrator(settings, report_service, fake_agent) -> PipelineOrchestrator:
+    orchestrator = PipelineOrchestrator(settings=settings)
+    orchestrator.research_agent = fake_agent("research")
+    orchestrator.product_agent = fake_agent("product")
+    orchestrator.marketing_agent = fake_agent("marketing")
+    orchestrator.report_service = report_service
+    return orchestrator
+
+
+@pytest.mark.asyncio
+class TestCheckpointResume:
+    """Tests for PipelineOrchestrator.resume_pipeline and ReportService checkpoints."""
+    
+    async def test_resume_reruns_only_failed_stage(self, orchestrator, report_service):
+        """Test a late-stage failure costs one agent run on resume."""
+        orchestrator.marketing_agent.fail = True
+        failed = await orchestrator.run_pipeline(REQUEST)
+        assert failed.status == "partial"
+        assert failed.sections.marketing.status == "failed"
+        
+        orchestrator.marketing_agent.fail = False
+        resumed = await orchestrator.resume_pipeline(failed.report_id)
+        
+        assert resumed.report_id == failed.report_id
+        assert resumed.status == "completed"
+        assert resumed.sections.research.content == "research v1"
+        assert len(orchestrator.research_agent.calls) == 1
+        assert len(orchestrator.product_agent.calls) == 1
+        assert len(orchestrator.marketing_agent.calls) == 2
+        
+        report = await report_service.get_report(failed.report_id)
+        assert report.status == "completed"
+        assert "marketing v2" in report.content
+    
+    async def test_interrupted_run_resumes_from_checkpoint(self, orchestrator, report_service):
+        """Test stages completed before a crash are reused when no report was saved."""
+        orchestrator.marketing_agent.block = True
+        started = []
+        
+        async def on_event(event, data):
+            if event == "pipeline_started":
+                started.append(data["report_id"])
+        
+        task = asyncio.create_task(orchestrator.run_pipeline(REQUEST, on_event=on_event))
+        await wait_for_calls(orchestrator.marketing_agent, 1)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        
+        report_id = started[0]
+        with pytest.raises(ReportNotFoundError):
+            await report_service.get_report(report_id)
+        _, sections = await report_service.load_checkpoint(report_id)
+        assert set(sections) == {"research", "product"}
+        
+        orchestrator.marketing_agent.block = False
+        resumed = await orchestrator.resume_pipeline(report_id)
+        
+        assert resumed.status == "completed"
+        assert len(orchestrator.product_agent.calls) == 1
+        assert not (report_service.reports_dir / f"{report_id}.checkpoint").exists()
+    
+    async def test_resume_completed_report_is_noop(self, orchestrator, report_service):
+        """Test resuming a finished report returns it unchanged instead of re-saving it."""
+        completed = await orchestrator.run_pipeline(REQUEST)
+        path = report_service.reports_dir / f"{completed.report_id}.json"
+        stored = json.loads(path.read_text())
+        stored["tokens_used"] = 123
+        path.write_text(json.dumps(stored))
+        
+        resumed = await orchestrator.resume_pipeline(completed.report_id)
+        
+        assert resumed.status == "completed"
+        assert resumed.content == completed.content
+        assert resumed.metadata.tokens_used == 123
+        assert resumed.metadata.created_at == completed.metadata.created_at
+        assert json.loads(path.read_text()) == stored
+        assert len(orchestrator.marketing_agent.calls) == 1
+    
+    async def test_checkpoints_not_listed(self, orchestrator, report_service):
+        """Test pending checkpoints do not show up as reports."""
+        orchestrator.marketing_agent.block = True
+        task = asyncio.create_task(orchestrator.run_pipeline(REQUEST))
+        await wait_for_calls(orchestrator.marketing_agent, 1)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        
+        reports, total = await report_service.list_reports()
+        assert total == 0
+        assert list(report_service.reports_dir.glob("*.checkpoint"))
+    
+    async def test_resume_unknown_report(self, orchestrator):
+        """Test resuming a report with nothing stored raises not found."""
+        with pytest.raises(ReportNotFoundError):
+            await orchestrator.resume_pipeline(str(uuid.uuid4()))
+    
+    async def test_no_checkpoint_without_save(self, orchestrator, report_service):
+        """Test runs that do not save a report leave no checkpoint behind."""
+        orchestrator.marketing_agent.fail = True
+        await orchestrator.run_pipeline(REQUEST, save_report=False)
+        
+        assert not list(report_service.reports_dir.iterdir())
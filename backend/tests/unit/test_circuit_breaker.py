@@ -0,0 +1,82 @@
+"""
+Unit tests for the circuit breaker state machine.
+"""
+import time
+
+from app.services.circuit_breaker import CircuitBreaker, CLOSED, HALF_OPEN, OPEN
+
+
+def make_breaker(**kwargs) -> CircuitBreaker:
+    defaults = dict(
+        name="test",
+        failure_threshold=3,
+        error_rate=0.5,
+        window_seconds=60,
+        recovery_timeout=0.05,
+        half_open_max_calls=1,
+    )
+    defaults.update(kwargs)
+    return CircuitBreaker(**defaults)
+
+
+class TestCircuitBreaker:
+    """Tests for CircuitBreaker."""
+    
+    def test_opens_on_error_rate(self):
+        """Test the breaker trips once threshold and error rate are reached."""
+        breaker = make_breaker()
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.state == CLOSED
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        assert not breaker.allow_request()
+    
+    def test_low_error_rate_stays_closed(self):
+        """Test failures mixed with enough successes do not trip."""
+        breaker = make_breaker()
+        for _ in range(10):
+            breaker.record_success()
+        for _ in range(3):
+            breaker.record_failure()
+        assert breaker.state == CLOSED
+    
+    def test_recovers_through_half_open_probe(self):
+        """Test a successful probe after the timeout closes the circuit."""
+        breaker = make_breaker()
+        for _ in range(3):
+            breaker.record_failure()
+        time.sleep(0.06)
+        
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow_request()
+        # Only one probe at a time
+        assert not breaker.allow_request()
+        breaker.record_success()
+        
+        assert breaker.state == CLOSED
+        assert breaker.stats["transitions"] == {
+            "closed->open": 1,
+            "open->half_open": 1,
+            "half_open->closed": 1,
+        }
+    
+    def test_failed_probe_reopens(self):
+        """Test a failed probe sends the circuit back to open."""
+        breaker = make_breaker()
+        for _ in range(3):
+            breaker.record_failure()
+        time.sleep(0.06)
+        assert breaker.allow_request()
+        breaker.record_failure()
+        assert breaker.state == OPEN
+    
+    def test_release_returns_probe_permit(self):
+        """Test a probe without a verdict frees its permit."""
+        breaker = make_breaker()
+        for _ in range(3):
+            breaker.record_failure()
+        time.sleep(0.06)
+        assert breaker.allow_request()
+        breaker.release()
+        assert breaker.allow_request()
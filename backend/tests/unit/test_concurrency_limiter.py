@@ -0,0 +1,86 @@
+"""
+Unit tests for the adaptive concurrency limiter.
+"""
+import asyncio
+
+import pytest
+
+from app.services.concurrency_limiter import AdaptiveConcurrencyLimiter
+from app.utils.exceptions import LLMAPIError
+
+
+@pytest.mark.asyncio
+class TestAdaptiveConcurrencyLimiter:
+    """Tests for AdaptiveConcurrencyLimiter."""
+    
+    async def test_bounds_in_flight_calls(self):
+        """Test no more than `limit` calls run at once."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=2)
+        running = 0
+        peak = 0
+        
+        async def call():
+            nonlocal running, peak
+            async with limiter.slot():
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+        
+        await asyncio.gather(*(call() for _ in range(6)))
+        assert peak == 2
+        assert limiter.in_flight == 0
+        assert limiter.queue_depth == 0
+    
+    async def test_additive_increase_on_success(self):
+        """Test healthy calls grow the limit."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=10)
+        for _ in range(10):
+            async with limiter.slot():
+                pass
+        assert limiter.limit > 2
+    
+    async def test_multiplicative_decrease_on_overload(self):
+        """Test an overload error halves the limit."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+        with pytest.raises(asyncio.TimeoutError):
+            async with limiter.slot():
+                raise asyncio.TimeoutError()
+        assert limiter.limit == 4
+    
+    async def test_non_overload_error_keeps_limit(self):
+        """Test ordinary errors leave the limit unchanged."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+        with pytest.raises(ValueError):
+            async with limiter.slot():
+                raise ValueError()
+        assert limiter.limit == 8
+    
+    async def test_bounded_queue_wait(self):
+        """Test waiters give up after max_wait_seconds."""
+        limiter = AdaptiveConcurrencyLimiter(
+            initial_limit=1, max_limit=1, max_wait_seconds=0.01
+        )
+        await limiter.acquire()
+        with pytest.raises(LLMAPIError):
+            await limiter.acquire()
+        assert limiter.queue_depth == 0
+        limiter.release(0.0)
+        assert limiter.in_flight == 0
+    
+    async def test_latency_compared_per_completion_token(self):
+        """Test long generations are not mistaken for congestion, slow tokens are."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8, max_limit=8, decrease_cooldown_seconds=0)
+        for _ in range(5):
+            await limiter.acquire()
+            limiter.release(0.1, completion_tokens=10)
+        
+        await limiter.acquire()
+        limiter.release(2.0, completion_tokens=1000)
+        await limiter.acquire()
+        limiter.release(5.0)
+        assert limiter.limit == 8
+        
+        await limiter.acquire()
+        limiter.release(0.5, completion_tokens=10)
+        assert limiter.limit == 4
@@ -0,0 +1,111 @@
+"""
+Unit tests for request deadline propagation.
+"""
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.models.requests import PipelineRequest
+from app.services.deadline import (
+    capped_timeout,
+    check_deadline,
+    current_deadline,
+    deadline_scope,
+    time_left,
+)
+from app.services.llm_service import LLMService
+from app.services.pipeline_service import PipelineOrchestrator
+from app.utils.exceptions import DeadlineExceededError
+
+
+def test_no_deadline_by_default():
+    """Test helpers are pass-through outside a deadline scope."""
+    assert current_deadline() is None
+    assert time_left() is None
+    assert capped_timeout(60) == 60
+    check_deadline("anything")
+
+
+def test_nested_scope_only_tightens():
+    """Test an inner scope cannot outlive its parent."""
+    with deadline_scope(5, "pipeline") as outer:
+        with deadline_scope(60, "stage") as inner:
+            assert inner.expires_at == outer.expires_at
+            assert capped_timeout(60) <= 5
+        with deadline_scope(1, "stage"):
+            assert time_left() <= 1
+        assert current_deadline() is outer
+    assert current_deadline() is None
+
+
+def test_expired_deadline_fails_fast():
+    """Test check_deadline raises once the budget is spent."""
+    with deadline_scope(0):
+        with pytest.raises(DeadlineExceededError) as exc_info:
+            check_deadline("llm_call")
+    assert exc_info.value.details["state"] == "deadline_exceeded"
+    assert exc_info.value.status_code == 504
+
+
+@pytest.mark.asyncio
+class TestDeadlinePropagation:
+    """Tests for deadlines reaching LLM calls and pipeline stages."""
+    
+    async def test_llm_call_skipped_after_deadline(self):
+        """Test no API call is made once the deadline has passed."""
+        service = LLMService()
+        service.cache = None
+        service.client = SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(create=AsyncMock()))
+        )
+        
+        with deadline_scope(0):
+            with pytest.raises(DeadlineExceededError):
+                await service.generate_content(prompt="hello")
+        
+        service.client.chat.completions.create.assert_not_awaited()
+        assert service.pool.primary.breaker.state == "closed"
+    
+    async def test_slow_provider_hits_deadline_not_call_timeout(self):
+        """Test the per-call timeout is capped by the remaining budget."""
+        service = LLMService()
+        service.cache = None
+        
+        async def slow_create(**kwargs):
+            await asyncio.sleep(5)
+        
+        service.client = SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(create=slow_create))
+        )
+        
+        with deadline_scope(0.05):
+            with pytest.raises(DeadlineExceededError):
+                await service.generate_content(prompt="hello")
+        assert service.retry_policy.stats["retries"] == 0
+    
+    async def test_pipeline_skips_stages_past_deadline(self):
+        """Test later stages are skipped when the pipeline budget runs low."""
+        orchestrator = PipelineOrchestrator()
+        orchestrator.settings = orchestrator.settings.model_copy(
+            update={"TIMEOUT_PIPELINE": 1, "TIMEOUT_STAGE_MIN_REMAINING": 0.5}
+        )
+        
+        async def slow_research(**kwargs):
+            await asyncio.sleep(0.6)
+            return "research"
+        
+        orchestrator.research_agent.execute = slow_research
+        orchestrator.product_agent.execute = AsyncMock(return_value="product")
+        
+        response = await orchestrator.run_pipeline(
+            PipelineRequest(company_name="Apple", partner_company="Microsoft", domain="AI"),
+            save_report=False,
+        )
+        
+        assert response.status == "partial"
+        assert response.sections.research.status == "completed"
+        assert response.sections.product.status == "skipped"
+        assert "deadline" in response.sections.product.error
+        orchestrator.product_agent.execute.assert_not_awaited()
@@ -0,0 +1,82 @@
+"""
+Unit tests for passive health signals.
+"""
+import asyncio
+
+import pytest
+
+from app.services.health_monitor import HealthSignal
+
+
+def make_signal(results=None, **kwargs) -> HealthSignal:
+    """Build a signal whose probe returns the given results and counts calls."""
+    results = list(results or [True])
+    calls = []
+    
+    async def probe() -> bool:
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return results[min(len(calls), len(results)) - 1]
+    
+    defaults = dict(name="test", probe=probe, window_seconds=60, staleness_seconds=60)
+    defaults.update(kwargs)
+    signal = HealthSignal(**defaults)
+    signal.probe_calls = calls
+    return signal
+
+
+@pytest.mark.asyncio
+class TestHealthSignal:
+    """Tests for HealthSignal."""
+    
+    async def test_live_traffic_decides_without_probing(self):
+        """Test recent outcomes answer the check and the probe is never run."""
+        signal = make_signal(results=[False])
+        signal.record(True)
+        signal.record(False)
+        signal.record(True)
+        
+        assert await signal.check() is True
+        signal.record(False)
+        assert await signal.check() is False
+        assert signal.probe_calls == []
+    
+    async def test_idle_probe_is_cached_and_shared(self):
+        """Test concurrent idle checks share one probe and reuse its result."""
+        signal = make_signal(results=[True])
+        
+        results = await asyncio.gather(*(signal.check() for _ in range(5)))
+        assert results == [True] * 5
+        assert await signal.check() is True
+        assert len(signal.probe_calls) == 1
+    
+    async def test_stale_probe_is_rerun(self):
+        """Test the probe runs again once its result is older than the staleness window."""
+        signal = make_signal(results=[True, False], staleness_seconds=0.02)
+        assert await signal.check() is True
+        await asyncio.sleep(0.03)
+        
+        assert await signal.check() is False
+        assert len(signal.probe_calls) == 2
+    
+    async def test_probe_errors_and_timeouts_are_unhealthy(self):
+        """Test a raising or hanging probe reports unhealthy."""
+        async def broken() -> bool:
+            raise OSError("unreachable")
+        
+        async def hanging() -> bool:
+            await asyncio.sleep(1)
+            return True
+        
+        assert await HealthSignal("broken", broken).check() is False
+        assert await HealthSignal("hanging", hanging, probe_timeout=0.01).check() is False
+    
+    async def test_window_expiry_falls_back_to_probe(self):
+        """Test outcomes older than the window no longer count."""
+        signal = make_signal(results=[True], window_seconds=0.02)
+        signal.record(False)
+        assert await signal.check() is False
+        await asyncio.sleep(0.03)
+        
+        assert await signal.check() is True
+        assert signal.stats["window_outcomes"] == 0
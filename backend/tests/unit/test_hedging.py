@@ -0,0 +1,135 @@
+"""
+Unit tests for hedged requests.
+"""
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.services.hedging import HedgingPolicy, LatencyHistogram
+from app.services.llm_service import LLMService
+from app.services.usage_tracker import track_usage
+
+
+def test_histogram_percentile():
+    """Test percentile lookup over the rolling window."""
+    histogram = LatencyHistogram(window=100)
+    assert histogram.percentile(95) is None
+    for i in range(1, 101):
+        histogram.record(i / 100)
+    assert histogram.percentile(50) == 0.5
+    assert histogram.percentile(95) == 0.95
+
+
+def warmed_policy(**kwargs) -> HedgingPolicy:
+    """Build a policy whose histogram says calls normally take ~10 ms."""
+    policy = HedgingPolicy(min_samples=5, **kwargs)
+    for _ in range(5):
+        policy.record("default", 0.01)
+    return policy
+
+
+@pytest.mark.asyncio
+class TestHedgingPolicy:
+    """Tests for HedgingPolicy.run."""
+    
+    async def test_no_hedge_without_samples(self):
+        """Test calls are not hedged until the histogram has data."""
+        policy = HedgingPolicy(min_samples=5)
+        calls = 0
+        
+        async def call():
+            nonlocal calls
+            calls += 1
+            return "ok"
+        
+        assert await policy.run(call) == "ok"
+        assert calls == 1
+    
+    async def test_slow_primary_is_hedged_and_cancelled(self):
+        """Test a slow primary triggers a hedge that wins."""
+        policy = warmed_policy(budget_percent=100)
+        attempts = []
+        
+        async def call():
+            attempt = len(attempts)
+            attempts.append("started")
+            try:
+                await asyncio.sleep(1.0 if attempt == 0 else 0.0)
+            except asyncio.CancelledError:
+                attempts[attempt] = "cancelled"
+                raise
+            return attempt
+        
+        assert await policy.run(call, cost=10) == 1
+        await asyncio.sleep(0)
+        assert attempts == ["cancelled", "started"]
+        assert policy.stats["hedge_wins"] == 1
+    
+    async def test_budget_caps_hedges(self):
+        """Test hedges are denied once the budget is spent."""
+        policy = warmed_policy(budget_percent=0)
+        
+        async def call():
+            await asyncio.sleep(0.03)
+            return "ok"
+        
+        assert await policy.run(call, cost=10) == "ok"
+        assert policy.stats["hedged"] == 0
+        assert policy.stats["budget_denied"] == 1
+    
+    async def test_failed_primary_falls_back_to_hedge(self):
+        """Test an error from one attempt waits for the other."""
+        policy = warmed_policy(budget_percent=100)
+        attempts = 0
+        
+        async def call():
+            nonlocal attempts
+            attempts += 1
+            if attempts == 1:
+                await asyncio.sleep(0.03)
+                raise RuntimeError("primary failed")
+            await asyncio.sleep(0.05)
+            return "hedge"
+        
+        assert await policy.run(call, cost=10) == "hedge"
+    
+    async def test_histograms_are_per_key(self):
+        """Test samples for one operation do not set the hedge delay of another."""
+        policy = warmed_policy(budget_percent=100)
+        calls = 0
+        
+        async def call():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.03)
+            return "ok"
+        
+        assert await policy.run(call, cost=10, key="critic:generate_content") == "ok"
+        assert calls == 1
+        assert policy.stats["hedge_delay_seconds"] == {"default": 0.01}
+    
+    async def test_service_records_provider_time_only(self):
+        """Test the service times the provider request, not the rate budget wait, per stage."""
+        service = LLMService()
+        service.cache = None
+        service.hedging = HedgingPolicy()
+        message = SimpleNamespace(content="ok")
+        service.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+            create=AsyncMock(return_value=SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None))
+        )))
+        scheduler = service.pool.primary.scheduler
+        reserve = scheduler.reserve
+        
+        async def slow_reserve(tokens):
+            await asyncio.sleep(0.1)
+            return await reserve(tokens)
+        
+        scheduler.reserve = slow_reserve
+        with track_usage("product"):
+            assert await service.generate_content(prompt="hi") == "ok"
+        
+        histogram = service.hedging.histograms["product:generate_content"]
+        assert len(histogram) == 1
+        assert histogram.percentile(100) < 0.05
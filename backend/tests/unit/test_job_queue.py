@@ -0,0 +1,127 @@
+"""
+Unit tests for the pipeline job queue.
+"""
+import asyncio
+
+import pytest
+
+from app.models.requests import PipelineRequest
+from app.services.job_queue import JobQueue
+from app.services.pipeline_service import PipelineOrchestrator
+from app.services.report_service import ReportService
+from app.utils.exceptions import JobNotFoundError, QueueFullError
+
+REQUEST = PipelineRequest(company_name="Apple", partner_company="Microsoft", domain="AI")
+
+
+@pytest.fixture
+def orchestrator(settings, fake_agent, tmp_path) -> PipelineOrchestrator:
+    report_service = ReportService()
+    report_service.reports_dir = tmp_path
+    orchestrator = PipelineOrchestrator(settings=settings)
+    orchestrator.report_service = report_service
+    orchestrator.research_agent = fake_agent("research", delay=0.05)
+    orchestrator.product_agent = fake_agent("product")
+    orchestrator.marketing_agent = fake_agent("marketing")
+    return orchestrator
+
+
+@pytest.fixture
+async def job_queue(orchestrator):
+    queue = JobQueue(orchestrator=orchestrator, workers=2, max_depth=2)
+    yield queue
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+class TestJobQueue:
+    """Tests for JobQueue."""
+
+    async def test_job_runs_to_completion(self, job_queue, orchestrator):
+        """Test a submitted job is queued, then completes with the pipeline result."""
+        job = await job_queue.submit(REQUEST)
+        assert job.status == "queued"
+        assert job.queue_position == 0
+
+        finished = await job_queue.wait(job.job_id, timeout=5)
+
+        assert finished.status == "completed"
+        assert finished.result.status == "completed"
+        assert finished.result.sections.marketing.content == "marketing v1"
+        assert job_queue.stats.jobs == {"completed": 1}
+
+    async def test_workers_bound_concurrency(self, job_queue, orchestrator):
+        """Test no more than `workers` jobs run at once and the rest wait in order."""
+        orchestrator.research_agent.block = True
+        jobs = [await job_queue.submit(REQUEST) for _ in range(2)]
+        await asyncio.sleep(0.02)
+        third = await job_queue.submit(REQUEST)
+
+        assert [(await job_queue.get(job.job_id)).status for job in jobs] == ["running", "running"]
+        assert (await job_queue.get(third.job_id)).queue_position == 0
+        assert job_queue.stats.running == 2
+        assert job_queue.stats.queue_depth == 1
+
+    async def test_full_queue_rejects_submissions(self, job_queue, orchestrator):
+        """Test submissions beyond max_depth queued jobs are rejected."""
+        orchestrator.research_agent.block = True
+        for _ in range(4):
+            await job_queue.submit(REQUEST)
+            await asyncio.sleep(0.01)
+
+        with pytest.raises(QueueFullError) as exc_info:
+            await job_queue.submit(REQUEST)
+        assert exc_info.value.status_code == 503
+        assert exc_info.value.details["queue_depth"] == 2
+
+    async def test_cancel_queued_job(self, job_queue, orchestrator):
+        """Test a queued job is cancelled without ever running."""
+        orchestrator.research_agent.block = True
+        for _ in range(2):
+            await job_queue.submit(REQUEST)
+        await asyncio.sleep(0.01)
+        queued = await job_queue.submit(REQUEST)
+
+        cancelled = await job_queue.cancel(queued.job_id)
+
+        assert cancelled.status == "cancelled"
+        assert job_queue.depth == 0
+        await asyncio.sleep(0.02)
+        assert len(orchestrator.research_agent.calls) == 2
+
+    async def test_cancel_running_job(self, job_queue, orchestrator):
+        """Test cancelling a running job cancels its pipeline and frees the worker."""
+        orchestrator.research_agent.block = True
+        job = await job_queue.submit(REQUEST)
+        await asyncio.sleep(0.02)
+
+        cancelled = await job_queue.cancel(job.job_id)
+
+        assert cancelled.status == "cancelled"
+        assert orchestrator.research_agent.cancelled == 1
+        assert job_queue.stats.running == 0
+
+    async def test_long_poll_times_out(self, job_queue, orchestrator):
+        """Test waiting on an unfinished job returns its current state after the timeout."""
+        orchestrator.research_agent.block = True
+        job = await job_queue.submit(REQUEST)
+
+        polled = await job_queue.wait(job.job_id, timeout=0.05)
+
+        assert polled.status == "running"
+
+    async def test_unknown_job(self, job_queue):
+        """Test unknown job IDs raise not found."""
+        with pytest.raises(JobNotFoundError):
+            await job_queue.get("missing")
+        with pytest.raises(JobNotFoundError):
+            await job_queue.cancel("missing")
+
+    async def test_finished_jobs_expire(self, job_queue, orchestrator):
+        """Test finished jobs are forgotten after the retention period."""
+        job_queue.retention_seconds = 0
+        job = await job_queue.submit(REQUEST)
+        await job_queue.wait(job.job_id, timeout=5)
+
+        with pytest.raises(JobNotFoundError):
+            await job_queue.get(job.job_id)
@@ -0,0 +1,205 @@
+"""
+Unit tests for the durable job store and job recovery.
+"""
+import asyncio
+import time
+from datetime import timedelta
+
+import pytest
+
+from app.models.requests import PipelineRequest
+from app.services.job_queue import JobQueue
+from app.services.job_store import JobStore
+from app.services.pipeline_service import PipelineOrchestrator
+from app.services.report_service import ReportService
+
+REQUEST = PipelineRequest(company_name="Apple", partner_company="Microsoft", domain="AI")
+
+
+@pytest.fixture
+def orchestrator(settings, fake_agent, tmp_path) -> PipelineOrchestrator:
+    report_service = ReportService()
+    report_service.reports_dir = tmp_path / "reports"
+    report_service.reports_dir.mkdir()
+    orchestrator = PipelineOrchestrator(settings=settings)
+    orchestrator.report_service = report_service
+    orchestrator.research_agent = fake_agent("research")
+    orchestrator.product_agent = fake_agent("product")
+    orchestrator.marketing_agent = fake_agent("marketing")
+    return orchestrator
+
+
+@pytest.fixture
+async def queues(orchestrator, tmp_path):
+    """Factory for job queues sharing one store, as instances of one deployment would."""
+    created = []
+
+    def make(lease_seconds: float = 60.0) -> JobQueue:
+        queue = JobQueue(
+            orchestrator=orchestrator,
+            workers=1,
+            store=JobStore(str(tmp_path / "jobs")),
+            lease_seconds=lease_seconds,
+        )
+        created.append(queue)
+        return queue
+
+    yield make
+    for queue in created:
+        await queue.stop()
+
+
+async def crash(queue: JobQueue) -> None:
+    """Stop a queue's workers without releasing its leases."""
+    for worker in queue._workers:
+        worker.cancel()
+    await asyncio.gather(*queue._workers, return_exceptions=True)
+    queue._workers = []
+
+
+async def wait_for_calls(agent, count: int) -> None:
+    """Wait until an agent has started `count` runs."""
+    async def poll():
+        while len(agent.calls) < count:
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(poll(), timeout=5)
+
+
+@pytest.mark.asyncio
+class TestJobStore:
+    """Tests for JobStore-backed job queues."""
+
+    async def test_finished_job_readable_from_other_instance(self, queues):
+        """Test results are stored and can be read by an instance that did not run the job."""
+        first, second = queues(), queues()
+        job = await first.submit(REQUEST)
+        await first.wait(job.job_id, timeout=5)
+
+        stored = await second.get(job.job_id)
+
+        assert stored.status == "completed"
+        assert stored.completed_stages == ["research", "product", "marketing"]
+        assert stored.result.sections.marketing.content == "marketing v1"
+
+    async def test_crashed_job_resumes_from_checkpoint(self, queues, orchestrator):
+        """Test a job interrupted mid-pipeline is reclaimed after its lease expires and resumed."""
+        first = queues(lease_seconds=0.2)
+        orchestrator.marketing_agent.block = True
+        job = await first.submit(REQUEST)
+        await wait_for_calls(orchestrator.marketing_agent, 1)
+        await crash(first)
+
+        second = queues()
+        assert await second.recover() == 0
+        await asyncio.sleep(0.25)
+        orchestrator.marketing_agent.block = False
+        assert await second.recover() == 1
+        second.start()
+        resumed = await second.wait(job.job_id, timeout=5)
+
+        assert resumed.status == "completed"
+        assert resumed.attempts == 1
+        assert resumed.report_id == job.report_id
+        assert resumed.result.report_id == job.report_id
+        assert len(orchestrator.research_agent.calls) == 1
+        assert len(orchestrator.product_agent.calls) == 1
+        assert len(orchestrator.marketing_agent.calls) == 2
+
+    async def test_stop_releases_leases(self, queues, orchestrator):
+        """Test jobs left by a graceful shutdown are reclaimed at once and restarted."""
+        first = queues()
+        orchestrator.research_agent.block = True
+        running = await first.submit(REQUEST)
+        await wait_for_calls(orchestrator.research_agent, 1)
+        queued = await first.submit(REQUEST)
+        await first.stop()
+
+        second = queues()
+        assert await second.recover() == 2
+        running_job = await second.get(running.job_id)
+        assert running_job.status == "queued"
+        assert running_job.attempts == 1
+        assert (await second.get(queued.job_id)).attempts == 0
+
+        orchestrator.research_agent.block = False
+        second.start()
+        assert (await second.wait(running.job_id, timeout=5)).status == "completed"
+        assert (await second.wait(queued.job_id, timeout=5)).status == "completed"
+
+    async def test_live_leases_not_reclaimed(self, queues, orchestrator):
+        """Test heartbeating jobs stay with their instance."""
+        first = queues(lease_seconds=0.2)
+        orchestrator.research_agent.block = True
+        await first.submit(REQUEST)
+        await asyncio.sleep(0.15)
+        await first.store.heartbeat(first.owner, 0.2)
+        await asyncio.sleep(0.1)
+
+        assert await queues().recover() == 0
+
+    async def test_own_expired_leases_not_reclaimed(self, queues, orchestrator):
+        """Test an instance that missed a heartbeat does not requeue the job it is running."""
+        queue = queues(lease_seconds=0.05)
+        orchestrator.research_agent.block = True
+        job = await queue.submit(REQUEST)
+        await wait_for_calls(orchestrator.research_agent, 1)
+        await asyncio.sleep(0.1)
+
+        assert await queue.recover() == 0
+        row = await queue.store.load(job.job_id)
+        assert (row["status"], row["attempts"], row["owner"]) == ("running", 0, queue.owner)
+        assert queue.stats.running == 1
+
+    async def test_lost_lease_cancels_local_run(self, queues, orchestrator):
+        """Test a job taken over by another instance stops here without overwriting its row."""
+        first = queues(lease_seconds=0.05)
+        orchestrator.research_agent.delay = 0.3
+        job = await first.submit(REQUEST)
+        await wait_for_calls(orchestrator.research_agent, 1)
+        await asyncio.sleep(0.1)
+        second = queues()
+        assert await second.recover() == 1
+
+        await asyncio.sleep(0.3)
+
+        row = await first.store.load(job.job_id)
+        assert (row["status"], row["attempts"], row["owner"]) == ("queued", 1, second.owner)
+        assert row["completed_stages"] == []
+        assert orchestrator.marketing_agent.calls == []
+        assert first.stats.running == 0
+        assert (await first.get(job.job_id)).status == "queued"
+
+    async def test_reclaim_is_exclusive(self, tmp_path):
+        """Test an expired job is reclaimed by one instance only."""
+        store = JobStore(str(tmp_path))
+        await store.add(
+            {
+                "job_id": "job-1",
+                "request": REQUEST.model_dump(),
+                "report_id": "report-1",
+                "status": "running",
+                "created_at": "2026-01-01T00:00:00",
+            },
+            owner="crashed",
+            lease_seconds=0,
+        )
+        time.sleep(0.01)
+
+        first = await store.reclaim("a", 60)
+        second = await store.reclaim("b", 60)
+
+        assert [row["job_id"] for row in first] == ["job-1"]
+        assert first[0]["owner"] == "a"
+        assert first[0]["attempts"] == 1
+        assert second == []
+
+    async def test_purge_removes_old_finished_jobs(self, queues):
+        """Test finished jobs are deleted from the store after retention."""
+        queue = queues()
+        job = await queue.submit(REQUEST)
+        finished = await queue.wait(job.job_id, timeout=5)
+
+        assert await queue.store.purge("2000-01-01T00:00:00") == 0
+        assert await queue.store.purge((finished.finished_at + timedelta(seconds=1)).isoformat()) == 1
+        assert await queue.store.load(job.job_id) is None
@@ -0,0 +1,146 @@
+"""
+Unit tests for offline batch execution.
+"""
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from openai.types.chat import ChatCompletion
+
+from app.models.requests import PipelineRequest
+from app.services.batch_pipeline import BatchPipelineRunner
+from app.services.llm_batch import LLMBatchCollector, LocalBatchBackend
+from app.services.llm_service import LLMService
+from app.utils.exceptions import LLMAPIError
+
+
+def completion(content: str) -> ChatCompletion:
+    """Chat completion as returned by the provider."""
+    return ChatCompletion.model_validate({
+        "id": "chatcmpl-test",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "stand-in",
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+        "usage": {"prompt_tokens": 4, "completion_tokens": 3, "total_tokens": 7},
+    })
+
+
+def stand_in_service(create: AsyncMock) -> LLMService:
+    """LLM service whose primary backend answers with `create`."""
+    service = LLMService()
+    service.cache = None
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    return service
+
+
+@pytest.mark.asyncio
+class TestLLMBatchCollector:
+    """Tests for LLMBatchCollector with the local batch backend."""
+    
+    async def test_waiting_callers_form_one_batch(self, tmp_path):
+        """Test requests are flushed together once every participant waits."""
+        create = AsyncMock(side_effect=lambda **body: completion(body["messages"][0]["content"]))
+        service = stand_in_service(create)
+        backend = LocalBatchBackend(str(tmp_path / "backend"), service)
+        collector = LLMBatchCollector(backend, str(tmp_path), poll_interval=0.01)
+        collector.add_participants(3)
+        
+        def body(text):
+            return {"model": "m", "messages": [{"role": "user", "content": text}]}
+        
+        results = await asyncio.gather(
+            collector.submit("a", body("first")),
+            collector.submit("b", body("second")),
+            collector.submit("a", body("first")),
+        )
+        
+        assert [r["choices"][0]["message"]["content"] for r in results] == ["first", "second", "first"]
+        assert collector.stats == {"batches": 1, "requests": 2, "deduplicated": 1}
+        assert create.await_count == 2
+        # Lines are leased from the backend pool and the input file is cleaned up
+        assert service.pool.primary.calls == 2
+        assert not list(tmp_path.glob("batch_input_*.jsonl"))
+    
+    async def test_failed_lines_raise(self, tmp_path):
+        """Test a failed batch line surfaces as LLMAPIError."""
+        create = AsyncMock(side_effect=RuntimeError("boom"))
+        backend = LocalBatchBackend(str(tmp_path / "backend"), stand_in_service(create))
+        collector = LLMBatchCollector(backend, str(tmp_path), poll_interval=0.01)
+        collector.add_participants(1)
+        
+        with pytest.raises(LLMAPIError) as exc_info:
+            await collector.submit("a", {"model": "m", "messages": []})
+        assert "boom" in exc_info.value.message
+
+
+@pytest.mark.asyncio
+class TestBatchPipelineRunner:
+    """Tests for running pipelines in batch mode."""
+    
+    async def test_pipelines_run_stage_by_stage(self, tmp_path):
+        """Test each pipeline stage becomes one batch for the whole sweep."""
+        create = AsyncMock(return_value=completion("generated section"))
+        service = stand_in_service(create)
+        backend = LocalBatchBackend(str(tmp_path / "backend"), service)
+        runner = BatchPipelineRunner(backend=backend)
+        runner.settings = runner.settings.model_copy(update={
+            "LLM_BATCH_POLL_INTERVAL": 0.01,
+            "LLM_BATCH_DIRECTORY": str(tmp_path),
+        })
+        for agent in (
+            runner.orchestrator.research_agent,
+            runner.orchestrator.product_agent,
+            runner.orchestrator.marketing_agent,
+        ):
+            agent.llm_service = service
+        
+        responses = await runner.run(
+            [
+                PipelineRequest(company_name="Apple", partner_company="Microsoft", domain="AI"),
+                PipelineRequest(company_name="Tesla", partner_company="Nvidia", domain="Automotive"),
+            ],
+            save_report=False,
+        )
+        
+        assert [r.status for r in responses] == ["completed", "completed"]
+        # Research fans out into five calls, all in the first batch
+        assert all(r.metadata.tokens_used == 49 for r in responses)
+        assert len(list((tmp_path / "backend").iterdir())) == 3
+        assert create.await_count == 14
+    
+    async def test_quality_gate_runs_in_batch_mode(self, tmp_path, settings, monkeypatch):
+        """Test critic calls get the batch timeout instead of timing out and approving unreviewed."""
+        monkeypatch.setattr(settings, "PIPELINE_QUALITY_GATE_ENABLED", True)
+        monkeypatch.setattr(settings, "TIMEOUT_CRITIC_AGENT", 0)
+        create = AsyncMock(return_value=completion("APPROVED. Overall Quality Score: 9/10"))
+        service = stand_in_service(create)
+        backend = LocalBatchBackend(str(tmp_path / "backend"), service)
+        runner = BatchPipelineRunner(backend=backend)
+        runner.settings = runner.settings.model_copy(update={
+            "LLM_BATCH_POLL_INTERVAL": 0.01,
+            "LLM_BATCH_DIRECTORY": str(tmp_path),
+        })
+        for agent in (
+            runner.orchestrator.research_agent,
+            runner.orchestrator.product_agent,
+            runner.orchestrator.marketing_agent,
+            runner.orchestrator.critic_agent,
+        ):
+            agent.llm_service = service
+        
+        responses = await runner.run(
+            [PipelineRequest(company_name="Apple", partner_company="Microsoft", domain="AI")],
+            save_report=False,
+        )
+        
+        sections = responses[0].sections
+        assert responses[0].status == "completed"
+        assert [s.quality_score for s in (sections.research, sections.product, sections.marketing)] == [9, 9, 9]
+        # Five research calls, then product, marketing and three critiques
+        assert create.await_count == 10
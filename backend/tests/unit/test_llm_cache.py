@@ -0,0 +1,114 @@
+"""
+Unit tests for the LLM response cache.
+"""
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.services.llm_cache import LLMResponseCache
+from app.services.llm_service import LLMService
+
+
+def make_completion(content: str, total_tokens: int = 10):
+    """Build a minimal chat completion response object."""
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=SimpleNamespace(
+            prompt_tokens=total_tokens // 2,
+            completion_tokens=total_tokens - total_tokens // 2,
+            total_tokens=total_tokens,
+        ),
+    )
+
+
+@pytest.mark.asyncio
+class TestLLMResponseCache:
+    """Tests for LLMResponseCache."""
+    
+    async def test_key_is_stable_and_input_sensitive(self):
+        """Test keys depend on every input but not on argument order."""
+        a = LLMResponseCache.make_key(prompt="p", temperature=0.7)
+        b = LLMResponseCache.make_key(temperature=0.7, prompt="p")
+        c = LLMResponseCache.make_key(prompt="p", temperature=0.2)
+        assert a == b
+        assert a != c
+    
+    async def test_memory_hit(self, tmp_path):
+        """Test a stored value is served from memory."""
+        cache = LLMResponseCache(directory=str(tmp_path))
+        await cache.set("k", "value")
+        assert await cache.get("k") == "value"
+        assert cache.stats["memory_hits"] == 1
+    
+    async def test_disk_tier_survives_new_instance(self, tmp_path):
+        """Test entries persist across cache instances."""
+        first = LLMResponseCache(directory=str(tmp_path))
+        await first.set("k", "value")
+        
+        second = LLMResponseCache(directory=str(tmp_path))
+        assert await second.get("k") == "value"
+        assert second.stats["disk_hits"] == 1
+        # Promoted back into memory
+        assert await second.get("k") == "value"
+        assert second.stats["memory_hits"] == 1
+    
+    async def test_expired_entries_miss(self, tmp_path):
+        """Test entries past their TTL are not served."""
+        cache = LLMResponseCache(directory=str(tmp_path), ttl_seconds=0)
+        await cache.set("k", "value")
+        time.sleep(0.01)
+        assert await cache.get("k") is None
+        assert cache.stats["misses"] == 1
+    
+    async def test_byte_cap_evicts_least_recently_used(self, tmp_path):
+        """Test the memory tier evicts LRU entries over the byte cap."""
+        cache = LLMResponseCache(
+            directory=str(tmp_path),
+            max_memory_bytes=10,
+            disk_enabled=False,
+        )
+        await cache.set("a", "aaaa")
+        await cache.set("b", "bbbb")
+        await cache.get("a")
+        await cache.set("c", "cccc")
+        
+        assert cache.stats["evictions"] == 1
+        assert await cache.get("b") is None
+        assert await cache.get("a") == "aaaa"
+
+
+@pytest.mark.asyncio
+class TestLLMServiceCaching:
+    """Tests for cache integration in LLMService.generate_content."""
+    
+    @pytest.fixture
+    def service(self, tmp_path):
+        service = LLMService()
+        service.cache = LLMResponseCache(directory=str(tmp_path))
+        service.client = SimpleNamespace(
+            chat=SimpleNamespace(
+                completions=SimpleNamespace(
+                    create=AsyncMock(return_value=make_completion("generated"))
+                )
+            )
+        )
+        return service
+    
+    async def test_repeat_call_served_from_cache(self, service):
+        """Test an identical second call does not reach the provider."""
+        first = await service.generate_content(prompt="hello")
+        second = await service.generate_content(prompt="hello")
+        assert first == second == "generated"
+        assert service.client.chat.completions.create.await_count == 1
+    
+    async def test_bypass_and_refresh(self, service):
+        """Test bypass skips the cache and refresh overwrites it."""
+        await service.generate_content(prompt="hello", bypass_cache=True)
+        assert service.cache_stats["writes"] == 0
+        
+        await service.generate_content(prompt="hello", refresh_cache=True)
+        await service.generate_content(prompt="hello", refresh_cache=True)
+        assert service.client.chat.completions.create.await_count == 3
+        assert service.cache_stats["writes"] == 2
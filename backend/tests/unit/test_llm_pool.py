@@ -0,0 +1,210 @@
+"""
+Unit tests for the LLM backend pool.
+"""
+import httpx
+import openai
+import pytest
+from openai import AsyncOpenAI
+
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.concurrency_limiter import AdaptiveConcurrencyLimiter
+from app.services.llm_pool import LLMBackend, LLMBackendPool, retry_after_seconds
+from app.services.llm_service import LLMService, build_backend_pool
+from app.utils.exceptions import LLMAPIError
+
+
+def completion_body(content: str) -> dict:
+    """Minimal chat completion payload."""
+    return {
+        "id": "chatcmpl-test",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "stand-in",
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+        "usage": {"prompt_tokens": 3, "completion_tokens": 2, "total_tokens": 5},
+    }
+
+
+def stand_in_backend(name: str, status: int = 200, headers: dict = None, **kwargs) -> LLMBackend:
+    """Backend whose client talks to an in-process OpenAI-compatible stand-in."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        if status != 200:
+            return httpx.Response(status, headers=headers, json={"error": {"message": "busy"}})
+        return httpx.Response(200, json=completion_body(name))
+    
+    client = AsyncOpenAI(
+        api_key=f"key-{name}",
+        base_url=f"http://{name}.local/v1",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        max_retries=0,
+    )
+    return LLMBackend(
+        name=name,
+        client=client,
+        model="stand-in",
+        breaker=CircuitBreaker(name=f"test:{name}", failure_threshold=1, error_rate=0.5),
+        **kwargs,
+    )
+
+
+async def complete(pool: LLMBackendPool) -> str:
+    """Send one chat completion through the pool."""
+    async with pool.lease() as backend:
+        response = await backend.client.chat.completions.create(
+            model=backend.model,
+            messages=[{"role": "user", "content": "hi"}],
+        )
+    return response.choices[0].message.content
+
+
+@pytest.mark.asyncio
+class TestLLMBackendPool:
+    """Tests for LLMBackendPool routing and health."""
+    
+    async def test_least_outstanding_routing(self):
+        """Test calls go to the backend with the fewest outstanding requests."""
+        a, b = stand_in_backend("a"), stand_in_backend("b")
+        pool = LLMBackendPool([a, b])
+        
+        async with pool.lease() as first:
+            async with pool.lease() as second:
+                assert {first.name, second.name} == {"a", "b"}
+        
+        # Idle backends share traffic
+        results = [await complete(pool) for _ in range(4)]
+        assert results.count("a") == results.count("b") == 2
+    
+    async def test_rate_limited_backend_is_drained(self):
+        """Test a 429 drains the backend for Retry-After seconds."""
+        limited = stand_in_backend("limited", status=429, headers={"retry-after": "20"})
+        healthy = stand_in_backend("healthy")
+        pool = LLMBackendPool([limited, healthy])
+        
+        with pytest.raises(openai.RateLimitError):
+            await complete(pool)
+        
+        assert limited.is_drained
+        assert 19 < limited.stats["drained_for_seconds"] <= 20
+        assert limited.breaker.state == "closed"
+        assert [await complete(pool) for _ in range(3)] == ["healthy"] * 3
+    
+    async def test_server_errors_open_backend_circuit(self):
+        """Test 5xx responses trip the backend's circuit and routing skips it."""
+        broken = stand_in_backend("broken", status=500)
+        healthy = stand_in_backend("healthy")
+        pool = LLMBackendPool([broken, healthy])
+        
+        with pytest.raises(openai.InternalServerError):
+            await complete(pool)
+        
+        assert broken.breaker.state == "open"
+        assert await complete(pool) == "healthy"
+    
+    async def test_no_backend_available(self):
+        """Test a clear error when every backend is unavailable."""
+        backend = stand_in_backend("only")
+        pool = LLMBackendPool([backend])
+        pool.drain(backend, 10)
+        
+        with pytest.raises(LLMAPIError) as exc_info:
+            pool.select()
+        assert exc_info.value.details["state"] == "no_backend_available"
+
+
+    async def test_rate_limit_only_throttles_its_backend(self):
+        """Test a 429 cuts the concurrency limit of the limited backend alone."""
+        limited = stand_in_backend(
+            "limited",
+            status=429,
+            limiter=AdaptiveConcurrencyLimiter(initial_limit=8, name="limited"),
+        )
+        healthy = stand_in_backend(
+            "healthy",
+            limiter=AdaptiveConcurrencyLimiter(initial_limit=8, name="healthy"),
+        )
+        service = LLMService()
+        service.pool = LLMBackendPool([limited, healthy])
+        messages = [{"role": "user", "content": "hi"}]
+        
+        with pytest.raises(openai.RateLimitError):
+            await service._create_completion(messages)
+        response = await service._create_completion(messages)
+        
+        assert response.choices[0].message.content == "healthy"
+        assert limited.limiter.limit == 4
+        assert healthy.limiter.limit == 8
+
+    async def test_rate_limits_are_not_outages(self):
+        """Test 429s and an exhausted pool leave circuits closed and health untouched."""
+        limited = stand_in_backend("limited", status=429, headers={"retry-after": "20"})
+        service = LLMService()
+        service.cache = None
+        service.retry_policy.max_retries = 0
+        service.pool = LLMBackendPool([limited])
+
+        for _ in range(2):
+            with pytest.raises(LLMAPIError):
+                await service.generate_content(prompt="hi")
+
+        assert limited.breaker.state == "closed"
+        assert not service.is_circuit_open
+        assert service.circuit_stats["limited"]["state"] == "closed"
+        assert service.health.stats["window_failures"] == 0
+
+
+def test_backend_budgets_from_settings(settings):
+    """Test each backend gets its own rate budget, overridable per entry."""
+    backends = (
+        '[{"name": "a", "api_key": "sk-a", "rpm": 100, "tpm": 5000, "max_concurrency": 3},'
+        ' {"name": "b", "api_key": "sk-b"}]'
+    )
+    pool = build_backend_pool(
+        settings.model_copy(update={"LLM_BACKENDS": backends, "LLM_RATE_LIMIT_RPM": 60}),
+        httpx.AsyncClient(),
+    )
+    a, b = pool.backends
+    
+    assert a.scheduler.requests.capacity == 100
+    assert a.scheduler.tokens.capacity == 5000
+    assert a.limiter.max_limit == 3
+    assert b.scheduler.requests.capacity == 60
+    assert b.scheduler.tokens is None
+    assert a.scheduler is not b.scheduler
+
+
+def test_backends_must_share_a_model(settings):
+    """Test a pool mixing models is rejected, since cache keys ignore the backend."""
+    backends = (
+        '[{"name": "a", "api_key": "sk-a", "model": "gpt-4o"},'
+        ' {"name": "b", "api_key": "sk-b", "model": "gpt-4o-mini"}]'
+    )
+    with pytest.raises(ValueError, match="same model"):
+        build_backend_pool(
+            settings.model_copy(update={"LLM_BACKENDS": backends}),
+            httpx.AsyncClient(),
+        )
+    
+    shared = (
+        f'[{{"name": "a", "api_key": "sk-a", "model": "{settings.OPENAI_MODEL}"}},'
+        ' {"name": "b", "api_key": "sk-b"}]'
+    )
+    pool = build_backend_pool(
+        settings.model_copy(update={"LLM_BACKENDS": shared}),
+        httpx.AsyncClient(),
+    )
+    assert {backend.model for backend in pool.backends} == {settings.OPENAI_MODEL}
+
+
+def test_retry_after_parsing():
+    """Test Retry-After headers are read in seconds or milliseconds."""
+    def error(headers):
+        response = httpx.Response(429, headers=headers, request=httpx.Request("POST", "http://x"))
+        return openai.RateLimitError("busy", response=response, body=None)
+    
+    assert retry_after_seconds(error({"retry-after": "3"})) == 3.0
+    assert retry_after_seconds(error({"retry-after-ms": "1500"})) == 1.5
+    assert retry_after_seconds(error({})) is None
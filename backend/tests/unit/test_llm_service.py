@@ -0,0 +1,53 @@
+"""
+Unit tests for LLMService connection management.
+"""
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.services.llm_service import LLMService
+
+
+@pytest.mark.asyncio
+class TestConnectionWarmUp:
+    """Tests for LLMService.warm_up."""
+    
+    async def test_warm_up_issues_concurrent_pings(self, settings):
+        """Test warm-up sends one zero-token request per configured connection."""
+        service = LLMService()
+        service.client.models.list = AsyncMock(return_value=[])
+        
+        succeeded = await service.warm_up()
+        
+        assert succeeded == settings.LLM_HTTP_WARMUP_CONNECTIONS
+        assert service.client.models.list.await_count == succeeded
+        await service.close()
+    
+    async def test_warm_up_failures_are_not_fatal(self):
+        """Test a failing warm-up is logged and reported, not raised."""
+        service = LLMService()
+        service.client.models.list = AsyncMock(side_effect=ConnectionError("down"))
+        
+        assert await service.warm_up() == 0
+        await service.close()
+    
+    async def test_pool_stats_reflect_settings(self, settings):
+        """Test pool statistics expose the configured limits."""
+        service = LLMService()
+        stats = service.pool_stats
+        assert stats["max_connections"] == settings.LLM_HTTP_MAX_CONNECTIONS
+        assert stats["connections"] == 0
+        await service.close()
+    
+    async def test_pool_stats_through_recording_transport(self, settings, llm_stand_in, monkeypatch, tmp_path):
+        """Test pool statistics still see live connections when the transport is wrapped."""
+        monkeypatch.setattr(settings, "LLM_TRANSPORT_MODE", "record")
+        monkeypatch.setattr(settings, "LLM_CASSETTE_PATH", str(tmp_path / "cassette.jsonl"))
+        monkeypatch.setattr(settings, "OPENAI_BASE_URL", llm_stand_in.base_url)
+        service = LLMService()
+        
+        await service.client.models.list()
+        
+        assert service.pool_stats["connections"] == 1
+        assert service.pool_stats["idle"] == 1
+        await service.close()
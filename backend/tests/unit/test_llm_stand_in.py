@@ -0,0 +1,88 @@
+"""
+Unit tests for the OpenAI-compatible stand-in server.
+"""
+import time
+from dataclasses import replace
+
+import httpx
+import openai
+import pytest
+from openai import AsyncOpenAI
+
+from app.services.llm_stand_in import PROFILES, StandInServer
+
+
+def make_client(server: StandInServer) -> AsyncOpenAI:
+    return AsyncOpenAI(api_key="test", base_url=server.base_url, max_retries=0)
+
+
+@pytest.mark.asyncio
+class TestLLMStandIn:
+    """Tests for the stand-in chat completions API."""
+    
+    async def test_completion_reports_usage(self, llm_stand_in):
+        """Test a plain completion respects max_tokens and reports usage."""
+        client = make_client(llm_stand_in)
+        response = await client.chat.completions.create(
+            model="gpt-4o",
+            messages=[{"role": "user", "content": "Describe the market"}],
+            max_tokens=50,
+        )
+        
+        assert response.choices[0].message.content.startswith("## Section 1")
+        assert response.choices[0].finish_reason == "length"
+        assert response.usage.completion_tokens == 50
+        assert response.usage.prompt_tokens > 0
+        assert response.usage.prompt_tokens_details.cached_tokens == 0
+    
+    async def test_stream_paced_with_usage(self):
+        """Test streaming follows time-to-first-token and token rate, then sends usage."""
+        profile = replace(PROFILES["fast"], ttft_ms=50, tokens_per_second=1000)
+        with StandInServer(profile, seed=1) as server:
+            client = make_client(server)
+            started = time.monotonic()
+            stream = await client.chat.completions.create(
+                model="gpt-4o",
+                messages=[{"role": "user", "content": "hi"}],
+                max_tokens=100,
+                stream=True,
+                stream_options={"include_usage": True},
+            )
+            first_token_at = None
+            parts, usage = [], None
+            async for chunk in stream:
+                if chunk.usage:
+                    usage = chunk.usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    first_token_at = first_token_at or time.monotonic() - started
+                    parts.append(chunk.choices[0].delta.content)
+            elapsed = time.monotonic() - started
+        
+        assert first_token_at >= 0.05
+        assert elapsed >= 0.05 + 0.09
+        assert len(parts) > 1
+        assert usage.completion_tokens == 100
+    
+    async def test_fault_profile_returns_openai_errors(self):
+        """Test 429s carry Retry-After and 5xx map to SDK server errors."""
+        limited = replace(PROFILES["fast"], rate_limit_rate=1.0, retry_after_seconds=2)
+        failing = replace(PROFILES["fast"], server_error_rate=1.0)
+        messages = [{"role": "user", "content": "hi"}]
+        
+        with StandInServer(limited) as server:
+            with pytest.raises(openai.RateLimitError) as exc_info:
+                await make_client(server).chat.completions.create(model="gpt-4o", messages=messages)
+            assert exc_info.value.response.headers["retry-after"] == "2"
+        
+        with StandInServer(failing) as server:
+            with pytest.raises(openai.InternalServerError):
+                await make_client(server).chat.completions.create(model="gpt-4o", messages=messages)
+            assert server.stats["server_errors"] == 1
+    
+    async def test_models_endpoint_serves_warm_up(self, llm_stand_in):
+        """Test the model list used by warm-up and health probes."""
+        async with httpx.AsyncClient() as client:
+            response = await client.get(f"{llm_stand_in.base_url}/models")
+        
+        assert response.status_code == 200
+        assert {"fast", "gpt-4o"} <= {model["id"] for model in response.json()["data"]}
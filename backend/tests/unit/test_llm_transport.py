@@ -0,0 +1,154 @@
+"""
+Unit tests for the record/replay LLM transport.
+"""
+import asyncio
+import json
+import time
+
+import httpx
+import openai
+import pytest
+from openai import AsyncOpenAI
+
+from app.services.llm_transport import (
+    RecordingTransport,
+    ReplayTransport,
+    prompt_key,
+    resolve_key_function,
+)
+
+
+def completion_body(content: str) -> dict:
+    """Minimal chat completion payload."""
+    return {
+        "id": "chatcmpl-test",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "stand-in",
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+        "usage": {"prompt_tokens": 3, "completion_tokens": 2, "total_tokens": 5},
+    }
+
+
+def sse_chunk(content: str) -> bytes:
+    """One streamed chat completion chunk."""
+    payload = {
+        "id": "chatcmpl-test",
+        "object": "chat.completion.chunk",
+        "created": 0,
+        "model": "stand-in",
+        "choices": [{"index": 0, "delta": {"content": content}, "finish_reason": None}],
+    }
+    return f"data: {json.dumps(payload)}\n\n".encode()
+
+
+async def live_handler(request: httpx.Request) -> httpx.Response:
+    """Stand-in provider: echoes the prompt, streaming when asked."""
+    body = json.loads(request.content)
+    prompt = body["messages"][-1]["content"]
+    if not body.get("stream"):
+        await asyncio.sleep(0.02)
+        return httpx.Response(200, json=completion_body(f"echo: {prompt}"))
+    
+    async def stream():
+        for word in prompt.split():
+            await asyncio.sleep(0.01)
+            yield sse_chunk(word + " ")
+        yield b"data: [DONE]\n\n"
+    
+    return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=stream())
+
+
+def make_client(transport: httpx.AsyncBaseTransport) -> AsyncOpenAI:
+    return AsyncOpenAI(
+        api_key="test",
+        base_url="http://provider.local/v1",
+        http_client=httpx.AsyncClient(transport=transport),
+        max_retries=0,
+    )
+
+
+async def complete(client: AsyncOpenAI, prompt: str, **kwargs) -> str:
+    response = await client.chat.completions.create(
+        model="stand-in", messages=[{"role": "user", "content": prompt}], **kwargs
+    )
+    return response.choices[0].message.content
+
+
+async def stream(client: AsyncOpenAI, prompt: str) -> str:
+    response = await client.chat.completions.create(
+        model="stand-in", messages=[{"role": "user", "content": prompt}], stream=True
+    )
+    return "".join([chunk.choices[0].delta.content or "" async for chunk in response])
+
+
+@pytest.mark.asyncio
+class TestRecordReplay:
+    """Tests for RecordingTransport and ReplayTransport."""
+    
+    async def test_replays_recorded_exchanges_offline(self, tmp_path):
+        """Test plain and streamed completions replay identically without the provider."""
+        cassette = tmp_path / "llm.jsonl"
+        recorder = make_client(RecordingTransport(str(cassette), httpx.MockTransport(live_handler)))
+        recorded = [await complete(recorder, "hello"), await stream(recorder, "one two three")]
+        
+        replay = ReplayTransport(str(cassette), latency_scale=0)
+        player = make_client(replay)
+        assert [await complete(player, "hello"), await stream(player, "one two three")] == recorded
+        assert replay.stats == {"hits": 2, "misses": 0, "keys": 2}
+    
+    async def test_latency_is_replayed_and_scaled(self, tmp_path):
+        """Test replay keeps the recorded timing, scaled by latency_scale."""
+        cassette = tmp_path / "llm.jsonl"
+        recorder = make_client(RecordingTransport(str(cassette), httpx.MockTransport(live_handler)))
+        await stream(recorder, "a b c d e")
+        
+        async def timed(scale: float) -> float:
+            player = make_client(ReplayTransport(str(cassette), latency_scale=scale))
+            started = time.monotonic()
+            await stream(player, "a b c d e")
+            return time.monotonic() - started
+        
+        assert await timed(1.0) >= 0.045
+        assert await timed(0) < 0.03
+    
+    async def test_miss_is_not_retryable(self, tmp_path):
+        """Test an unrecorded request fails with a 404 instead of reaching the network."""
+        player = make_client(ReplayTransport(str(tmp_path / "missing.jsonl")))
+        
+        with pytest.raises(openai.NotFoundError):
+            await complete(player, "never recorded")
+    
+    async def test_repeated_requests_replay_in_order(self, tmp_path):
+        """Test duplicates replay in recorded order and then repeat the last."""
+        cassette = tmp_path / "llm.jsonl"
+        answers = iter(["first", "second"])
+        
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, json=completion_body(next(answers)))
+        
+        recorder = make_client(RecordingTransport(str(cassette), httpx.MockTransport(handler)))
+        await complete(recorder, "same")
+        await complete(recorder, "same")
+        
+        player = make_client(ReplayTransport(str(cassette), latency_scale=0))
+        assert [await complete(player, "same") for _ in range(3)] == ["first", "second", "second"]
+    
+    async def test_key_function_is_pluggable(self, tmp_path):
+        """Test a looser key matches requests that differ only in sampling settings."""
+        cassette = tmp_path / "llm.jsonl"
+        key_function = resolve_key_function("app.services.llm_transport:prompt_key")
+        assert key_function is prompt_key
+        recorder = make_client(RecordingTransport(
+            str(cassette), httpx.MockTransport(live_handler), key_function
+        ))
+        await complete(recorder, "hello", temperature=0.7)
+        
+        player = make_client(ReplayTransport(str(cassette), key_function, latency_scale=0))
+        assert await complete(player, "hello", temperature=0.2) == "echo: hello"
+        with pytest.raises(openai.NotFoundError):
+            await complete(make_client(ReplayTransport(str(cassette), latency_scale=0)), "hello", temperature=0.2)
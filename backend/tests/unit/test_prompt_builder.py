@@ -0,0 +1,72 @@
+"""
+Unit tests for cache-friendly prompt assembly.
+"""
+import pytest
+
+from app.agents.critic_agent import CriticAgent
+from app.agents.marketing_agent import MarketingAgent
+from app.agents.prompt_builder import PromptBuilder
+from app.agents.research_agent import ResearchAgent
+
+
+class TestPromptBuilder:
+    """Tests for PromptBuilder."""
+    
+    def test_segments_ordered_static_first(self):
+        """Test segments are joined by level, keeping order within a level."""
+        prompt = (
+            PromptBuilder()
+            .request("company")
+            .shared("report A")
+            .static("instructions")
+            .shared("report B")
+            .build()
+        )
+        
+        assert prompt == "instructions\n\nreport A\n\nreport B\n\ncompany"
+        assert prompt.prefix_length == len("instructions\n\nreport A\n\nreport B")
+    
+    def test_fingerprint_ignores_request_segments(self):
+        """Test the fingerprint covers only the cacheable prefix."""
+        first = PromptBuilder().static("rules").shared("report").request("Apple").build()
+        second = PromptBuilder().static("rules").shared("report").request("Tesla").build()
+        changed = PromptBuilder().static("rules").shared("other report").request("Apple").build()
+        
+        assert first.prefix_fingerprint == second.prefix_fingerprint
+        assert first.prefix_fingerprint != changed.prefix_fingerprint
+
+
+@pytest.mark.asyncio
+class TestAgentPrompts:
+    """Tests for agent prompt layouts."""
+    
+    async def test_research_prefix_shared_across_companies(self):
+        """Test research prompts for different companies share their prefix."""
+        agent = ResearchAgent()
+        apple = await agent.build_prompt(company_name="Apple", partner_company="Microsoft", domain="AI")
+        tesla = await agent.build_prompt(company_name="Tesla", partner_company="Panasonic", domain="EV")
+        
+        assert apple.prefix_fingerprint == tesla.prefix_fingerprint
+        assert "Apple" not in apple[:apple.prefix_length]
+        assert apple.rstrip().endswith("**Industry Domain**: AI")
+    
+    async def test_marketing_reports_precede_request_values(self, sample_research_report, sample_product_report):
+        """Test upstream reports sit in the prefix and company values after it."""
+        prompt = await MarketingAgent().build_prompt(
+            research_report=sample_research_report,
+            product_report=sample_product_report,
+            company_name="Apple Inc",
+            domain="AI",
+        )
+        
+        prefix = prompt[:prompt.prefix_length]
+        assert prefix.index("## Research Insights") < prefix.index("## Product Strategy\n")
+        assert "**Primary Company**: Apple Inc" in prompt[prompt.prefix_length:]
+    
+    async def test_critic_prefix_depends_on_content_only(self):
+        """Test the critic prefix does not change with the content type."""
+        agent = CriticAgent()
+        research = await agent.build_prompt(content="Report body", content_type="research")
+        product = await agent.build_prompt(content="Report body", content_type="product")
+        
+        assert research.prefix_fingerprint == product.prefix_fingerprint
@@ -0,0 +1,133 @@
+"""
+Unit tests for the speculative critic quality gate.
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.models.requests import PipelineRequest
+from app.services.pipeline_service import PipelineOrchestrator
+
+REQUEST = PipelineRequest(company_name="Apple", partner_company="Microsoft", domain="AI")
+
+
+def make_orchestrator(settings, fake_agent, verdicts=None, delay=0.05, max_revisions=1):
+    """
+    Orchestrator with fake stage agents and a critic returning scripted verdicts.
+    
+    verdicts maps a content string to its evaluation; anything else is approved.
+    """
+    orchestrator = PipelineOrchestrator(settings=settings.model_copy(update={
+        "PIPELINE_QUALITY_GATE_ENABLED": True,
+        "PIPELINE_QUALITY_GATE_MAX_REVISIONS": max_revisions,
+    }))
+    orchestrator.research_agent = fake_agent("research", delay)
+    orchestrator.product_agent = fake_agent("product", delay)
+    orchestrator.marketing_agent = fake_agent("marketing", delay)
+    reviewed = []
+    
+    async def critique(content: str, content_type: str) -> str:
+        reviewed.append(content)
+        # Critiques finish while the speculative stage is still running
+        await asyncio.sleep(delay / 2)
+        return (verdicts or {}).get(content, "Overall Quality Score: 8/10\nAPPROVED")
+    
+    orchestrator.critic_agent.execute = critique
+    orchestrator.reviewed = reviewed
+    return orchestrator
+
+
+@pytest.mark.asyncio
+class TestQualityGate:
+    """Tests for PipelineOrchestrator._run_gated_stages."""
+    
+    async def test_critique_overlaps_next_stage(self, settings, fake_agent):
+        """Test approved sections cost only the final critique in wall time."""
+        orchestrator = make_orchestrator(settings, fake_agent)
+        started = time.monotonic()
+        response = await orchestrator.run_pipeline(REQUEST, save_report=False)
+        elapsed = time.monotonic() - started
+        
+        assert response.status == "completed"
+        # Three stages plus the last critique; a serial gate would add all three
+        assert elapsed < 0.24
+        assert orchestrator.reviewed == ["research v1", "product v1", "marketing v1"]
+        assert response.sections.research.quality_score == 8
+        assert response.sections.marketing.quality_score == 8
+    
+    async def test_rejection_reruns_stage_and_restarts_downstream(self, settings, fake_agent):
+        """Test a rejected section is revised with feedback and the speculative stage re-run."""
+        orchestrator = make_orchestrator(settings, fake_agent, verdicts={
+            "research v1": "Overall Quality Score: 4/10\nNEEDS REVISION: add market data",
+        })
+        events = []
+        
+        async def on_event(event, data):
+            if event != "token":
+                events.append((event, data.get("stage")))
+        
+        response = await orchestrator.run_pipeline(REQUEST, save_report=False, on_event=on_event)
+        
+        research, product = orchestrator.research_agent, orchestrator.product_agent
+        assert response.status == "completed"
+        assert len(research.calls) == 2
+        assert "add market data" in research.calls[1]["revision_feedback"]
+        assert product.cancelled == 1
+        assert product.calls[-1]["research_report"] == "research v2"
+        assert response.sections.research.revisions == 1
+        assert response.sections.research.quality_score == 8
+        assert ("stage_revision", "research") in events
+    
+    async def test_revisions_are_bounded(self, settings, fake_agent):
+        """Test a section the critic keeps rejecting is kept after the revision limit."""
+        rejected = "Overall Quality Score: 3/10\nNEEDS REVISION"
+        orchestrator = make_orchestrator(settings, fake_agent, verdicts={
+            f"{stage} v{n}": rejected for stage in ("research", "product", "marketing") for n in range(1, 5)
+        })
+        
+        response = await orchestrator.run_pipeline(REQUEST, save_report=False)
+        
+        assert response.status == "completed"
+        marketing = orchestrator.marketing_agent
+        assert len(orchestrator.research_agent.calls) == 2
+        # Speculative marketing runs on rejected product versions were cancelled
+        assert len(marketing.calls) - marketing.cancelled == 2
+        assert response.sections.marketing.revisions == 1
+        assert response.sections.marketing.quality_score == 3
+    
+    async def test_failed_revision_keeps_previous_section(self, settings, fake_agent):
+        """Test a revision that fails keeps the scored section and the pipeline continues."""
+        orchestrator = make_orchestrator(settings, fake_agent, verdicts={
+            "research v1": "Overall Quality Score: 4/10\nNEEDS REVISION: add market data",
+        })
+        research = orchestrator.research_agent
+        execute = research.execute
+        
+        async def fail_revisions(**inputs):
+            research.fail = "revision_feedback" in inputs
+            return await execute(**inputs)
+        
+        research.execute = fail_revisions
+        response = await orchestrator.run_pipeline(REQUEST, save_report=False)
+        
+        assert response.status == "completed"
+        assert response.sections.research.content == "research v1"
+        assert response.sections.research.quality_score == 4
+        assert response.sections.research.revisions == 1
+        assert orchestrator.product_agent.calls[-1]["research_report"] == "research v1"
+        assert response.sections.marketing.status == "completed"
+    
+    async def test_failed_critic_approves(self, settings, fake_agent):
+        """Test a critic error keeps the section instead of failing the pipeline."""
+        orchestrator = make_orchestrator(settings, fake_agent)
+        
+        async def broken(**_):
+            raise asyncio.TimeoutError()
+        
+        orchestrator.critic_agent.execute = broken
+        response = await orchestrator.run_pipeline(REQUEST, save_report=False)
+        
+        assert response.status == "completed"
+        assert response.sections.research.quality_score is None
+        assert len(orchestrator.product_agent.calls) == 1
@@ -0,0 +1,51 @@
+"""
+Unit tests for the RPM/TPM rate scheduler.
+"""
+import pytest
+
+from app.services.rate_scheduler import RateScheduler
+from app.utils.exceptions import LLMAPIError
+
+
+@pytest.mark.asyncio
+class TestRateScheduler:
+    """Tests for RateScheduler."""
+    
+    async def test_disabled_scheduler_never_waits(self):
+        """Test reservations pass straight through without budgets."""
+        scheduler = RateScheduler()
+        reservation = await scheduler.reserve(10_000_000)
+        scheduler.reconcile(reservation, 5)
+        assert not scheduler.enabled
+    
+    async def test_reserve_draws_from_both_buckets(self):
+        """Test a reservation consumes one request and the estimated tokens."""
+        scheduler = RateScheduler(requests_per_minute=10, tokens_per_minute=1000)
+        await scheduler.reserve(400)
+        stats = scheduler.stats
+        assert stats["requests_available"] == pytest.approx(9, abs=0.01)
+        assert stats["tokens_available"] == pytest.approx(600, abs=1)
+    
+    async def test_reconcile_refunds_overestimate(self):
+        """Test unused reserved tokens are returned to the bucket."""
+        scheduler = RateScheduler(tokens_per_minute=1000)
+        reservation = await scheduler.reserve(400)
+        scheduler.reconcile(reservation, 100)
+        assert scheduler.stats["tokens_available"] == pytest.approx(900, abs=1)
+        # Settling twice has no further effect
+        scheduler.reconcile(reservation, 100)
+        assert scheduler.stats["tokens_available"] == pytest.approx(900, abs=1)
+    
+    async def test_reconcile_charges_underestimate(self):
+        """Test usage above the estimate is charged to the bucket."""
+        scheduler = RateScheduler(tokens_per_minute=1000)
+        reservation = await scheduler.reserve(100)
+        scheduler.reconcile(reservation, 300)
+        assert scheduler.stats["tokens_available"] == pytest.approx(700, abs=1)
+    
+    async def test_exhausted_budget_fails_fast(self):
+        """Test a reservation that cannot be met in time raises."""
+        scheduler = RateScheduler(requests_per_minute=1, max_wait_seconds=0.5)
+        await scheduler.reserve(1)
+        with pytest.raises(LLMAPIError):
+            await scheduler.reserve(1)
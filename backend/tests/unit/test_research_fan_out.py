@@ -0,0 +1,118 @@
+"""
+Unit tests for the research fan-out.
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.agents.research_agent import ResearchAgent
+from app.utils.exceptions import AgentExecutionError, LLMAPIError
+
+INPUTS = {"company_name": "Apple", "partner_company": "Microsoft", "domain": "AI"}
+
+
+class FakeLLM:
+    """Answers each section prompt after a delay, tracking concurrency."""
+    
+    def __init__(self, delay: float = 0.05, fail_on: str = None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.cancelled = 0
+    
+    def _answer(self, prompt: str) -> str:
+        if "# Company Profile Request" in prompt:
+            return "profile of " + prompt.split("**Company**: ")[1].split("\n")[0]
+        if "# Relationship Analysis Request" in prompt:
+            return "relationship"
+        if "# Industry Trends Request" in prompt:
+            return "trends"
+        return "synthesis"
+    
+    async def generate_content(self, prompt: str, **kwargs) -> str:
+        answer = self._answer(prompt)
+        if answer == self.fail_on:
+            raise LLMAPIError(message="boom", provider="OpenAI")
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            return answer
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.in_flight -= 1
+    
+    async def generate_stream(self, prompt: str, **kwargs):
+        # Later sections finish first to exercise ordering
+        answer = self._answer(prompt)
+        await asyncio.sleep(self.delay / (2 if answer == "synthesis" else 1))
+        for word in answer.split():
+            yield word + " "
+
+
+def make_agent(llm: FakeLLM) -> ResearchAgent:
+    agent = ResearchAgent()
+    agent.llm_service = llm
+    return agent
+
+
+@pytest.mark.asyncio
+class TestResearchFanOut:
+    """Tests for ResearchAgent sub-analyses."""
+    
+    async def test_sections_run_concurrently_and_merge_in_order(self):
+        """Test all five sections run at once and merge into the report structure."""
+        llm = FakeLLM(delay=0.05)
+        started = time.monotonic()
+        report = await make_agent(llm).execute(**INPUTS)
+        
+        assert time.monotonic() - started < 0.15
+        assert llm.max_in_flight == 5
+        order = [
+            "# Research Report: Apple & Microsoft",
+            "## Part 1: Current Business Analysis",
+            "### Apple Profile", "profile of Apple",
+            "### Microsoft Profile", "profile of Microsoft",
+            "### Current Relationship Analysis", "relationship",
+            "## Part 2: Future Technology Strategy",
+            "### AI Industry Trends", "trends",
+            "### Collaboration Synthesis", "synthesis",
+        ]
+        positions = [report.index(marker) for marker in order]
+        assert positions == sorted(positions)
+    
+    async def test_stream_matches_merged_report(self):
+        """Test streamed sections come out in report order and match the merged text."""
+        agent = make_agent(FakeLLM(delay=0.02))
+        streamed = "".join([chunk async for chunk in agent.execute_stream(**INPUTS)])
+        merged = await agent.execute(**INPUTS)
+        
+        assert streamed.split() == merged.split()
+    
+    async def test_failed_section_cancels_siblings(self):
+        """Test one failing section fails the agent and cancels the others."""
+        llm = FakeLLM(delay=0.05, fail_on="trends")
+        with pytest.raises(AgentExecutionError):
+            await make_agent(llm).execute(**INPUTS)
+        await asyncio.sleep(0)
+        
+        assert llm.cancelled == 4
+    
+    async def test_fan_out_can_be_disabled(self, settings, monkeypatch):
+        """Test the single-call prompt is used when fan-out is off."""
+        monkeypatch.setattr(settings, "RESEARCH_FAN_OUT_ENABLED", False)
+        prompts = []
+        
+        class OneCall:
+            async def generate_content(self, prompt: str, **kwargs) -> str:
+                prompts.append(prompt)
+                return "report"
+        
+        agent = ResearchAgent()
+        agent.llm_service = OneCall()
+        assert await agent.execute(**INPUTS) == "report"
+        assert len(prompts) == 1 and "# Research Analysis Request" in prompts[0]
@@ -0,0 +1,130 @@
+"""
+Unit tests for the error-classified retry policy.
+"""
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import httpx
+import openai
+import pytest
+
+from app.services.llm_service import LLMService
+from app.services.retry_policy import (
+    NON_RETRYABLE,
+    RATE_LIMITED,
+    SERVER_ERROR,
+    TIMEOUT,
+    RetryBudget,
+    RetryPolicy,
+    classify_error,
+)
+from app.utils.exceptions import LLMAPIError
+
+
+def api_error(cls, status: int, headers: dict = None):
+    """Build an OpenAI SDK status error."""
+    response = httpx.Response(
+        status, headers=headers, request=httpx.Request("POST", "http://stand-in/v1")
+    )
+    return cls("error", response=response, body=None)
+
+
+def fast_policy(**kwargs) -> RetryPolicy:
+    """Policy with millisecond backoff for tests."""
+    return RetryPolicy(initial_delay=0.001, max_delay=0.01, **kwargs)
+
+
+def test_classify_error():
+    """Test provider errors are sorted into retry classes."""
+    assert classify_error(api_error(openai.RateLimitError, 429)) == RATE_LIMITED
+    assert classify_error(api_error(openai.InternalServerError, 503)) == SERVER_ERROR
+    assert classify_error(asyncio.TimeoutError()) == TIMEOUT
+    assert classify_error(api_error(openai.BadRequestError, 400)) == NON_RETRYABLE
+    assert classify_error(api_error(openai.AuthenticationError, 401)) == NON_RETRYABLE
+    assert classify_error(
+        LLMAPIError("busy", details={"state": "concurrency_limited"})
+    ) == NON_RETRYABLE
+
+
+def test_retry_after_overrides_backoff():
+    """Test Retry-After sets the delay and long hints end retries."""
+    policy = RetryPolicy(initial_delay=0.5, max_delay=30)
+    short = api_error(openai.RateLimitError, 429, {"retry-after": "2"})
+    long = api_error(openai.RateLimitError, 429, {"retry-after": "120"})
+    assert 2 <= policy.delay(0, short) <= 2.5
+    assert policy.delay(0, long) is None
+
+
+def test_backoff_is_jittered_and_capped():
+    """Test backoff stays within the exponential ceiling and max delay."""
+    policy = RetryPolicy(initial_delay=1, max_delay=5, backoff_factor=2)
+    error = asyncio.TimeoutError()
+    assert all(0 <= policy.delay(1, error) <= 2 for _ in range(20))
+    assert all(0 <= policy.delay(10, error) <= 5 for _ in range(20))
+
+
+def test_retry_budget():
+    """Test the budget allows min_retries plus a ratio of requests."""
+    budget = RetryBudget(ratio=0.5, min_retries=1)
+    for _ in range(4):
+        budget.record_request()
+    assert [budget.try_spend() for _ in range(4)] == [True, True, True, False]
+
+
+@pytest.mark.asyncio
+class TestRetryPolicy:
+    """Tests for RetryPolicy.run."""
+    
+    async def test_transient_failure_recovers(self):
+        """Test a 5xx followed by success returns the result."""
+        call = AsyncMock(side_effect=[api_error(openai.InternalServerError, 500), "ok"])
+        policy = fast_policy()
+        assert await policy.run(call) == "ok"
+        assert call.await_count == 2
+        assert policy.stats["recovered"] == 1
+    
+    async def test_non_retryable_fails_immediately(self):
+        """Test 4xx errors are not retried."""
+        call = AsyncMock(side_effect=api_error(openai.BadRequestError, 400))
+        with pytest.raises(openai.BadRequestError):
+            await fast_policy().run(call)
+        assert call.await_count == 1
+    
+    async def test_gives_up_after_max_retries(self):
+        """Test retries stop at max_retries."""
+        call = AsyncMock(side_effect=asyncio.TimeoutError())
+        policy = fast_policy(max_retries=2)
+        with pytest.raises(asyncio.TimeoutError):
+            await policy.run(call)
+        assert call.await_count == 3
+        assert policy.stats["gave_up"] == 1
+    
+    async def test_budget_stops_retry_storm(self):
+        """Test an exhausted budget turns retries off."""
+        call = AsyncMock(side_effect=api_error(openai.InternalServerError, 503))
+        policy = fast_policy(budget=RetryBudget(ratio=0, min_retries=2))
+        for _ in range(3):
+            with pytest.raises(openai.InternalServerError):
+                await policy.run(call)
+        assert policy.stats["retries"] == 2
+        assert policy.stats["budget_exhausted"] >= 1
+    
+    async def test_generate_content_retries_rate_limits(self):
+        """Test LLMService retries a 429 and returns the recovered result."""
+        service = LLMService()
+        service.cache = None
+        service.retry_policy = fast_policy()
+        completion = SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="recovered"))],
+            usage=SimpleNamespace(prompt_tokens=1, completion_tokens=1, total_tokens=2),
+        )
+        service.client = SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(create=AsyncMock(side_effect=[
+                api_error(openai.RateLimitError, 429, {"retry-after-ms": "1"}),
+                completion,
+            ])))
+        )
+        
+        assert await service.generate_content(prompt="hello") == "recovered"
+        assert service.pool.primary.drains == 1
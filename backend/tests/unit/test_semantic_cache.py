@@ -0,0 +1,84 @@
+"""
+Unit tests for the near-duplicate semantic cache.
+"""
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.agents import ResearchAgent
+from app.services.llm_service import LLMService
+from app.services.semantic_cache import SemanticCache, shingles
+
+
+def test_shingles_ignore_order_case_and_suffixes():
+    """Test normalization makes trivial variants identical."""
+    assert shingles("Apple Inc, Microsoft") == shingles("microsoft apple")
+
+
+class TestSemanticCache:
+    """Tests for SemanticCache lookup and eviction."""
+    
+    def test_near_duplicate_hits(self):
+        """Test near-duplicates hit and unrelated texts miss."""
+        cache = SemanticCache()
+        cache.add("research", "Apple Inc Microsoft", "cached report")
+        
+        assert cache.lookup("research", "Microsoft Apple", 0.85) == "cached report"
+        assert cache.lookup("research", "Google Amazon", 0.85) is None
+        assert cache.stats["hits"] == 1
+        assert cache.stats["misses"] == 1
+    
+    def test_namespaces_are_isolated(self):
+        """Test entries never match across namespaces."""
+        cache = SemanticCache()
+        cache.add("AI", "Apple Microsoft", "ai report")
+        assert cache.lookup("XR", "Apple Microsoft", 0.5) is None
+    
+    def test_threshold_controls_matching(self):
+        """Test a stricter threshold rejects looser matches."""
+        cache = SemanticCache()
+        cache.add("ns", "Apple Microsoft Azure", "content")
+        assert cache.lookup("ns", "Apple Microsoft", 0.5) == "content"
+        assert cache.lookup("ns", "Apple Microsoft", 0.99) is None
+    
+    def test_oldest_entries_are_overwritten(self):
+        """Test the ring buffer evicts the oldest entry and its buckets."""
+        cache = SemanticCache(max_entries=2)
+        cache.add("ns", "Apple Microsoft", "first")
+        cache.add("ns", "Google Amazon", "second")
+        cache.add("ns", "Tesla Nvidia", "third")
+        
+        assert cache.lookup("ns", "Apple Microsoft", 0.85) is None
+        assert cache.lookup("ns", "Tesla Nvidia", 0.85) == "third"
+        assert cache.stats["entries"] == 2
+
+
+@pytest.mark.asyncio
+class TestAgentSemanticCaching:
+    """Tests for semantic caching through BaseAgent and LLMService."""
+    
+    async def test_trivial_variants_reuse_research(self, settings, monkeypatch):
+        """Test a renamed / reordered research request is served from cache."""
+        monkeypatch.setattr(settings, "RESEARCH_FAN_OUT_ENABLED", False)
+        service = LLMService()
+        service.cache = None
+        service.semantic_cache = SemanticCache()
+        service.client = SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(create=AsyncMock(
+                return_value=SimpleNamespace(
+                    choices=[SimpleNamespace(message=SimpleNamespace(content="report"))],
+                    usage=SimpleNamespace(prompt_tokens=1, completion_tokens=1, total_tokens=2),
+                )
+            )))
+        )
+        agent = ResearchAgent()
+        agent.llm_service = service
+        
+        first = await agent.execute(company_name="Apple Inc", partner_company="Microsoft", domain="AI")
+        second = await agent.execute(company_name="Microsoft", partner_company="Apple", domain="AI")
+        await agent.execute(company_name="Apple", partner_company="Microsoft", domain="XR")
+        
+        assert first == second == "report"
+        # The XR request differs in an exact-match field and is not reused
+        assert service.client.chat.completions.create.await_count == 2
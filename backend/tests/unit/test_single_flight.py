@@ -0,0 +1,85 @@
+"""
+Unit tests for single-flight call coalescing.
+"""
+import asyncio
+
+import pytest
+
+from app.services.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+class TestSingleFlight:
+    """Tests for SingleFlight."""
+    
+    async def test_concurrent_calls_share_one_execution(self):
+        """Test identical concurrent calls run the work once."""
+        flight = SingleFlight()
+        calls = 0
+        
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "result"
+        
+        results = await asyncio.gather(*(flight.run("k", work) for _ in range(5)))
+        
+        assert results == ["result"] * 5
+        assert calls == 1
+        assert flight.stats["coalesced"] == 4
+        assert flight.stats["in_flight"] == 0
+    
+    async def test_errors_propagate_to_all_waiters(self):
+        """Test a failure is raised to every waiter."""
+        flight = SingleFlight()
+        
+        async def work():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+        
+        results = await asyncio.gather(
+            flight.run("k", work), flight.run("k", work), return_exceptions=True
+        )
+        assert all(isinstance(r, ValueError) for r in results)
+    
+    async def test_partial_cancellation_keeps_flight(self):
+        """Test cancelling one waiter does not cancel the shared work."""
+        flight = SingleFlight()
+        
+        async def work():
+            await asyncio.sleep(0.05)
+            return "result"
+        
+        first = asyncio.create_task(flight.run("k", work))
+        second = asyncio.create_task(flight.run("k", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        
+        assert await second == "result"
+        assert flight.stats["cancelled"] == 0
+    
+    async def test_cancelling_every_waiter_cancels_work(self):
+        """Test the work is cancelled once no waiter remains."""
+        flight = SingleFlight()
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+        
+        async def work():
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+        
+        waiter = asyncio.create_task(flight.run("k", work))
+        await started.wait()
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await asyncio.sleep(0)
+        
+        assert cancelled.is_set()
+        assert flight.stats["cancelled"] == 1
+        assert flight.stats["in_flight"] == 0
@@ -0,0 +1,104 @@
+"""
+Unit tests for token streaming in the LLM service and pipeline.
+"""
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.models.requests import PipelineRequest
+from app.services.llm_service import LLMService
+from app.services.pipeline_service import PipelineOrchestrator
+
+
+class FakeStream:
+    """Async iterator standing in for an OpenAI chat completion stream."""
+    
+    def __init__(self, deltas):
+        self._chunks = [
+            SimpleNamespace(
+                choices=[SimpleNamespace(delta=SimpleNamespace(content=d))],
+                usage=None,
+            )
+            for d in deltas
+        ]
+        self._chunks.append(
+            SimpleNamespace(
+                choices=[],
+                usage=SimpleNamespace(prompt_tokens=5, completion_tokens=2, total_tokens=7),
+            )
+        )
+    
+    def __aiter__(self):
+        return self
+    
+    async def __anext__(self):
+        if not self._chunks:
+            raise StopAsyncIteration
+        return self._chunks.pop(0)
+
+
+@pytest.fixture
+def service():
+    service = LLMService()
+    service.cache = None
+    service.client = SimpleNamespace(
+        chat=SimpleNamespace(
+            completions=SimpleNamespace(
+                create=AsyncMock(side_effect=lambda **_: FakeStream(["Hel", "lo"]))
+            )
+        )
+    )
+    return service
+
+
+@pytest.mark.asyncio
+class TestGenerateStream:
+    """Tests for LLMService.generate_stream."""
+    
+    async def test_yields_deltas_and_tracks_usage(self, service):
+        """Test deltas are yielded in order and usage is counted."""
+        chunks = [c async for c in service.generate_stream(prompt="hi")]
+        assert chunks == ["Hel", "lo"]
+        assert service.tokens_used == 7
+        kwargs = service.client.chat.completions.create.await_args.kwargs
+        assert kwargs["stream"] is True
+
+
+@pytest.mark.asyncio
+class TestPipelineEvents:
+    """Tests for pipeline event callbacks."""
+    
+    async def test_stage_transitions_and_tokens(self, service, tmp_path, monkeypatch):
+        """Test events are emitted for every stage with streamed tokens."""
+        orchestrator = PipelineOrchestrator()
+        for agent in (
+            orchestrator.research_agent,
+            orchestrator.product_agent,
+            orchestrator.marketing_agent,
+        ):
+            agent.llm_service = service
+        orchestrator.llm_service = service
+        
+        events = []
+        
+        async def on_event(event, data):
+            events.append((event, data))
+        
+        response = await orchestrator.run_pipeline(
+            PipelineRequest(company_name="Apple", partner_company="Microsoft", domain="AI"),
+            save_report=False,
+            on_event=on_event,
+        )
+        
+        assert response.status == "completed"
+        # Research fans out into four streamed calls
+        assert response.metadata.tokens_used == 49
+        assert response.metadata.stage_usage["research"].llm_calls == 5
+        names = [e for e, _ in events]
+        assert names[0] == "pipeline_started"
+        assert names.count("stage_started") == 3
+        assert names.count("stage_completed") == 3
+        tokens = [d["content"] for e, d in events if e == "token" and d["stage"] == "research"]
+        assert "".join(tokens) == response.sections.research.content
+        assert response.sections.research.content.count("Hello") == 5
@@ -0,0 +1,128 @@
+"""
+Unit tests for local token counting and output budgeting.
+"""
+import sys
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.services.llm_service import LLMService
+from app.services.tokenizer import (
+    context_window,
+    count_message_tokens,
+    count_static_tokens,
+    count_tokens,
+    get_encoding,
+    plan_max_tokens,
+)
+from app.utils.exceptions import ValidationError
+
+
+def test_context_window_uses_longest_prefix():
+    """Test model names resolve to the most specific known window."""
+    assert context_window("gpt-4-turbo-preview") == 128000
+    assert context_window("gpt-4-32k-0613") == 32768
+    assert context_window("gpt-4") == 8192
+    assert context_window("some-local-model") == 8192
+
+
+def test_counts_grow_with_content():
+    """Test token counts scale with text and include chat overhead."""
+    assert count_tokens("", "gpt-4") == 0
+    short = count_message_tokens([{"role": "user", "content": "hello"}], "gpt-4")
+    long = count_message_tokens([{"role": "user", "content": "hello " * 100}], "gpt-4")
+    assert short > count_tokens("hello", "gpt-4")
+    assert long > short
+
+
+def test_system_prompts_are_memoized():
+    """Test repeated system prompts are counted once."""
+    count_static_tokens.cache_clear()
+    messages = [
+        {"role": "system", "content": "You are a strategist."},
+        {"role": "user", "content": "hi"},
+    ]
+    count_message_tokens(messages, "gpt-4")
+    count_message_tokens(messages, "gpt-4")
+    info = count_static_tokens.cache_info()
+    assert info.misses == 1
+    assert info.hits == 1
+
+
+def test_encoding_load_failure_falls_back(monkeypatch):
+    """Test a failed BPE download falls back to the character heuristic."""
+    def unavailable(name):
+        raise ConnectionError("no network")
+    
+    monkeypatch.setitem(
+        sys.modules,
+        "tiktoken",
+        SimpleNamespace(encoding_for_model=unavailable, get_encoding=unavailable),
+    )
+    get_encoding.cache_clear()
+    try:
+        assert get_encoding("gpt-4") is None
+        assert count_tokens("abcdef", "gpt-4") == 2
+    finally:
+        get_encoding.cache_clear()
+
+
+def test_plan_max_tokens():
+    """Test max_tokens shrinks to fit and oversized prompts are rejected."""
+    assert plan_max_tokens(1000, 4096, 8192) == 4096
+    assert plan_max_tokens(6000, 4096, 8192) == 2192
+    with pytest.raises(ValidationError) as exc_info:
+        plan_max_tokens(8100, 4096, 8192, min_output_tokens=256)
+    assert exc_info.value.details["state"] == "context_window_exceeded"
+
+
+@pytest.mark.asyncio
+class TestLLMServiceBudgeting:
+    """Tests for prompt budgeting inside LLMService."""
+    
+    @pytest.fixture
+    def service(self):
+        service = LLMService()
+        service.cache = None
+        service.context_window = 2000
+        service.client = SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(create=AsyncMock()))
+        )
+        return service
+    
+    async def test_oversized_prompt_never_reaches_api(self, service):
+        """Test a prompt larger than the window fails locally."""
+        with pytest.raises(ValidationError):
+            await service.generate_content(prompt="word " * 10000)
+        service.client.chat.completions.create.assert_not_awaited()
+        assert service.pool.primary.breaker.state == "closed"
+    
+    async def test_max_tokens_sized_to_remaining_window(self, service):
+        """Test max_tokens is reduced to the room the prompt leaves."""
+        service.client.chat.completions.create.side_effect = RuntimeError("stop")
+        prompt = "word " * 200
+        with pytest.raises(Exception):
+            await service.generate_content(prompt=prompt, max_output_tokens=4096)
+        
+        kwargs = service.client.chat.completions.create.await_args.kwargs
+        prompt_tokens = count_message_tokens(kwargs["messages"], service.model)
+        assert kwargs["max_tokens"] == 2000 - prompt_tokens
+    
+    async def test_max_tokens_only_sent_when_set(self, service):
+        """Test calls without a limit leave max_tokens to the provider when the window has room."""
+        service.context_window = 128000
+        create = service.client.chat.completions.create
+        create.side_effect = RuntimeError("stop")
+        
+        with pytest.raises(Exception):
+            await service.generate_content(prompt="hello")
+        assert "max_tokens" not in create.await_args.kwargs
+        with pytest.raises(Exception):
+            await service.generate_with_messages([{"role": "user", "content": "hello"}])
+        assert "max_tokens" not in create.await_args.kwargs
+        
+        service.context_window = 2000
+        with pytest.raises(Exception):
+            await service.generate_content(prompt="hello")
+        assert create.await_args.kwargs["max_tokens"] < 2000
@@ -0,0 +1,56 @@
+"""
+Unit tests for context-local usage accounting.
+"""
+import asyncio
+
+import pytest
+
+from app.services.usage_tracker import current_usage, record_usage, track_usage
+
+
+class TestUsageTracker:
+    """Tests for track_usage and record_usage."""
+    
+    def test_record_outside_tracking_is_noop(self):
+        """Test recording without an active context does nothing."""
+        assert current_usage() is None
+        record_usage(prompt_tokens=10, completion_tokens=5)
+    
+    def test_nested_tracking_rolls_up(self):
+        """Test child usage is added to the parent and kept per name."""
+        with track_usage() as pipeline:
+            with track_usage("research") as research:
+                record_usage(prompt_tokens=10, completion_tokens=5, llm_time_ms=100)
+            with track_usage("product"):
+                record_usage(prompt_tokens=1, completion_tokens=1)
+        
+        assert research.total_tokens == 15
+        assert pipeline.total_tokens == 17
+        assert pipeline.llm_calls == 2
+        assert pipeline.children["research"] is research
+        assert pipeline.to_dict()["llm_time_ms"] == 100
+        assert current_usage() is None
+    
+    def test_cached_tokens_roll_up(self):
+        """Test cached prompt tokens are tracked alongside prompt tokens."""
+        with track_usage() as pipeline:
+            with track_usage("research"):
+                record_usage(prompt_tokens=1000, cached_tokens=768)
+            record_usage(prompt_tokens=500, cached_tokens=0)
+        
+        assert pipeline.cached_tokens == 768
+        assert pipeline.to_dict()["cached_tokens"] == 768
+        assert pipeline.children["research"].cached_tokens == 768
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_tasks_are_isolated(self):
+        """Test concurrent pipelines do not see each other's usage."""
+        async def run(tokens):
+            with track_usage() as usage:
+                for _ in range(3):
+                    await asyncio.sleep(0)
+                    record_usage(prompt_tokens=tokens)
+                return usage.total_tokens
+        
+        results = await asyncio.gather(run(1), run(100))
+        assert results == [3, 300]